@@ -0,0 +1,87 @@
+"""
+Parse throughput of StreamingFeedParser for large synthetic RSS 2.0, RSS 1.0 and Atom feeds.
+Run from the repository root: python -m benchmarks.bench_feed_parser [item count] [repeat]
+"""
+
+import sys
+import time
+
+from feeds.feed.parser import (
+    ATOM_NAMESPACE,
+    DUBLIN_CORE_NAMESPACE,
+    RDF_NAMESPACE,
+    RSS1_NAMESPACE,
+    FeedFormat,
+    StreamingFeedParser,
+)
+
+CHUNK_SIZE = 64 * 1024
+
+
+def create_rss2_feed(item_count: int) -> str:
+    items = "".join(
+        f"<item><title>Item {x}</title><link>https://example.com/{x}</link>"
+        f"<pubDate>Mon, 01 Jan 2024 00:00:00 GMT</pubDate><guid>https://example.com/{x}</guid>"
+        f"<description>{'Lorem ipsum dolor sit amet. ' * 10}</description></item>"
+        for x in range(item_count)
+    )
+    return (
+        f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>Bench</title>{items}</channel>'
+        f"</rss>"
+    )
+
+
+def create_rss1_feed(item_count: int) -> str:
+    items = "".join(
+        f'<item rdf:about="https://example.com/{x}"><title>Item {x}</title><link>https://example.com/{x}</link>'
+        f"<dc:date>2024-01-01T00:00:00Z</dc:date><description>{'Lorem ipsum dolor sit amet. ' * 10}</description>"
+        f"</item>"
+        for x in range(item_count)
+    )
+    return (
+        f'<?xml version="1.0" encoding="utf-8"?><rdf:RDF xmlns:rdf="{RDF_NAMESPACE}" xmlns="{RSS1_NAMESPACE}" '
+        f'xmlns:dc="{DUBLIN_CORE_NAMESPACE}"><channel rdf:about="https://example.com/"><title>Bench</title>'
+        f"</channel>{items}</rdf:RDF>"
+    )
+
+
+def create_atom_feed(item_count: int) -> str:
+    entries = "".join(
+        f'<entry><title>Item {x}</title><id>urn:item:{x}</id><link href="https://example.com/{x}"/>'
+        f"<updated>2024-01-01T00:00:00Z</updated><summary>{'Lorem ipsum dolor sit amet. ' * 10}</summary></entry>"
+        for x in range(item_count)
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?><feed xmlns="{ATOM_NAMESPACE}"><title>Bench</title>{entries}</feed>'
+
+
+FEED_CREATORS = {
+    FeedFormat.RSS2: create_rss2_feed,
+    FeedFormat.RSS1: create_rss1_feed,
+    FeedFormat.ATOM: create_atom_feed,
+}
+
+
+def split_into_chunks(feed: str) -> list[str]:
+    return [feed[i:i + CHUNK_SIZE] for i in range(0, len(feed), CHUNK_SIZE)]
+
+
+def main() -> None:
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    parser = StreamingFeedParser()
+    print(f"{'format':<8}{'size (MB)':>12}{'items/s':>14}{'best (s)':>12}")
+    for feed_format, create_feed in FEED_CREATORS.items():
+        chunks = split_into_chunks(feed := create_feed(item_count))
+        timings = []
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            parsed_feed = parser.parse(chunks)
+            timings.append(time.perf_counter() - start_time)
+            assert len(parsed_feed.items) == item_count and parsed_feed.feed_format == feed_format
+
+        best_seconds = min(timings)
+        print(f"{feed_format:<8}{len(feed) / 1024 ** 2:>12.1f}{item_count / best_seconds:>14,.0f}{best_seconds:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Parse+select latency and peak memory of HtmlDocumentCache per parser backend, with full and scoped parsing,
+on a synthetic page of realistic size. Peak memory is measured with tracemalloc, which only sees allocations
+made through Python (the BeautifulSoup tree), not memory used internally by lxml.
+Run from the repository root: python -m benchmarks.bench_html_parser [page size in KB] [repeat]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from feeds.service.document import HtmlDocumentCache, HtmlParserBackend
+
+CSS_SELECTOR = "div#main-content article.post"
+
+
+def create_page(size_kb: int) -> str:
+    navigation = "".join(f'<li class="nav-item"><a href="/section/{x}">Section {x}</a></li>' for x in range(50))
+    cards = []
+    while sum(map(len, cards)) < size_kb * 1024:
+        index = len(cards)
+        cards.append(
+            f'<div class="card" data-id="{index}"><img src="/img/{index}.jpg" alt="Image {index}">'
+            f'<h3><a href="/item/{index}">Item {index}</a></h3><p class="summary">{"Lorem ipsum dolor sit. " * 8}</p>'
+            f'<span class="price">{index * 3 % 997} kr.</span></div>'
+        )
+    return (
+        f"<!DOCTYPE html><html><head><title>Bench</title>{'<script>var x = 1;</script>' * 20}</head><body>"
+        f'<nav><ul>{navigation}</ul></nav><div class="grid">{"".join(cards)}</div>'
+        f'<div id="main-content"><article class="post"><h1>Watched content</h1><p>Text</p></article></div>'
+        f"<footer>{'<p>Footer</p>' * 20}</footer></body></html>"
+    )
+
+
+def measure(page: str, parser_backend: HtmlParserBackend, scoped_parsing: bool, repeat: int) -> tuple[float, float]:
+    timings = []
+    for _ in range(repeat):
+        document_cache = HtmlDocumentCache(0, parser_backend, scoped_parsing)
+        start_time = time.perf_counter()
+        assert document_cache.select_one(page, CSS_SELECTOR) is not None
+        timings.append(time.perf_counter() - start_time)
+
+    document_cache = HtmlDocumentCache(0, parser_backend, scoped_parsing)
+    tracemalloc.start()
+    node = document_cache.select_one(page, CSS_SELECTOR)
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del node
+
+    return min(timings), peak_bytes / 1024 ** 2
+
+
+def main() -> None:
+    size_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    page = create_page(size_kb)
+    print(f"Page: {len(page) / 1024:.0f} KB, selector: {CSS_SELECTOR}")
+    print(f"{'backend':<14}{'mode':<8}{'best (ms)':>12}{'peak (MB)':>12}")
+    for parser_backend in HtmlParserBackend:
+        for scoped_parsing in (False, True):
+            best_seconds, peak_mb = measure(page, parser_backend, scoped_parsing, repeat)
+            mode = "scoped" if scoped_parsing else "full"
+            print(f"{parser_backend:<14}{mode:<8}{best_seconds * 1000:>12.1f}{peak_mb:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
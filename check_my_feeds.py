@@ -2,46 +2,87 @@
 import json
 import logging
 import os
-import time
+import signal
 from datetime import date
 from typing import Any
 
-import schedule
-
 from feeds.email.client import StandardSMTP, Configuration, EmailClient, DummyEmailClient, EncryptedEmailClient
-from feeds.feed.base import FeedCheckFailedError, FeedSchedule
+from feeds.feed.base import FeedCheckFailedError
 from feeds.feed.base import FeedChecker
 from feeds.feed.factory import create_feed_checkers
+from feeds.feed.web import WebCheckerBase
 from feeds.http.client import (
-    HTTPClientBase,
     HTTPClient,
     HTTPClientDynamicBase,
     HTTPClientDynamic,
 )
+from feeds.http.async_client import HTTPClientAsync
+from feeds.http.browser import BrowserPoolConfiguration
+from feeds.http.history import RequestHistoryDatabase
+from feeds.http.log import FsyncPolicy, RequestLogServiceBase, RequestLogStorage, RequestLogWriterConfiguration
+from feeds.http.pool import HTTPClientType, PoolConfiguration
+from feeds.http.validator import ValidatorCache
+from feeds.job.executor import ExecutionMode, FeedCheckExecutor, create_executor
+from feeds.job.scheduler import FeedCheckScheduler
+from feeds.service.document import HtmlDocumentCache
 from feeds.service.encryption import PGPService
 from feeds.service.host_scan import NmapScanService
-from feeds.settings import CONFIG_PATH, DEBUG
+from feeds.settings import CONFIG_PATH, DEBUG, HTTP_VALIDATOR_CACHE_PATH, MAX_THREAD_COUNT
+from feeds.shared.config import ConfigKeys
+
 
+class CheckMyFeedsJob:  # pylint: disable=too-many-instance-attributes
+    _pool_stats_interval_seconds = 300
+    _default_startup_window_seconds = 60
+    _default_max_jitter_seconds = 120
+    _default_batch_window_seconds = 5
+    _request_log_flush_interval_seconds = 30
+    _request_history_retention_interval_seconds = 86400
 
-class CheckMyFeedsJob:
     def __init__(self, config: dict):
         self.config = config
         self.logger = logging.getLogger("CheckMyFeeds")
+        self._job_config = self.config.get("job", {})
+        self._http_client = self._get_http_client()
+        self._http_client_dynamic = self._get_http_client_dynamic()
+        self._request_history = self._get_request_history()
+        self._request_log_writer = self._get_request_log_writer()
+        self._request_log_services: list[RequestLogServiceBase] = []
+        self._executor = self._get_executor()
+        self._scheduler = FeedCheckScheduler(
+            self._executor,
+            max_jitter_seconds=self._job_config.get("max_jitter_seconds", self._default_max_jitter_seconds),
+        )
 
     def get_feed_checkers(self) -> list[FeedChecker]:
         email_client = self._get_email_client()
-        http_client = self._get_http_client()
-        http_client_dynamic = self._get_http_client_dynamic()
         feed_checkers = create_feed_checkers(
             email_client=email_client,
-            http_client=http_client,
-            http_client_dynamic=http_client_dynamic,
-            feeds_by_type=self.config["feeds_by_type"],
+            http_client=self._http_client,
+            http_client_dynamic=self._http_client_dynamic,
+            feeds_by_type=self._get_feeds_by_type(),
             host_scan_service=NmapScanService(),
+            document_cache=HtmlDocumentCache(**self._job_config.get("html_parser", {})),
+            request_history=self._request_history,
+            request_log_writer=self._request_log_writer,
         )
+        self._request_log_services = [x.request_log_service for x in feed_checkers if isinstance(x, WebCheckerBase)]
 
         return feed_checkers
 
+    def _get_feeds_by_type(self) -> dict[str, list[dict[str, Any]]]:
+        """ Feed configs with the timeout of their feed type as default """
+        timeouts_by_type = self._job_config.get("timeouts_by_type", {})
+        return {
+            feed_type: [
+                {ConfigKeys.TIMEOUT_SECONDS: timeouts_by_type[feed_type], **feed}
+                if feed_type in timeouts_by_type
+                else feed
+                for feed in feeds
+            ]
+            for feed_type, feeds in self.config["feeds_by_type"].items()
+        }
+
     def _get_email_client(self) -> EmailClient:
         email_client_config = Configuration(
             smtp_host=self.config["email"]["smtp_server"],
@@ -65,45 +106,120 @@ class CheckMyFeedsJob:
 
         return email_client
 
-    @staticmethod
-    def _schedule_check(feed_checker: FeedChecker) -> None:
-        logging.info("%s will run %s.", feed_checker.name, feed_checker.schedule)
-        if feed_checker.schedule == FeedSchedule.HOURLY:
-            schedule.every().hour.do(feed_checker.check)
-        elif feed_checker.schedule == FeedSchedule.DAILY:
-            schedule.every().day.do(feed_checker.check)
-        elif feed_checker.schedule == FeedSchedule.WEEKLY:
-            schedule.every().week.do(feed_checker.check)
-        else:
-            raise ValueError(f"Invalid schedule: {feed_checker.schedule}")
+    def _get_request_history(self) -> RequestHistoryDatabase | None:
+        request_log_config = self._job_config.get("request_log", {})
+        if RequestLogStorage(request_log_config.get("storage", RequestLogStorage.FILES)) != RequestLogStorage.SQLITE:
+            return None
+
+        sqlite_config = request_log_config.get("sqlite", {})
+        self.logger.info("Logging requests to %s", sqlite_config["database_path"])
+        return RequestHistoryDatabase(**sqlite_config)
+
+    def _get_request_log_writer(self) -> RequestLogWriterConfiguration | None:
+        """ Request log files are written unbuffered, unless a writer is configured """
+        if not (writer_config := dict(self._job_config.get("request_log", {}).get("writer", {}))):
+            return None
+
+        writer_config["fsync"] = FsyncPolicy(writer_config.get("fsync", FsyncPolicy.NEVER))
+        return RequestLogWriterConfiguration(**writer_config)
+
+    def _flush_request_logs(self) -> None:
+        for request_log_service in self._request_log_services:
+            request_log_service.flush()
+        if self._request_history:
+            self._request_history.flush()
+
+    def _close_request_logs(self) -> None:
+        for request_log_service in self._request_log_services:
+            request_log_service.close()
+        if self._request_history:
+            self._request_history.close()
+
+    def _get_executor(self) -> FeedCheckExecutor:
+        execution_mode = ExecutionMode(self._job_config.get("execution_mode", ExecutionMode.SEQUENTIAL))
+        max_workers = self._job_config.get("max_workers", MAX_THREAD_COUNT)
+        self.logger.info("Running feed checks in %s mode (max. %s workers)", execution_mode, max_workers)
+
+        return create_executor(execution_mode, max_workers)
+
+    def _log_pool_stats(self) -> None:
+        stats = self._executor.stats()
+        self.logger.info(
+            "Worker pool: %s/%s busy (%.0f%%), %s queued, %s completed, %s failed, %s skipped, %s timed out, "
+            "%s abandoned",
+            stats.active,
+            stats.max_workers,
+            stats.utilization * 100,
+            stats.queued,
+            stats.completed,
+            stats.failed,
+            stats.skipped,
+            stats.timed_out,
+            stats.abandoned,
+        )
+        http_pool_stats = self._http_client.get_pool_stats()
+        self.logger.info(
+            "HTTP connection pool: %s reused, %s new connections (hit ratio %.0f%%)",
+            http_pool_stats.hits,
+            http_pool_stats.misses,
+            http_pool_stats.hit_ratio * 100,
+        )
 
-    @staticmethod
-    def _get_http_client() -> HTTPClientBase:
-        return HTTPClient({})
+    def _get_http_client(self) -> HTTPClient | HTTPClientAsync:
+        http_config = dict(self._job_config.get("http", {}))
+        http_client_type = HTTPClientType(http_config.pop("client", HTTPClientType.SYNC))
+        self.logger.info("Using HTTP client: %s", http_client_type)
+        http_client_class = HTTPClientAsync if http_client_type == HTTPClientType.ASYNC else HTTPClient
 
-    @staticmethod
-    def _get_http_client_dynamic() -> HTTPClientDynamicBase:
-        return HTTPClientDynamic({})
+        return http_client_class({}, PoolConfiguration(**http_config), ValidatorCache(HTTP_VALIDATOR_CACHE_PATH))
+
+    def _prefetch(self, feed_checkers: list[FeedChecker]) -> None:
+        if fetch_requests := [x for feed_checker in feed_checkers for x in feed_checker.get_fetch_requests()]:
+            self.logger.debug("Prefetching %s requests for %s feed checkers", len(fetch_requests), len(feed_checkers))
+            self._http_client.prefetch(fetch_requests)
+
+    def _get_http_client_dynamic(self) -> HTTPClientDynamicBase:
+        browser_config = self._job_config.get("browser", {})
+        return HTTPClientDynamic({}, BrowserPoolConfiguration(**browser_config))
 
     def run(self) -> None:
         try:
-            for feed_checker in self.get_feed_checkers():
-                self.logger.info("Running feed checker %s...", feed_checker.name)
-                feed_checker.check()
-                self.logger.info("Finished running %s.", feed_checker.name)
-
-                self.logger.debug("Setting up scheduling for feed %s...", feed_checker.name)
-                self._schedule_check(feed_checker)
+            self.logger.debug("Setting up scheduling for feeds...")
+            self._scheduler.add_feed_checkers(
+                self.get_feed_checkers(),
+                startup_window_seconds=self._job_config.get(
+                    "startup_window_seconds", self._default_startup_window_seconds
+                ),
+            )
         except FeedCheckFailedError as ex:
             self.logger.error("Error running scheduled jobs: %s", ex)
 
         self.logger.info("Feed checkers set up successfully! Running scheduled jobs...")
-        while True:
-            try:
-                schedule.run_pending()
-                time.sleep(1)
-            except FeedCheckFailedError as ex:
-                self.logger.error("Error running scheduled jobs: %s", ex)
+        self._scheduler.add_task(self._log_pool_stats, self._pool_stats_interval_seconds)
+        if self._request_log_writer or self._request_history:
+            self._scheduler.add_task(
+                self._flush_request_logs,
+                self._request_log_writer.flush_interval_seconds
+                if self._request_log_writer else self._request_log_flush_interval_seconds,
+            )
+        if self._request_history:
+            self._scheduler.add_task(
+                self._request_history.apply_retention, self._request_history_retention_interval_seconds
+            )
+        self._scheduler.set_batch_handler(
+            self._prefetch, self._job_config.get("batch_window_seconds", self._default_batch_window_seconds)
+        )
+        try:
+            self._scheduler.run_forever()
+        finally:
+            self._executor.shutdown(wait=False)
+            self._http_client.close()
+            self._http_client_dynamic.close()
+            self._close_request_logs()
+
+    def stop(self) -> None:
+        self.logger.info("Stopping feed checkers...")
+        self._scheduler.stop()
 
 
 def _load_config() -> dict[str, Any]:
@@ -130,6 +246,7 @@ def main():
     config = _load_config()
     _setup_logging(config)
     job = CheckMyFeedsJob(config)
+    signal.signal(signal.SIGTERM, lambda *_: job.stop())
     job.run()
 
 
@@ -49,11 +49,16 @@ class StandardSMTP(EmailClient):
     """ Email client that sends emails using SMTP. Default email client. """
 
     encoding = "utf-8"
+    timeout_seconds = 60
 
     def send_email(self, email: EmailMessage) -> None:
         mime_message = self._create_message(email)
         context = ssl.create_default_context()
-        with smtplib.SMTP(host=self.configuration.smtp_host, port=self.configuration.smtp_port) as mail_server:
+        with smtplib.SMTP(
+                host=self.configuration.smtp_host,
+                port=self.configuration.smtp_port,
+                timeout=self.timeout_seconds,
+        ) as mail_server:
             mail_server.starttls(context=context)
             mail_server.login(self.configuration.smtp_user, self.configuration.smtp_password)
             mail_server.send_message(mime_message)
@@ -1,5 +1,9 @@
 from enum import StrEnum
 
+from feeds.http.client import FetchRequest
+from feeds.settings import DEFAULT_CHECK_TIMEOUT_SECONDS
+from feeds.shared.config import ConfigKeys
+
 
 class FeedCheckFailedError(Exception):
     pass
@@ -10,11 +14,20 @@ class FeedSchedule(StrEnum):
     DAILY = "daily"
     WEEKLY = "weekly"
     MONTHLY = "monthly"
+    ADAPTIVE = "adaptive"
+
+
+class CheckOutcome(StrEnum):
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    FAILED = "failed"
+    TIMEOUT = "timeout"
 
 
 class FeedChecker:
     def __init__(self, config: dict):
         self.config = config
+        self.last_outcome: CheckOutcome | None = None
 
     @property
     def name(self) -> str:
@@ -24,6 +37,25 @@ class FeedChecker:
     def schedule(self) -> FeedSchedule:
         return FeedSchedule(self.config["schedule"])
 
+    @property
+    def timeout_seconds(self) -> float:
+        return self.config.get(ConfigKeys.TIMEOUT_SECONDS, DEFAULT_CHECK_TIMEOUT_SECONDS)
+
+    @property
+    def http_validator_key(self) -> str | None:
+        """ Key of the saved HTTP validators (ETag/Last-Modified) of the feed. None if conditional GET is disabled """
+        return self.name if self.config.get(ConfigKeys.CONDITIONAL_GET, True) else None
+
+    def get_fetch_requests(self) -> list[FetchRequest]:
+        """HTTP requests the next check will send, so they can be fetched in a batch. Overwritten by web checkers"""
+        return []
+
     def check(self) -> None:
         """Should be overwritten by subclasses"""
         raise NotImplementedError
+
+    def cancel(self) -> None:
+        """
+        Called from another thread, when check() has exceeded its deadline.
+        Subclasses should overwrite this to kill subprocesses, browsers etc. started by the running check.
+        """
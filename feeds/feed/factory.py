@@ -1,3 +1,5 @@
+import logging
+from collections import Counter
 from enum import StrEnum
 from typing import Any
 
@@ -11,7 +13,9 @@ from feeds.feed.web import (
     PageContentCheckerDynamic,
 )
 from feeds.http.client import HTTPClientBase, HTTPClientDynamicBase
-from feeds.http.log import RequestLogService
+from feeds.http.history import RequestHistoryDatabase
+from feeds.http.log import RequestLogWriterConfiguration, create_request_log_service
+from feeds.service.document import HtmlDocumentCache
 from feeds.service.host_scan import HostScanService
 from feeds.shared.config import ConfigKeys
 
@@ -28,14 +32,19 @@ class FeedType(StrEnum):
     HOST_AVAILABILITY = "host_availability"
 
 
-def create_feed_checkers(
+def create_feed_checkers(  # pylint: disable=too-many-arguments
         feeds_by_type: dict[str, list[dict[str, Any]]],
         email_client: EmailClient,
         http_client: HTTPClientBase,
         http_client_dynamic: HTTPClientDynamicBase,
         host_scan_service: HostScanService,
+        *,
+        document_cache: HtmlDocumentCache | None = None,
+        request_history: RequestHistoryDatabase | None = None,
+        request_log_writer: RequestLogWriterConfiguration | None = None,
 ) -> list[FeedChecker]:
     feed_checkers = []
+    document_cache = document_cache or HtmlDocumentCache()
     for feed_type, feeds in feeds_by_type.items():
         if feed_type == FeedType.RSS:
             feed_checkers.extend(RSSFeedChecker(email_client, http_client, feed) for feed in feeds)
@@ -44,7 +53,9 @@ def create_feed_checkers(
                 UrlAvailabilityChecker(
                     email_client,
                     http_client,
-                    RequestLogService(feed[ConfigKeys.DIR]),
+                    create_request_log_service(
+                        feed[ConfigKeys.DIR], feed[ConfigKeys.NAME], request_history, request_log_writer
+                    ),
                     feed,
                 )
                 for feed in feeds
@@ -54,8 +65,11 @@ def create_feed_checkers(
                 PageContentChecker(
                     email_client,
                     http_client,
-                    RequestLogService(feed[ConfigKeys.DIR]),
+                    create_request_log_service(
+                        feed[ConfigKeys.DIR], feed[ConfigKeys.NAME], request_history, request_log_writer
+                    ),
                     feed,
+                    document_cache,
                 )
                 for feed in feeds
             )
@@ -64,8 +78,12 @@ def create_feed_checkers(
                 PageContentCheckerDynamic(
                     email_client,
                     http_client_dynamic,
-                    RequestLogService(feed[ConfigKeys.DIR]),
+                    create_request_log_service(
+                        feed[ConfigKeys.DIR], feed[ConfigKeys.NAME], request_history, request_log_writer
+                    ),
                     feed,
+                    http_client,
+                    document_cache,
                 )
                 for feed in feeds
             )
@@ -74,4 +92,15 @@ def create_feed_checkers(
         else:
             raise FeedFactoryError(f"Unknown feed type: {feed_type}")
 
+    _log_shared_urls(feed_checkers)
     return feed_checkers
+
+
+def _log_shared_urls(feed_checkers: list[FeedChecker]) -> None:
+    """ Requests of checkers sharing a URL are coalesced by the HTTP client """
+    checkers_by_url = Counter(
+        fetch_request.url for feed_checker in feed_checkers for fetch_request in feed_checker.get_fetch_requests()
+    )
+    for url, count in checkers_by_url.items():
+        if count > 1:
+            logging.getLogger("FeedFactory").info("%s feed checkers share %s. Requests will be coalesced.", count, url)
@@ -3,7 +3,7 @@ import logging
 
 from feeds.email.client import EmailClient, EmailMessage
 from feeds.email.html import create_paragraph, create_heading_two
-from feeds.feed.base import FeedChecker, FeedCheckFailedError
+from feeds.feed.base import CheckOutcome, FeedChecker, FeedCheckFailedError
 from feeds.service.host_scan import HostScanService, HostStatus
 from feeds.shared.config import ConfigKeys
 
@@ -22,10 +22,12 @@ class HostAvailabilityCheck(FeedChecker):
         self._logger = logging.getLogger("HostCheck")
         self.host = self.config[ConfigKeys.HOST]
         self.expected_open_ports = set(self.config[ConfigKeys.EXPECTED_OPEN_PORTS])
+        self._scan_id = f"{self.name}-{id(self)}"
 
     def check(self) -> None:
         try:
-            port_scan_result = asyncio.run(self._host_scan_service.scan_host_tcp_ports(self.host))
+            port_scan_result = asyncio.run(self._host_scan_service.scan_host_tcp_ports(self.host, self._scan_id))
+            self.last_outcome = CheckOutcome.CHANGED
             if port_scan_result.status == HostStatus.DOWN:
                 self._logger.info("Host %s is down", self.host)
                 self._email_client.send_email(
@@ -43,6 +45,7 @@ class HostAvailabilityCheck(FeedChecker):
                     self.host,
                     self.expected_open_ports,
                 )
+                self.last_outcome = CheckOutcome.UNCHANGED
                 return
 
             message_subject = f"Host availability check {self.name}: Unexpected scan results"
@@ -70,6 +73,9 @@ class HostAvailabilityCheck(FeedChecker):
             self._log_error_and_send_email(ex)
             raise FeedCheckFailedError(f"Error checking host {self.host}: {ex}") from ex
 
+    def cancel(self) -> None:
+        self._host_scan_service.cancel_scan(self._scan_id)
+
     def _log_error_and_send_email(self, ex: Exception) -> None:
         self._logger.error(ex)
         message_body = f"{create_heading_two(f"Error checking host {self.host}")}\n{create_paragraph(str(ex))}"
@@ -0,0 +1,172 @@
+import xml.etree.ElementTree as ET
+from collections.abc import Iterable
+from enum import StrEnum
+from hashlib import sha256
+from typing import ClassVar, NamedTuple
+
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+RDF_NAMESPACE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+RSS1_NAMESPACE = "http://purl.org/rss/1.0/"
+DUBLIN_CORE_NAMESPACE = "http://purl.org/dc/elements/1.1/"
+
+
+class FeedParseError(Exception):
+    pass
+
+
+class FeedFormat(StrEnum):
+    RSS2 = "rss2"
+    RSS1 = "rss1"
+    ATOM = "atom"
+
+
+class RssItem(NamedTuple):
+    title: str
+    link: str
+    published_date: str
+    guid: str = ""
+
+    @property
+    def key(self) -> str:
+        """ Identity of the item: guid, link or a hash of the title and published date """
+        if self.guid or self.link:
+            return self.guid or self.link
+
+        return sha256(f"{self.title}|{self.published_date}".encode()).hexdigest()
+
+
+class ParsedFeed(NamedTuple):
+    feed_format: FeedFormat
+    items: list[RssItem]
+    items_digest: str
+
+
+class FeedFormatParser:
+    """ Finds and converts the items of one feed format. Missing fields are returned as empty strings """
+
+    feed_format: ClassVar[FeedFormat]
+
+    def is_item(self, element: ET.Element, parent: ET.Element) -> bool:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+    def parse_item(self, item: ET.Element) -> RssItem:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+    @staticmethod
+    def _get_text(item: ET.Element, path: str) -> str:
+        return (item.findtext(path) or "").strip()
+
+
+class Rss2Parser(FeedFormatParser):
+    """ RSS 0.9x and 2.0: rss/channel/item """
+
+    feed_format = FeedFormat.RSS2
+
+    def is_item(self, element: ET.Element, parent: ET.Element) -> bool:
+        return element.tag == "item" and parent.tag == "channel"
+
+    def parse_item(self, item: ET.Element) -> RssItem:
+        return RssItem(
+            title=self._get_text(item, "title"),
+            link=self._get_text(item, "link"),
+            published_date=self._get_text(item, "pubDate"),
+            guid=self._get_text(item, "guid"),
+        )
+
+
+class Rss1Parser(FeedFormatParser):
+    """ RSS 1.0 (RDF): rdf:RDF/item with the date in dc:date """
+
+    feed_format = FeedFormat.RSS1
+
+    def is_item(self, element: ET.Element, parent: ET.Element) -> bool:
+        return element.tag == f"{{{RSS1_NAMESPACE}}}item" and parent.tag == f"{{{RDF_NAMESPACE}}}RDF"
+
+    def parse_item(self, item: ET.Element) -> RssItem:
+        return RssItem(
+            title=self._get_text(item, f"{{{RSS1_NAMESPACE}}}title"),
+            link=self._get_text(item, f"{{{RSS1_NAMESPACE}}}link"),
+            published_date=self._get_text(item, f"{{{DUBLIN_CORE_NAMESPACE}}}date"),
+            guid=item.get(f"{{{RDF_NAMESPACE}}}about", ""),
+        )
+
+
+class AtomParser(FeedFormatParser):
+    """ Atom 1.0: feed/entry with the link in the href of the alternate link """
+
+    feed_format = FeedFormat.ATOM
+
+    def is_item(self, element: ET.Element, parent: ET.Element) -> bool:
+        return element.tag == f"{{{ATOM_NAMESPACE}}}entry" and parent.tag == f"{{{ATOM_NAMESPACE}}}feed"
+
+    def parse_item(self, item: ET.Element) -> RssItem:
+        return RssItem(
+            title=self._get_text(item, f"{{{ATOM_NAMESPACE}}}title"),
+            link=self._get_link(item),
+            published_date=(
+                self._get_text(item, f"{{{ATOM_NAMESPACE}}}published")
+                or self._get_text(item, f"{{{ATOM_NAMESPACE}}}updated")
+            ),
+            guid=self._get_text(item, f"{{{ATOM_NAMESPACE}}}id"),
+        )
+
+    @staticmethod
+    def _get_link(item: ET.Element) -> str:
+        links = item.findall(f"{{{ATOM_NAMESPACE}}}link")
+        for link in links:
+            if link.get("rel", "alternate") == "alternate":
+                return link.get("href", "").strip()
+
+        return links[0].get("href", "").strip() if links else ""
+
+
+FEED_PARSERS_BY_ROOT_TAG: dict[str, FeedFormatParser] = {
+    "rss": Rss2Parser(),
+    f"{{{RDF_NAMESPACE}}}RDF": Rss1Parser(),
+    f"{{{ATOM_NAMESPACE}}}feed": AtomParser(),
+}
+
+
+class StreamingFeedParser:
+    """
+    Parses a feed incrementally. The format is detected from the root element, and items are hashed and
+    converted as soon as they are complete and removed from the tree afterwards, so the whole tree is never built.
+    More formats can be supported by passing a FeedFormatParser for their root element.
+    """
+
+    def __init__(self, parsers_by_root_tag: dict[str, FeedFormatParser] | None = None):
+        self._parsers_by_root_tag = parsers_by_root_tag or FEED_PARSERS_BY_ROOT_TAG
+
+    def parse(self, chunks: Iterable[str | bytes]) -> ParsedFeed:
+        parser = ET.XMLPullParser(events=("start", "end"))
+        format_parser: FeedFormatParser | None = None
+        open_elements: list[ET.Element] = []
+        items = []
+        items_hash = sha256()
+        for chunk in chunks:
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if event == "start":
+                    format_parser = format_parser or self._get_format_parser(element)
+                    open_elements.append(element)
+                    continue
+
+                open_elements.pop()
+                if open_elements and format_parser.is_item(element, open_elements[-1]):
+                    element.tail = None
+                    items_hash.update(ET.tostring(element))
+                    items.append(format_parser.parse_item(element))
+                    open_elements[-1].remove(element)
+        parser.close()
+        if not format_parser:
+            raise FeedParseError("Feed is empty")
+
+        return ParsedFeed(format_parser.feed_format, items, items_hash.hexdigest())
+
+    def _get_format_parser(self, root: ET.Element) -> FeedFormatParser:
+        if (format_parser := self._parsers_by_root_tag.get(root.tag)) is None:
+            raise FeedParseError(f"Unknown feed format with root element {root.tag}")
+
+        return format_parser
@@ -1,29 +1,33 @@
 import logging
 import os
-import xml.etree.ElementTree as ET
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from datetime import datetime
-from typing import NamedTuple, ClassVar
+from typing import ClassVar
 
 from feeds.email.client import EmailClient, EmailMessage
 from feeds.email.html import create_table, create_heading_two, create_link
-from feeds.feed.base import FeedChecker, FeedCheckFailedError
-from feeds.http.client import HTTPClientBase
+from feeds.feed.base import CheckOutcome, FeedChecker, FeedCheckFailedError
+from feeds.feed.parser import ParsedFeed, RssItem, StreamingFeedParser
+from feeds.http.client import FetchRequest, HTTPClientBase
+from feeds.service.seen_items import SeenItemIndex
+from feeds.service.snapshot import SnapshotStorage, create_snapshot_store
 from feeds.shared.config import ConfigKeys
-from feeds.shared.helper import hash_equals
-
-
-class RssItem(NamedTuple):
-    title: str
-    link: str
-    published_date: str
+from feeds.shared.state import JsonStateFile
 
 
 class RSSFeedChecker(FeedChecker):
-    _channel_items_path: ClassVar[str] = "channel/item"
-    _title_element: ClassVar[str] = "title"
-    _link_element: ClassVar[str] = "link"
-    _published_date_element: ClassVar[str] = "pubDate"
+    """
+    Checks RSS 2.0, RSS 1.0 and Atom feeds. The feed is parsed incrementally (see StreamingFeedParser),
+    and the digest of the items is kept in a state file for the next check.
+    """
+
+    _feed_parser: ClassVar[StreamingFeedParser] = StreamingFeedParser()
+    _feed_file_extension: ClassVar[str] = ".xml"
+    _feed_encoding: ClassVar[str] = "utf-8"
+    _chunk_size: ClassVar[int] = 64 * 1024
+    state_filename: ClassVar[str] = "rss_feed_state.json"
+    seen_items_filename: ClassVar[str] = "rss_seen_items.json"
+    default_max_seen_items: ClassVar[int] = 1000
 
     def __init__(self, email_client: EmailClient, http_client: HTTPClientBase, config: dict):
         super().__init__(config)
@@ -31,57 +35,108 @@ class RSSFeedChecker(FeedChecker):
         self._email_client = email_client
         self._logger = logging.getLogger("RSSFeedChecker")
         self.data_dir_path = self.config[ConfigKeys.DIR]
-        self.saved_feeds_count = self.config[ConfigKeys.SAVED_FEEDS_COUNT]
         self.url = self.config[ConfigKeys.URL]
+        self._snapshot_store = create_snapshot_store(
+            SnapshotStorage(self.config.get(ConfigKeys.SNAPSHOT_STORAGE, SnapshotStorage.FILES)),
+            self.data_dir_path,
+            self._feed_file_extension,
+        )
+
+    @property
+    def saved_feeds_count(self) -> int:
+        return self.config[ConfigKeys.SAVED_FEEDS_COUNT]
+
+    @property
+    def _state_file(self) -> JsonStateFile:
+        return JsonStateFile(os.path.join(self.data_dir_path, self.state_filename))
+
+    def get_fetch_requests(self) -> list[FetchRequest]:
+        return [FetchRequest(self.url, self.http_validator_key)]
 
     def check(self) -> None:
         try:
             if not os.path.exists(self.data_dir_path):
                 os.mkdir(self.data_dir_path)
 
-            if not (feed := self._http_client.get_response_string(self.url)):
+            if (feed := self._http_client.get_response_string(self.url, self.http_validator_key)) is None:
+                self._logger.debug("Feed %s not modified.", self.name)
+                self.last_outcome = CheckOutcome.UNCHANGED
+                return
+            if not feed:
                 raise FeedCheckFailedError(f"Failed to download feed at {self.url}")
 
-            rss_tree = ET.ElementTree(ET.fromstring(feed))
-            if self._feed_content_updated(rss_tree):
+            parsed_feed = self._parse_feed(self._split_into_chunks(feed))
+            if not parsed_feed.items:
+                raise FeedCheckFailedError(
+                    f"Failed to find {parsed_feed.feed_format} feed items. Check if the feed is alright."
+                )
+
+            self.last_outcome = CheckOutcome.UNCHANGED
+            if self._feed_content_updated(parsed_feed):
                 self._logger.debug("Feed %s updated. Saving feed...", self.name)
-                self._save_feed(rss_tree)
-                self._send_notification_email(self._parse_feed_items(rss_tree))
+                seen_items = self._load_seen_items(parsed_feed)
+                self._save_feed(feed)
+                if new_items := [x for x in parsed_feed.items if x.key not in seen_items]:
+                    self._logger.debug("%s new items in feed %s.", len(new_items), self.name)
+                    self._send_notification_email(new_items)
+                    self.last_outcome = CheckOutcome.CHANGED
+                seen_items.add(x.key for x in reversed(new_items))
+                seen_items.save()
+                self._state_file.save({"items_digest": parsed_feed.items_digest})
                 self._remove_old_feeds()
+            if self.http_validator_key:
+                self._http_client.commit_validator(self.url, self.http_validator_key)
         except Exception as ex:
             raise FeedCheckFailedError(f"Error checking RSS feed {self.name}: {ex}") from ex
 
-    def _parse_feed_items(self, tree: ET.ElementTree) -> list[RssItem]:
-        rss_items = []
-        for item in tree.findall(self._channel_items_path):
-            title = item.find(self._title_element).text
-            link = item.find(self._link_element).text
-            published_date = item.find(self._published_date_element).text
-            rss_items.append(RssItem(title, link, published_date))
+    def _parse_feed(self, chunks: Iterable[str | bytes]) -> ParsedFeed:
+        return self._feed_parser.parse(chunks)
 
-        return rss_items
+    def _split_into_chunks(self, feed: str) -> Iterable[str]:
+        return (feed[i:i + self._chunk_size] for i in range(0, len(feed), self._chunk_size))
 
-    def _feed_content_updated(self, new_feed_tree: ET.ElementTree) -> bool:
-        if not (saved_feeds := self._list_data_dir(descending=True)):
+    def _feed_content_updated(self, parsed_feed: ParsedFeed) -> bool:
+        if not (previous_digest := self._get_previous_items_digest()):
             return True
 
-        latest_feed = saved_feeds[0]
-        latest_saved_feed_path = os.path.join(self.data_dir_path, latest_feed)
-        latest_saved_feed_tree = ET.parse(latest_saved_feed_path)
-
-        channel_old_feed_bytes = b"".join(
-            ET.tostring(x) for x in latest_saved_feed_tree.findall(self._channel_items_path)
+        return previous_digest != parsed_feed.items_digest
+
+    def _get_previous_items_digest(self) -> str | None:
+        """ Digest from the state file. Falls back to parsing the latest saved feed, e.g. after an upgrade """
+        if items_digest := self._state_file.load().get("items_digest"):
+            return items_digest
+        if not (latest_saved_feed := self._parse_latest_saved_feed()):
+            return None
+
+        self._state_file.save({"items_digest": latest_saved_feed.items_digest})
+        return latest_saved_feed.items_digest
+
+    def _load_seen_items(self, parsed_feed: ParsedFeed) -> SeenItemIndex:
+        """
+        The index holds at least twice the items of the feed, so items still in the feed aren't evicted.
+        An empty index is filled from the latest saved feed, so old items aren't notified after an upgrade
+        """
+        max_items = max(
+            self.config.get(ConfigKeys.MAX_SEEN_ITEMS, self.default_max_seen_items), 2 * len(parsed_feed.items)
         )
-        channel_new_feed_bytes = b"".join(ET.tostring(x) for x in new_feed_tree.findall(self._channel_items_path))
-        if not channel_new_feed_bytes or not channel_old_feed_bytes:
-            raise FeedCheckFailedError("Failed to find RSS feed items. Check if the RSS feed is alright.")
+        seen_items = SeenItemIndex(os.path.join(self.data_dir_path, self.seen_items_filename), max_items)
+        if not seen_items and (latest_saved_feed := self._parse_latest_saved_feed()):
+            seen_items.add(x.key for x in latest_saved_feed.items)
+
+        return seen_items
+
+    def _parse_latest_saved_feed(self) -> ParsedFeed | None:
+        """ The saved feed is read in chunks, so the file store and the content-addressed store stream it """
+        if (latest_saved_feed_chunks := self._snapshot_store.read_latest_chunks(self._chunk_size)) is None:
+            return None
 
-        return not hash_equals(channel_old_feed_bytes, channel_new_feed_bytes)
+        self._logger.debug("Parsing latest saved feed of %s...", self.name)
+        return self._parse_feed(latest_saved_feed_chunks)
 
-    def _save_feed(self, feed: ET.ElementTree) -> None:
-        feed_name = f"{self.name}_{datetime.now().strftime('%Y-%m-%d_%H_%M')}.xml"
+    def _save_feed(self, feed: str) -> None:
+        feed_name = f"{self.name}_{datetime.now().strftime('%Y-%m-%d_%H_%M')}{self._feed_file_extension}"
         self._logger.debug("Writing feed %s", feed_name)
-        feed.write(os.path.join(self.data_dir_path, feed_name))
+        self._snapshot_store.save(feed_name, feed.encode(encoding=self._feed_encoding))
 
     def _send_notification_email(self, rss_items: Sequence[RssItem]) -> None:
         subject = f"RSS-feed {self.name} opdateret"
@@ -95,11 +150,4 @@ class RSSFeedChecker(FeedChecker):
         self._email_client.send_email(message)
 
     def _remove_old_feeds(self) -> None:
-        saved_feeds = self._list_data_dir(descending=True)
-        if len(saved_feeds) > self.saved_feeds_count:
-            for feed in saved_feeds[self.saved_feeds_count:]:
-                self._logger.debug("Removing old feed %s...", feed)
-                os.remove(os.path.join(self.data_dir_path, feed))
-
-    def _list_data_dir(self, descending: bool) -> list[str]:
-        return sorted(os.listdir(self.data_dir_path), reverse=descending)
+        self._snapshot_store.clean_up(self.saved_feeds_count)
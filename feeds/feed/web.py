@@ -1,19 +1,33 @@
 import logging
 import os
-from typing import ClassVar
+from collections.abc import Iterable
+from enum import StrEnum
+from typing import ClassVar, NamedTuple
 from venv import logger
 
-from bs4 import BeautifulSoup
+from bs4 import Tag
 from slugify import slugify
 
 from feeds.email.client import EmailClient, EmailMessage
-from feeds.email.html import create_heading_one, create_pre
-from feeds.feed.base import FeedChecker, FeedCheckFailedError
-from feeds.http.client import HTTPClientBase, HTTPClientDynamicBase
-from feeds.http.log import RequestLogService
+from feeds.email.html import create_heading_one, create_heading_two, create_paragraph, create_pre, create_table
+from feeds.feed.base import CheckOutcome, FeedChecker, FeedCheckFailedError
+from feeds.http.browser import RenderProfile, RenderProfileType
+from feeds.http.client import FetchRequest, HTTPClientBase, HTTPClientDynamicBase
+from feeds.http.log import RequestLogServiceBase
+from feeds.service.availability import (
+    AvailabilityMonitor,
+    AvailabilitySample,
+    AvailabilityStatistics,
+    AvailabilityThresholds,
+)
+from feeds.service.canonical import CanonicalizationConfiguration, HtmlCanonicalizer, SuppressedChangeCounter
 from feeds.service.content import HtmlContentFileService
+from feeds.service.diff import DiffEngineType, create_diff_engine
+from feeds.service.document import HtmlDocumentCache
+from feeds.service.snapshot import SnapshotStorage
 from feeds.shared.config import ConfigKeys
-from feeds.shared.helper import hash_equals
+from feeds.shared.state import JsonStateFile
+from feeds.shared.helper import content_digest
 
 
 class WebCheckerBase(FeedChecker):
@@ -22,7 +36,7 @@ class WebCheckerBase(FeedChecker):
     def __init__(
             self,
             email_client: EmailClient,
-            request_log_service: RequestLogService,
+            request_log_service: RequestLogServiceBase,
             config: dict,
     ) -> None:
         super().__init__(config)
@@ -43,12 +57,17 @@ class WebCheckerBase(FeedChecker):
 
 
 class UrlAvailabilityChecker(WebCheckerBase):
+    """
+    Sends an email, when the URL returns the expected status code. The check is skipped while it does.
+    If monitoring is configured, every check requests the URL and records status code, latency and TTFB instead,
+    and an email is sent, when the rolling window statistics cross the thresholds or are back within them.
+    """
 
     def __init__(
             self,
             email_client: EmailClient,
             http_client: HTTPClientBase,
-            request_log_service: RequestLogService,
+            request_log_service: RequestLogServiceBase,
             config: dict,
     ) -> None:
         super().__init__(email_client, request_log_service, config)
@@ -56,24 +75,33 @@ class UrlAvailabilityChecker(WebCheckerBase):
         self._logger = logging.getLogger("UrlAvailabilityChecker")
         self.expected_status_code = self.config[ConfigKeys.EXPECTED_STATUS_CODE]
         self.data_dir = self.config[ConfigKeys.DIR]
+        self.availability_monitor = self._create_availability_monitor()
+
+    def get_fetch_requests(self) -> list[FetchRequest]:
+        if self.availability_monitor or self._is_service_available():
+            return []
+
+        return [FetchRequest(self.url)]
 
     def check(self) -> None:
         try:
             if not os.path.exists(self.data_dir):
                 logger.info("Creating directory %s...", self.data_dir)
                 os.makedirs(self.data_dir)
-            last_status_code = self.request_log_service.get_last_request_value(value_index=1)
-            logger.debug("Last status code: %s", last_status_code)
-            if last_status_code and int(last_status_code) == self.expected_status_code:
-                self._logger.info(
-                    "Service is available (status code %s). Check is skipped!",
-                    last_status_code,
-                )
+            if self.availability_monitor:
+                self._monitor()
+                return
+            if self._is_service_available():
+                self._logger.info("Service is available (status code %s). Check is skipped!", self.expected_status_code)
+                self.last_outcome = CheckOutcome.UNCHANGED
                 return
 
             logger.debug("Checking availability of web service at %s...", self.url)
             status_code = self._http_client.get_response_code(self.url)
             self.request_log_service.log_request(status_code)
+            self.last_outcome = (
+                CheckOutcome.CHANGED if status_code == self.expected_status_code else CheckOutcome.UNCHANGED
+            )
             if status_code == self.expected_status_code:
                 self.send_email(
                     subject=f"Web service {self.name} returns status code {status_code}",
@@ -83,96 +111,336 @@ class UrlAvailabilityChecker(WebCheckerBase):
             self._logger.error(ex)
             raise FeedCheckFailedError from ex
 
+    def _monitor(self) -> None:
+        try:
+            response_timing = self._http_client.measure_response(self.url)
+            sample = AvailabilitySample(
+                response_timing.status_code,
+                response_timing.latency_ms,
+                response_timing.ttfb_ms,
+                response_timing.status_code == self.expected_status_code,
+            )
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self._logger.warning("%s: request to %s failed: %s", self.name, self.url, ex)
+            sample = AvailabilitySample(0, None, None, False)
+
+        self.request_log_service.log_request(
+            sample.status_code,
+            f"{sample.latency_ms:.1f}" if sample.latency_ms is not None else "",
+            f"{sample.ttfb_ms:.1f}" if sample.ttfb_ms is not None else "",
+        )
+        new_breaches, recoveries = self.availability_monitor.record(sample)
+        statistics = self.availability_monitor.statistics.get_statistics()
+        self._logger.debug("%s: %s", self.name, statistics)
+        self.last_outcome = CheckOutcome.CHANGED if new_breaches or recoveries else CheckOutcome.UNCHANGED
+        if new_breaches:
+            self.send_email(
+                subject=f"Web service {self.name}: {', '.join(new_breaches.values())}",
+                body=self._create_statistics_message(statistics, new_breaches.values()),
+            )
+        if recoveries:
+            self.send_email(
+                subject=f"Web service {self.name}: back within thresholds ({', '.join(recoveries)})",
+                body=self._create_statistics_message(statistics, self.availability_monitor.breaches.values()),
+            )
+
+    def _create_statistics_message(self, statistics: AvailabilityStatistics, breaches: Iterable[str]) -> str:
+        def format_ms(value: float | None) -> str:
+            return f"{value:.0f} ms" if value is not None else "-"
+
+        return "\n".join((
+            create_heading_one(f"Availability of {self.url}"),
+            create_table(
+                ["Samples", "Uptime", "p50", "p95", "p99"],
+                [(
+                    statistics.sample_count,
+                    f"{statistics.uptime_percent:.2f}%",
+                    format_ms(statistics.p50_ms),
+                    format_ms(statistics.p95_ms),
+                    format_ms(statistics.p99_ms),
+                )],
+            ),
+            *(create_paragraph(x) for x in breaches),
+        ))
+
+    def _create_availability_monitor(self) -> AvailabilityMonitor | None:
+        if not (monitoring_config := self.config.get(ConfigKeys.MONITORING)):
+            return None
+
+        return AvailabilityMonitor(
+            os.path.join(self.data_dir, "availability.json"),
+            AvailabilityThresholds.from_config(monitoring_config),
+            monitoring_config.get("window_size"),
+        )
+
+    def _is_service_available(self) -> bool:
+        last_status_code = self.request_log_service.get_last_request_value(value_index=1)
+        logger.debug("Last status code: %s", last_status_code)
+        return bool(last_status_code) and int(last_status_code) == self.expected_status_code
+
+
+class ContentRegion(NamedTuple):
+    """ Part of a page selected by a CSS selector. Each region has its own saved content """
+
+    name: str
+    css_selector: str
+    content_file_service: HtmlContentFileService
+    canonicalizer: HtmlCanonicalizer
+
 
 class PageContentChecker(WebCheckerBase):
+    """
+    Checks the content selected by css_selector or, if css_selectors is configured, the content of several named
+    regions of the page. The page is fetched and parsed once per check, and one email lists the changed regions.
+    """
+
     check_success: ClassVar[int] = int(True)
     check_failed: ClassVar[int] = int(False)
     saved_content_count: ClassVar[int] = 50
     _content_encoding: ClassVar[str] = "utf-8"
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments
             self,
             email_client: EmailClient,
             http_client: HTTPClientBase,
-            request_log_service: RequestLogService,
+            request_log_service: RequestLogServiceBase,
             config: dict,
+            document_cache: HtmlDocumentCache | None = None,
     ):
         super().__init__(email_client, request_log_service, config)
         self._logger = logging.getLogger("PageContentChecker")
         self._http_client = http_client
-        self.content_file_service = HtmlContentFileService(
-            os.path.join(self.config[ConfigKeys.DIR], "content"), slugify(self.name)
-        )
-        self.css_selector = self.config[ConfigKeys.CSS_SELECTOR]
+        self._document_cache = document_cache or HtmlDocumentCache(max_documents=0)
+        self.is_multi_region = ConfigKeys.CSS_SELECTORS in self.config
+        self.regions = self._create_regions()
+
+    @property
+    def content_file_service(self) -> HtmlContentFileService:
+        return self.regions[0].content_file_service
+
+    @property
+    def css_selector(self) -> str:
+        return self.regions[0].css_selector
+
+    def get_fetch_requests(self) -> list[FetchRequest]:
+        return [FetchRequest(self.url, self.http_validator_key)]
 
     def check(self) -> None:
         try:
             logger.debug("Checking content of web service at %s...", self.url)
-            if not (response := self._http_client.get_response_string(self.url)):
+            if (response := self._http_client.get_response_string(self.url, self.http_validator_key)) is None:
+                self._logger.info("Content not modified.")
+                self.request_log_service.log_request(int(False))
+                self.last_outcome = CheckOutcome.UNCHANGED
+                return
+            if not response:
                 self._logger.error("%s: Failed to get response from %s", self.name, self.url)
                 self.request_log_service.log_request(self.check_failed)
+                self.last_outcome = CheckOutcome.FAILED
                 return
 
-            response_content_bs = BeautifulSoup(response, "html.parser")
-            html_node = response_content_bs.select_one(self.css_selector)
-            html_node_str = str(html_node)
-            if is_content_updated := self._is_content_updated(str(html_node)):
-                self._logger.info("Content updated. Saving content...")
-                message_body = (f"{create_heading_one(f"Content of {self.name} at {self.url} has been updated.")}\n"
-                                f"{create_pre(self.content_file_service.get_diff(html_node_str))}")
+            html_nodes = self._select_regions(response)
+            contents = [region.canonicalizer.canonicalize(x) for region, x in zip(self.regions, html_nodes)]
+            if updated_regions := [
+                (region, content) for region, content in zip(self.regions, contents)
+                if self._is_content_updated(region.content_file_service, content)
+            ]:
+                self._logger.info("Content of %s region(s) updated. Saving content...", len(updated_regions))
                 self.send_email(
                     subject=f"{self.name}: content updated!",
-                    body=message_body,
+                    body=self._create_message_body(updated_regions),
                 )
             else:
                 self._logger.info("Content not updated.")
 
+            is_content_updated = bool(updated_regions)
             self.request_log_service.log_request(int(is_content_updated))
-            self.content_file_service.save_content(html_node_str.encode(encoding=self._content_encoding))
-            self.content_file_service.clean_up_content_dir()
+            self.last_outcome = CheckOutcome.CHANGED if is_content_updated else CheckOutcome.UNCHANGED
+            updated_region_names = {region.name for region, _ in updated_regions}
+            for region, html_node, content in zip(self.regions, html_nodes, contents):
+                self._record_suppressed_change(region, html_node, region.name in updated_region_names)
+                region.content_file_service.save_content(content.encode(encoding=self._content_encoding))
+                region.content_file_service.clean_up_content_dir()
+            if self.http_validator_key:
+                self._http_client.commit_validator(self.url, self.http_validator_key)
         except Exception as ex:
             self._logger.error(ex)
             raise FeedCheckFailedError from ex
 
-    def _is_content_updated(self, content: str) -> bool:
-        if not (saved_content := self.content_file_service.read_latest_content()):
+    def _create_regions(self) -> list[ContentRegion]:
+        """ One region named after the checker, if only css_selector is configured """
+        content_dir_path = os.path.join(self.config[ConfigKeys.DIR], "content")
+        if not self.is_multi_region:
+            return [self._create_region(
+                self.name,
+                self.config[ConfigKeys.CSS_SELECTOR],
+                content_dir_path,
+                os.path.join(self.config[ConfigKeys.DIR], "canonicalization.json"),
+            )]
+
+        regions = []
+        region_dir_names = set()
+        for region_name, css_selector in self.config[ConfigKeys.CSS_SELECTORS].items():
+            if (region_dir_name := slugify(region_name)) in region_dir_names:
+                raise ValueError(f"{self.name}: region {region_name} has the same directory as another region")
+            region_dir_names.add(region_dir_name)
+            region_dir_path = os.path.join(content_dir_path, region_dir_name)
+            regions.append(self._create_region(
+                region_name, css_selector, region_dir_path, os.path.join(region_dir_path, "canonicalization.json")
+            ))
+
+        return regions
+
+    def _create_region(
+            self, region_name: str, css_selector: str, content_dir_path: str, counter_file_path: str
+    ) -> ContentRegion:
+        return ContentRegion(
+            region_name,
+            css_selector,
+            HtmlContentFileService(
+                content_dir_path,
+                slugify(region_name),
+                SnapshotStorage(self.config.get(ConfigKeys.SNAPSHOT_STORAGE, SnapshotStorage.FILES)),
+                create_diff_engine(DiffEngineType(self.config.get(ConfigKeys.DIFF_ENGINE, DiffEngineType.MYERS))),
+            ),
+            HtmlCanonicalizer(
+                CanonicalizationConfiguration.from_config(self.config.get(ConfigKeys.CANONICALIZATION, {})),
+                SuppressedChangeCounter(counter_file_path) if ConfigKeys.CANONICALIZATION in self.config else None,
+            ),
+        )
+
+    def _select_regions(self, response: str) -> list[Tag | None]:
+        """ A single region may use scoped parsing. Several regions are selected from one parse of the page """
+        if not self.is_multi_region:
+            return [self._document_cache.select_one(response, self.css_selector)]
+
+        document = self._document_cache.get_document(response)
+        return [document.select_one(x.css_selector) for x in self.regions]
+
+    def _create_message_body(self, updated_regions: list[tuple[ContentRegion, str]]) -> str:
+        message_body = [create_heading_one(f"Content of {self.name} at {self.url} has been updated.")]
+        for region, content in updated_regions:
+            if self.is_multi_region:
+                message_body.append(create_heading_two(region.name))
+            message_body.append(create_pre(region.content_file_service.get_diff(content)))
+
+        return "\n".join(message_body)
+
+    def _record_suppressed_change(self, region: ContentRegion, html_node: Tag | None, is_content_updated: bool) -> None:
+        if region.canonicalizer.record_outcome(html_node, is_content_updated):
+            self._logger.info(
+                "%s: change of %s suppressed by canonicalization (%s in total).",
+                self.name,
+                region.name,
+                region.canonicalizer.suppressed_change_counter.count,
+            )
+
+    def _is_content_updated(self, content_file_service: HtmlContentFileService, content: str) -> bool:
+        if not (latest_digest := content_file_service.get_latest_digest()):
             return False
 
-        return not hash_equals(content.encode(encoding=self._content_encoding), saved_content)
+        return content_digest(content.encode(encoding=self._content_encoding)) != latest_digest
+
+
+class FetchPath(StrEnum):
+    STATIC = "static"
+    DYNAMIC = "dynamic"
 
 
-class PageContentCheckerDynamic(WebCheckerBase):
+class FetchPathMemory:
+    """
+    Remembers which path found the content of a dynamic page. The static path (plain HTTP request) is tried first
+    and tried again after static_probe_interval checks on the dynamic path (browser), in case the page has changed.
+    """
+
+    def __init__(self, state_file_path: str, static_first: bool, static_probe_interval: int):
+        self.static_first = static_first
+        self.static_probe_interval = static_probe_interval
+        self._state_file = JsonStateFile(state_file_path)
+        state = self._state_file.load()
+        self.path = FetchPath(state.get("path", FetchPath.STATIC))
+        self.dynamic_checks = state.get("dynamic_checks", 0)
+
+    def get_next_path(self) -> FetchPath:
+        if not self.static_first:
+            return FetchPath.DYNAMIC
+        if self.path == FetchPath.STATIC or self.dynamic_checks >= self.static_probe_interval:
+            return FetchPath.STATIC
+
+        return FetchPath.DYNAMIC
+
+    def record(self, path: FetchPath, static_tried: bool) -> None:
+        if path == FetchPath.STATIC or static_tried:
+            self.dynamic_checks = 0
+        else:
+            self.dynamic_checks += 1
+        self.path = path
+        self._state_file.save({"path": self.path, "dynamic_checks": self.dynamic_checks})
+
+
+class PageContentCheckerDynamic(WebCheckerBase):  # pylint: disable=too-many-instance-attributes
+    """
+    Checks content rendered by JavaScript. The content is selected from the plain HTML first, if it's there,
+    so the browser is only used for pages that need it.
+    """
+
     check_success: ClassVar[int] = int(True)
     check_failed: ClassVar[int] = int(False)
     saved_content_count: ClassVar[int] = 50
+    static_probe_interval: ClassVar[int] = 24
     _content_encoding: ClassVar[str] = "utf-8"
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
             self,
             email_client: EmailClient,
             http_client: HTTPClientDynamicBase,
-            request_log_service: RequestLogService,
+            request_log_service: RequestLogServiceBase,
             config: dict,
+            http_client_static: HTTPClientBase | None = None,
+            document_cache: HtmlDocumentCache | None = None,
     ):
         super().__init__(email_client, request_log_service, config)
         self._logger = logging.getLogger("PageContentCheckerDynamic")
         self._http_client = http_client
+        self._http_client_static = http_client_static
+        self._document_cache = document_cache or HtmlDocumentCache(max_documents=0)
         self.content_file_service = HtmlContentFileService(
-            os.path.join(self.config[ConfigKeys.DIR], "content"), slugify(self.name)
+            os.path.join(self.config[ConfigKeys.DIR], "content"),
+            slugify(self.name),
+            SnapshotStorage(self.config.get(ConfigKeys.SNAPSHOT_STORAGE, SnapshotStorage.FILES)),
+            create_diff_engine(DiffEngineType(self.config.get(ConfigKeys.DIFF_ENGINE, DiffEngineType.MYERS))),
+        )
+        self.fetch_path_memory = FetchPathMemory(
+            os.path.join(self.config[ConfigKeys.DIR], "fetch_path.json"),
+            static_first=bool(http_client_static) and self.config.get(ConfigKeys.STATIC_FIRST, True),
+            static_probe_interval=self.static_probe_interval,
         )
         self.css_selector_loaded = self.config[ConfigKeys.CSS_SELECTOR_LOADED]
         self.css_selector_content = self.config[ConfigKeys.CSS_SELECTOR_CONTENT]
+        self.render_profile = RenderProfile.create(
+            RenderProfileType(self.config.get(ConfigKeys.RENDER_PROFILE, RenderProfileType.DEFAULT)),
+            disable_css=self.config.get(ConfigKeys.DISABLE_CSS, False),
+        )
+
+    def get_fetch_requests(self) -> list[FetchRequest]:
+        if self.fetch_path_memory.get_next_path() == FetchPath.DYNAMIC:
+            return []
+
+        return [FetchRequest(self.url, self._get_static_validator_key())]
 
     def check(self) -> None:
         try:
             logger.debug("Checking content of web service at %s...", self.url)
-            if not (
-                    response := self._http_client.get_content_by_css_selector(
-                        self.url, self.css_selector_loaded, self.css_selector_content
-                    )
-            ):
+            fetch_path, response = self._get_content()
+            if response is None:
+                self._logger.info("Content not modified.")
+                self.request_log_service.log_request(int(False))
+                self.last_outcome = CheckOutcome.UNCHANGED
+                return
+            if not response:
                 self._logger.error("%s: Failed to get response from %s", self.name, self.url)
                 self.request_log_service.log_request(self.check_failed)
+                self.last_outcome = CheckOutcome.FAILED
                 return
 
             response_str = str(response)
@@ -187,14 +455,78 @@ class PageContentCheckerDynamic(WebCheckerBase):
                 self._logger.info("Content not updated.")
 
             self.request_log_service.log_request(int(is_content_updated))
+            self.last_outcome = CheckOutcome.CHANGED if is_content_updated else CheckOutcome.UNCHANGED
             self.content_file_service.save_content(response_str.encode(encoding=self._content_encoding))
             self.content_file_service.clean_up_content_dir()
+            if fetch_path == FetchPath.STATIC and (validator_key := self._get_static_validator_key()):
+                self._http_client_static.commit_validator(self.url, validator_key)
         except Exception as ex:
             self._logger.error(ex)
             raise FeedCheckFailedError from ex
 
+    def cancel(self) -> None:
+        self._http_client.cancel(self.url)
+
+    def _log_load_metrics(self) -> None:
+        if not (load_metrics := self._http_client.get_load_metrics(self.url)):
+            return
+
+        self._logger.info(
+            "%s: page loaded in %.0f ms (load event: %s ms, %s resources, %s bytes transferred)",
+            self.name,
+            load_metrics.wall_time_ms,
+            load_metrics.load_event_ms,
+            load_metrics.resource_count,
+            load_metrics.transfer_bytes,
+        )
+
+    def _get_content(self) -> tuple[FetchPath, str | None]:
+        """
+        Returns the path that found the content and the content serialized by BeautifulSoup, so it doesn't change
+        with the path. The content is None, if the static path is used and the page hasn't been modified
+        """
+        static_tried = self.fetch_path_memory.get_next_path() == FetchPath.STATIC
+        if static_tried:
+            if (content := self._get_content_static()) is None or content:
+                self.fetch_path_memory.record(FetchPath.STATIC, static_tried)
+                return FetchPath.STATIC, content
+            self._logger.info("%s: content not found in the HTML of %s. Using browser...", self.name, self.url)
+
+        content = self._http_client.get_content_by_css_selector(
+            self.url, self.css_selector_loaded, self.css_selector_content, self.render_profile
+        )
+        self._log_load_metrics()
+        if content:
+            self.fetch_path_memory.record(FetchPath.DYNAMIC, static_tried)
+            content = str(
+                self._document_cache.select_one(content, self.css_selector_content)
+                or self._document_cache.get_document(content)
+            )
+
+        return FetchPath.DYNAMIC, content
+
+    def _get_content_static(self) -> str | None:
+        """
+        Returns None if the page hasn't been modified and an empty string, if the content isn't found.
+        The content is only found, if the plain HTML matches css_selector_loaded too and the content node has text,
+        so an empty placeholder filled in by JavaScript isn't taken for the content
+        """
+        if (response := self._http_client_static.get_response_string(
+                self.url, self._get_static_validator_key())
+        ) is None:
+            return None
+        if not response or self._document_cache.select_one(response, self.css_selector_loaded) is None:
+            return ""
+
+        html_node = self._document_cache.select_one(response, self.css_selector_content)
+        return str(html_node) if html_node and html_node.get_text(strip=True) else ""
+
+    def _get_static_validator_key(self) -> str | None:
+        """ Conditional requests are only sent, when the static path is known to find the content """
+        return self.http_validator_key if self.fetch_path_memory.path == FetchPath.STATIC else None
+
     def _is_content_updated(self, content: str) -> bool:
-        if not (saved_content := self.content_file_service.read_latest_content()):
+        if not (latest_digest := self.content_file_service.get_latest_digest()):
             return False
 
-        return not hash_equals(content.encode(encoding=self._content_encoding), saved_content)
+        return content_digest(content.encode(encoding=self._content_encoding)) != latest_digest
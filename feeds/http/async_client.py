@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Coroutine, Sequence
+from typing import Any
+
+import aiohttp
+
+from feeds.http.client import CoalescingHTTPClientBase, FetchRequest, HTTPResponse
+from feeds.http.pool import ConnectionPoolCounter, ConnectionPoolStats, PoolConfiguration
+from feeds.http.validator import Validator, ValidatorCache
+
+
+class HTTPClientAsync(CoalescingHTTPClientBase):
+    """
+    HTTP client running aiohttp on a background event loop. Implements the synchronous HTTPClientBase contract
+    and a batch API, which fetches many URLs concurrently under a global and a per-host concurrency limit.
+    Prefetched responses answer the matching requests for coalesce_ttl_seconds.
+    """
+
+    def __init__(
+            self,
+            headers: dict[str, str],
+            pool_configuration: PoolConfiguration | None = None,
+            validator_cache: ValidatorCache | None = None,
+    ) -> None:
+        super().__init__(headers, pool_configuration, validator_cache)
+        self._logger = logging.getLogger("HTTPClientAsync")
+        self._counter = ConnectionPoolCounter()
+        self._loop = asyncio.new_event_loop()
+        self._session: aiohttp.ClientSession | None = None
+        threading.Thread(target=self._loop.run_forever, name="HTTPClientAsync", daemon=True).start()
+
+    def prefetch(self, fetch_requests: Sequence[FetchRequest]) -> None:
+        self._prefetch(fetch_requests)
+
+    def fetch_many(self, fetch_requests: Sequence[FetchRequest]) -> dict[FetchRequest, HTTPResponse]:
+        """ Fetch all requests concurrently. Failed requests are logged and left out of the result """
+        request_keys, responses = self._prefetch(fetch_requests)
+        return {x: responses[request_keys[x]] for x in fetch_requests if request_keys[x] in responses}
+
+    def _prefetch(
+            self, fetch_requests: Sequence[FetchRequest]
+    ) -> tuple[dict[FetchRequest, Any], dict[Any, HTTPResponse]]:
+        """ Returns the request key of each fetch request and the responses of the successful requests by key """
+        request_keys = {}
+        requests_by_key = {}
+        for fetch_request in fetch_requests:
+            conditional_headers = self._validator_cache.get_request_headers(
+                fetch_request.validator_key, fetch_request.url
+            )
+            request_keys[fetch_request] = self._get_request_key(fetch_request.url, conditional_headers)
+            requests_by_key[request_keys[fetch_request]] = (
+                fetch_request.url,
+                {**self._headers, **conditional_headers},
+            )
+
+        time_start = time.perf_counter()
+        responses = self._run(self._fetch_many(requests_by_key))
+        for request_key, response in responses.items():
+            self._coalescer.put(request_key, response)
+        self._logger.info(
+            "Fetched %s of %s URLs in %.2f seconds",
+            len(responses),
+            len(requests_by_key),
+            time.perf_counter() - time_start,
+        )
+
+        return request_keys, responses
+
+    def get_pool_stats(self) -> ConnectionPoolStats:
+        return self._counter.stats()
+
+    def close(self) -> None:
+        if self._session:
+            self._run(self._session.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def _fetch(self, url: str, headers: dict[str, str]) -> HTTPResponse:
+        return self._run(self._fetch_async(url, headers))
+
+    def _run(self, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _fetch_many(
+            self, requests_by_key: dict[Any, tuple[str, dict[str, str]]]
+    ) -> dict[Any, HTTPResponse]:
+        results = await asyncio.gather(
+            *(self._fetch_async(url, headers) for url, headers in requests_by_key.values()), return_exceptions=True
+        )
+        responses = {}
+        for (request_key, (url, _)), result in zip(requests_by_key.items(), results):
+            if isinstance(result, BaseException):
+                self._logger.error("Failed to fetch %s: %s", url, result)
+                continue
+            responses[request_key] = result
+
+        return responses
+
+    async def _fetch_async(self, url: str, headers: dict[str, str]) -> HTTPResponse:
+        session = await self._get_session()
+        start_time = time.perf_counter()
+        async with session.get(url, headers=headers) as response:
+            ttfb_ms = (time.perf_counter() - start_time) * 1000
+            content = await response.read()
+            return HTTPResponse(
+                status_code=response.status,
+                content=content.decode(encoding="utf-8", errors="ignore"),
+                validator=Validator.from_response_headers(response.headers),
+                latency_ms=(time.perf_counter() - start_time) * 1000,
+                ttfb_ms=ttfb_ms,
+            )
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self._pool_configuration.max_concurrency,
+                limit_per_host=self._pool_configuration.pool_maxsize,
+                force_close=not self._pool_configuration.keep_alive,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self._timeout_seconds),
+                trace_configs=[self._create_trace_config()],
+            )
+
+        return self._session
+
+    def _create_trace_config(self) -> aiohttp.TraceConfig:
+        async def on_connection_reuse(*_) -> None:
+            self._counter.record(reused=True)
+
+        async def on_connection_create(*_) -> None:
+            self._counter.record(reused=False)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_reuseconn.append(on_connection_reuse)
+        trace_config.on_connection_create_end.append(on_connection_create)
+        return trace_config
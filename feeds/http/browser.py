@@ -0,0 +1,227 @@
+import dataclasses
+import logging
+import os
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from enum import StrEnum
+from typing import Any
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class RenderProfileType(StrEnum):
+    DEFAULT = "default"
+    LEAN = "lean"
+
+
+@dataclasses.dataclass(frozen=True)
+class RenderProfile:
+    """ Resource types the browser doesn't load. The lean profile blocks everything not needed to read the DOM """
+
+    block_images: bool = False
+    block_fonts: bool = False
+    block_media: bool = False
+    block_trackers: bool = False
+    disable_css: bool = False
+
+    @classmethod
+    def create(cls, profile_type: RenderProfileType, disable_css: bool = False) -> "RenderProfile":
+        if profile_type == RenderProfileType.LEAN:
+            return cls(
+                block_images=True, block_fonts=True, block_media=True, block_trackers=True, disable_css=disable_css
+            )
+
+        return cls(disable_css=disable_css)
+
+    def get_firefox_preferences(self) -> dict[str, Any]:
+        preferences = {}
+        if self.block_images:
+            preferences["permissions.default.image"] = 2
+        if self.block_fonts:
+            preferences["browser.display.use_document_fonts"] = 0
+            preferences["gfx.downloadable_fonts.enabled"] = False
+        if self.block_media:
+            preferences["media.autoplay.default"] = 5
+            preferences["media.mediasource.enabled"] = False
+            preferences["media.peerconnection.enabled"] = False
+        if self.block_trackers:
+            preferences["privacy.trackingprotection.enabled"] = True
+            preferences["privacy.trackingprotection.socialtracking.enabled"] = True
+            preferences["privacy.trackingprotection.cryptomining.enabled"] = True
+            preferences["privacy.trackingprotection.fingerprinting.enabled"] = True
+        if self.disable_css:
+            preferences["permissions.default.stylesheet"] = 2
+
+        return preferences
+
+
+@dataclasses.dataclass(frozen=True)
+class PageLoadMetrics:
+    wall_time_ms: float
+    load_event_ms: float | None
+    dom_content_loaded_ms: float | None
+    transfer_bytes: int
+    resource_count: int
+
+
+PAGE_LOAD_METRICS_SCRIPT = """
+const navigation = performance.getEntriesByType("navigation")[0];
+const resources = performance.getEntriesByType("resource");
+return {
+    load_event_ms: navigation && navigation.loadEventEnd ? navigation.loadEventEnd : null,
+    dom_content_loaded_ms: navigation ? navigation.domContentLoadedEventEnd : null,
+    transfer_bytes: (navigation ? navigation.transferSize : 0)
+        + resources.reduce((total, resource) => total + (resource.transferSize || 0), 0),
+    resource_count: resources.length,
+};
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class BrowserPoolConfiguration:
+    pool_size: int = 2
+    max_pages_per_browser: int = 50
+    max_memory_mb: int = 1024
+
+
+@dataclasses.dataclass
+class PooledBrowser:
+    driver: WebDriver
+    base_window_handle: str
+    pages_loaded: int = 0
+
+
+class BrowserPool:  # pylint: disable=too-many-instance-attributes
+    """
+    Long-lived pool of browser instances. Each lease gets a fresh tab in an idle browser (or a new browser, if
+    fewer than pool_size are running). Browsers are recycled after max_pages_per_browser pages, when their memory
+    usage crosses max_memory_mb or when they fail (e.g. because a timed out check has killed them).
+    Pools can share browser_slots, so pool_size caps the browsers of all of them. A pool waiting for a slot calls
+    reclaim_browser_slot, which should quit an idle browser of another pool and return whether it did.
+    """
+
+    _proc_dir = "/proc"
+    _slot_wait_seconds = 1
+
+    def __init__(
+            self,
+            configuration: BrowserPoolConfiguration,
+            create_driver: Callable[[], WebDriver],
+            browser_slots: threading.Semaphore | None = None,
+            reclaim_browser_slot: Callable[[], bool] | None = None,
+    ):
+        self.configuration = configuration
+        self._create_driver = create_driver
+        self._logger = logging.getLogger("BrowserPool")
+        self._lock = threading.Lock()
+        self._browser_slots = browser_slots or threading.Semaphore(configuration.pool_size)
+        self._reclaim_browser_slot = reclaim_browser_slot
+        self._idle_browsers: list[PooledBrowser] = []
+        self._closed = False
+
+    @contextmanager
+    def lease(self) -> Iterator[WebDriver]:
+        browser = self._get_idle_browser() or self._start_browser()
+        try:
+            browser.driver.switch_to.new_window("tab")
+            yield browser.driver
+        finally:
+            self._release(browser)
+
+    def quit_idle_browser(self) -> bool:
+        """ Quits one idle browser, so its slot can be used by another pool. Returns False without idle browsers """
+        with self._lock:
+            if not self._idle_browsers:
+                return False
+            browser = self._idle_browsers.pop()
+        self._quit(browser)
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            browsers, self._idle_browsers = self._idle_browsers, []
+        for browser in browsers:
+            self._quit(browser)
+
+    def _get_idle_browser(self) -> PooledBrowser | None:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed")
+            return self._idle_browsers.pop() if self._idle_browsers else None
+
+    def _start_browser(self) -> PooledBrowser:
+        self._acquire_browser_slot()
+        self._logger.info("Starting new browser...")
+        try:
+            driver = self._create_driver()
+            return PooledBrowser(driver=driver, base_window_handle=driver.current_window_handle)
+        except Exception:
+            self._browser_slots.release()
+            raise
+
+    def _acquire_browser_slot(self) -> None:
+        """ Waits for a browser slot. Idle browsers of other pools are quit, while all slots are taken """
+        while not self._browser_slots.acquire(blocking=False):
+            if not (self._reclaim_browser_slot and self._reclaim_browser_slot()):
+                if self._browser_slots.acquire(timeout=self._slot_wait_seconds):
+                    return
+
+    def _release(self, browser: PooledBrowser) -> None:
+        browser.pages_loaded += 1
+        try:
+            browser.driver.close()
+            browser.driver.switch_to.window(browser.base_window_handle)
+        except WebDriverException as ex:
+            self._logger.warning("Browser failed while closing tab. Browser is discarded: %s", ex)
+            self._quit(browser)
+            return
+
+        if self._should_recycle(browser):
+            self._quit(browser)
+            return
+
+        with self._lock:
+            if not self._closed:
+                self._idle_browsers.append(browser)
+                return
+        self._quit(browser)
+
+    def _should_recycle(self, browser: PooledBrowser) -> bool:
+        if browser.pages_loaded >= self.configuration.max_pages_per_browser:
+            self._logger.info("Recycling browser after %s pages", browser.pages_loaded)
+            return True
+
+        pid = browser.driver.capabilities.get("moz:processID")
+        if pid and (memory_mb := self._get_memory_usage_mb(pid)) > self.configuration.max_memory_mb:
+            self._logger.info("Recycling browser using %.0f MB memory", memory_mb)
+            return True
+
+        return False
+
+    def _quit(self, browser: PooledBrowser) -> None:
+        try:
+            browser.driver.quit()
+        except WebDriverException as ex:
+            self._logger.debug("Failed to quit browser: %s", ex)
+        finally:
+            self._browser_slots.release()
+
+    def _get_memory_usage_mb(self, pid: int) -> float:
+        """ Resident memory of the browser process and its child processes (Linux only, 0 elsewhere) """
+        memory_kb = 0
+        pids = [pid]
+        while pids:
+            current_pid = pids.pop()
+            try:
+                with open(os.path.join(self._proc_dir, str(current_pid), "status"), "r", encoding="utf-8") as file:
+                    memory_kb += next((int(x.split()[1]) for x in file if x.startswith("VmRSS:")), 0)
+                children_path = os.path.join(self._proc_dir, str(current_pid), "task", str(current_pid), "children")
+                with open(children_path, "r", encoding="utf-8") as file:
+                    pids.extend(int(x) for x in file.read().split())
+            except OSError:
+                continue
+
+        return memory_kb / 1024
@@ -1,62 +1,325 @@
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from typing import NamedTuple
+
 import requests
 from selenium.webdriver import Firefox
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+from feeds.http.browser import (
+    PAGE_LOAD_METRICS_SCRIPT,
+    BrowserPool,
+    BrowserPoolConfiguration,
+    PageLoadMetrics,
+    RenderProfile,
+)
+from feeds.http.coalesce import RequestCoalescer
+from feeds.http.pool import ConnectionPoolStats, CountingHTTPAdapter, PoolConfiguration
+from feeds.http.validator import Validator, ValidatorCache
+
+
+class FetchRequest(NamedTuple):
+    url: str
+    validator_key: str | None = None
+
+
+class ResponseTiming(NamedTuple):
+    status_code: int
+    latency_ms: float
+    ttfb_ms: float
+
 
 class HTTPClientBase:
-    def get_response_string(self, url: str) -> str:
-        """Should be overwritten by subclasses"""
+    def get_response_string(self, url: str, validator_key: str | None = None) -> str | None:
+        """
+        Should be overwritten by subclasses
+        url: str: URL to get content from
+        validator_key: str | None: if set, the request is conditional on the validators (ETag/Last-Modified) saved
+        for the key and URL. None is returned, if the content hasn't been modified since.
+        Returns an empty string, if the request fails
+        """
         raise NotImplementedError
 
+    def commit_validator(self, url: str, validator_key: str) -> None:
+        """
+        Should be overwritten by subclasses supporting conditional requests.
+        Saves the validators of the latest response for the key and URL. Should be called,
+        when the response has been processed successfully, so a failed check doesn't lose a change.
+        """
+
+    def prefetch(self, fetch_requests: Sequence[FetchRequest]) -> None:
+        """
+        Should be overwritten by subclasses supporting batch requests.
+        Fetches upcoming requests in one batch, so the following calls to get_response_string/get_response_code
+        with the same arguments are answered from the batch.
+        """
+
     def get_response_code(self, url: str) -> int:
         """Should be overwritten by subclasses"""
         raise NotImplementedError
 
+    def measure_response(self, url: str) -> ResponseTiming:
+        """
+        Should be overwritten by subclasses
+        Sends a new request (never answered from coalesced or prefetched responses) and returns its status code,
+        total time and time to first byte. Raises an exception, if the request fails
+        """
+        raise NotImplementedError
+
 
 class HTTPClientDynamicBase:
-    def get_content_by_css_selector(self, url: str, css_selector_loaded: str, css_selector_content: str) -> str:
+    def get_content_by_css_selector(
+            self,
+            url: str,
+            css_selector_loaded: str,
+            css_selector_content: str,
+            render_profile: RenderProfile | None = None,
+    ) -> str:
         """
         Should be overwritten by subclasses
         url: str: URL to get content from
         css_selector_loaded: str: CSS selector to wait for before getting content
         css_selector_content: str: CSS selector to get content from
+        render_profile: RenderProfile | None: resources to block when loading the page. Nothing is blocked by default
         """
         raise NotImplementedError
 
+    def get_load_metrics(self, url: str) -> PageLoadMetrics | None:
+        """Load metrics of the latest page load of the URL. Should be overwritten by subclasses"""
+
+    def cancel(self, url: str) -> None:
+        """Abort running page loads of the URL. Should be overwritten by subclasses"""
 
-class HTTPClient(HTTPClientBase):
-    def __init__(self, headers: dict[str, str]) -> None:
+    def close(self) -> None:
+        """Release browsers etc. Should be overwritten by subclasses holding resources"""
+
+
+class HTTPResponse(NamedTuple):
+    status_code: int
+    content: str
+    validator: Validator
+    latency_ms: float = 0.0
+    ttfb_ms: float = 0.0
+
+
+class CoalescingHTTPClientBase(HTTPClientBase):
+    """
+    Base class for HTTP clients supporting conditional requests. Identical requests in flight or sent within
+    the last coalesce_ttl_seconds are merged, so checkers sharing a URL get the same response object.
+    """
+
+    def __init__(
+            self,
+            headers: dict[str, str],
+            pool_configuration: PoolConfiguration | None = None,
+            validator_cache: ValidatorCache | None = None,
+    ) -> None:
         self._headers = headers
         self._timeout_seconds = 60
+        self._pool_configuration = pool_configuration or PoolConfiguration()
+        self._validator_cache = validator_cache or ValidatorCache()
+        self._coalescer: RequestCoalescer[HTTPResponse] = RequestCoalescer(
+            self._pool_configuration.coalesce_ttl_seconds
+        )
 
-    def get_response_string(self, url: str) -> str:
-        response = requests.get(url, headers=self._headers, timeout=self._timeout_seconds)
+    def get_response_string(self, url: str, validator_key: str | None = None) -> str | None:
+        conditional_headers = self._validator_cache.get_request_headers(validator_key, url)
+        response = self._get_response(url, conditional_headers)
+        if response.status_code == 304 and conditional_headers:
+            return None
         if response.status_code != 200:
             return ""
 
-        return response.content.decode(encoding="utf-8", errors="ignore")
+        if validator_key:
+            self._validator_cache.stage(validator_key, url, response.validator)
+
+        return response.content
 
     def get_response_code(self, url: str) -> int:
-        response = requests.get(url, headers=self._headers, timeout=self._timeout_seconds)
-        return response.status_code
+        return self._get_response(url, {}).status_code
+
+    def measure_response(self, url: str) -> ResponseTiming:
+        response = self._fetch(url, dict(self._headers))
+        return ResponseTiming(response.status_code, response.latency_ms, response.ttfb_ms)
 
+    def commit_validator(self, url: str, validator_key: str) -> None:
+        self._validator_cache.commit(validator_key, url)
 
-class HTTPClientDynamic(HTTPClientDynamicBase):
-    def __init__(self, headers: dict[str, str]) -> None:
+    def _get_response(self, url: str, conditional_headers: dict[str, str]) -> HTTPResponse:
+        return self._coalescer.get(
+            self._get_request_key(url, conditional_headers),
+            lambda: self._fetch(url, {**self._headers, **conditional_headers}),
+        )
+
+    @staticmethod
+    def _get_request_key(url: str, conditional_headers: dict[str, str]) -> tuple[str, tuple[tuple[str, str], ...]]:
+        return url, tuple(sorted(conditional_headers.items()))
+
+    def _fetch(self, url: str, headers: dict[str, str]) -> HTTPResponse:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+
+class HTTPClient(CoalescingHTTPClientBase):
+    """ HTTP client sharing one session, which keeps a pool of keep-alive connections per host """
+
+    def __init__(
+            self,
+            headers: dict[str, str],
+            pool_configuration: PoolConfiguration | None = None,
+            validator_cache: ValidatorCache | None = None,
+    ) -> None:
+        super().__init__(headers, pool_configuration, validator_cache)
+        self._adapter = CountingHTTPAdapter(
+            pool_connections=self._pool_configuration.pool_connections,
+            pool_maxsize=self._pool_configuration.pool_maxsize,
+        )
+        self._session = self._create_session()
+
+    def get_pool_stats(self) -> ConnectionPoolStats:
+        return self._adapter.counter.stats()
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _fetch(self, url: str, headers: dict[str, str]) -> HTTPResponse:
+        start_time = time.perf_counter()
+        response = self._session.get(url, headers=headers, timeout=self._timeout_seconds)
+        return HTTPResponse(
+            status_code=response.status_code,
+            content=response.content.decode(encoding="utf-8", errors="ignore"),
+            validator=Validator.from_response_headers(response.headers),
+            latency_ms=(time.perf_counter() - start_time) * 1000,
+            ttfb_ms=response.elapsed.total_seconds() * 1000,
+        )
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
+        if not self._pool_configuration.keep_alive:
+            session.headers["Connection"] = "close"
+
+        return session
+
+
+class HTTPClientDynamic(HTTPClientDynamicBase):  # pylint: disable=too-many-instance-attributes
+    """
+    Loads pages in tabs of pools of long-lived headless Firefox browsers. Browsers are configured with a render
+    profile at startup, so there is a pool per render profile in use. The pools share pool_size browser slots.
+    """
+
+    _timeout_seconds = 10
+    _page_load_timeout_seconds = 60
+
+    def __init__(self, headers: dict[str, str], browser_pool_configuration: BrowserPoolConfiguration | None = None):
         self._headers = headers
-        self._timeout_seconds = 10
+        self._browser_pool_configuration = browser_pool_configuration or BrowserPoolConfiguration()
+        self._logger = logging.getLogger("HTTPClientDynamic")
+        self._browser_pools: dict[RenderProfile, BrowserPool] = {}
+        self._browser_slots = threading.Semaphore(self._browser_pool_configuration.pool_size)
+        self._drivers_by_url: dict[str, list[WebDriver]] = {}
+        self._load_metrics_by_url: dict[str, PageLoadMetrics] = {}
+        self._lock = threading.Lock()
+
+    def get_content_by_css_selector(
+            self,
+            url: str,
+            css_selector_loaded: str,
+            css_selector_content: str,
+            render_profile: RenderProfile | None = None,
+    ) -> str:
+        with self._get_browser_pool(render_profile or RenderProfile()).lease() as driver:
+            self._register_driver(url, driver)
+            try:
+                start_time = time.perf_counter()
+                driver.get(url)
+                _ = WebDriverWait(driver, timeout=self._timeout_seconds).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, css_selector_loaded))
+                )
+                content_html_element = driver.find_element(By.CSS_SELECTOR, css_selector_content)
+                content = content_html_element.get_attribute("outerHTML")
+                self._record_load_metrics(url, driver, (time.perf_counter() - start_time) * 1000)
+
+                return content
+            finally:
+                self._unregister_driver(url, driver)
+
+    def get_load_metrics(self, url: str) -> PageLoadMetrics | None:
+        with self._lock:
+            return self._load_metrics_by_url.get(url)
+
+    def close(self) -> None:
+        with self._lock:
+            browser_pools = list(self._browser_pools.values())
+        for browser_pool in browser_pools:
+            browser_pool.close()
+
+    def cancel(self, url: str) -> None:
+        with self._lock:
+            drivers = self._drivers_by_url.pop(url, [])
+        for driver in drivers:
+            self._logger.info("Killing browser loading %s...", url)
+            driver.quit()
+
+    def _get_browser_pool(self, render_profile: RenderProfile) -> BrowserPool:
+        with self._lock:
+            if (browser_pool := self._browser_pools.get(render_profile)) is None:
+                browser_pool = BrowserPool(
+                    self._browser_pool_configuration,
+                    lambda: self._create_driver(render_profile),
+                    self._browser_slots,
+                    self._quit_idle_browser,
+                )
+                self._browser_pools[render_profile] = browser_pool
 
-    def get_content_by_css_selector(self, url: str, css_selector_loaded: str, css_selector_content) -> str:
+            return browser_pool
+
+    def _quit_idle_browser(self) -> bool:
+        with self._lock:
+            browser_pools = list(self._browser_pools.values())
+
+        return any(browser_pool.quit_idle_browser() for browser_pool in browser_pools)
+
+    def _create_driver(self, render_profile: RenderProfile) -> WebDriver:
         driver_options = Options()
         driver_options.add_argument("--headless")
-        with Firefox(options=driver_options) as driver:
-            driver.get(url)
-            _ = WebDriverWait(driver, timeout=self._timeout_seconds).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, css_selector_loaded))
-            )
-            content_html_element = driver.find_element(By.CSS_SELECTOR, css_selector_content)
-
-            return content_html_element.get_attribute("outerHTML")
+        for name, value in render_profile.get_firefox_preferences().items():
+            driver_options.set_preference(name, value)
+        driver = Firefox(options=driver_options)
+        driver.set_page_load_timeout(self._page_load_timeout_seconds)
+        return driver
+
+    def _record_load_metrics(self, url: str, driver: WebDriver, wall_time_ms: float) -> None:
+        try:
+            timing = driver.execute_script(PAGE_LOAD_METRICS_SCRIPT) or {}
+        except WebDriverException as ex:
+            self._logger.warning("Failed to read page load timing for %s: %s", url, ex)
+            timing = {}
+
+        load_metrics = PageLoadMetrics(
+            wall_time_ms=wall_time_ms,
+            load_event_ms=timing.get("load_event_ms"),
+            dom_content_loaded_ms=timing.get("dom_content_loaded_ms"),
+            transfer_bytes=int(timing.get("transfer_bytes") or 0),
+            resource_count=int(timing.get("resource_count") or 0),
+        )
+        self._logger.debug("Loaded %s: %s", url, load_metrics)
+        with self._lock:
+            self._load_metrics_by_url[url] = load_metrics
+
+    def _register_driver(self, url: str, driver: WebDriver) -> None:
+        with self._lock:
+            self._drivers_by_url.setdefault(url, []).append(driver)
+
+    def _unregister_driver(self, url: str, driver: WebDriver) -> None:
+        with self._lock:
+            if driver in (drivers := self._drivers_by_url.get(url, [])):
+                drivers.remove(driver)
@@ -0,0 +1,67 @@
+import logging
+import threading
+import time
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class RequestCoalescer(Generic[T]):
+    """
+    Merges identical requests: callers asking for a key, which is being fetched or has been fetched within the
+    last ttl_seconds, get the same result object instead of fetching it again. Failed fetches are not kept.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._logger = logging.getLogger("RequestCoalescer")
+        self._lock = threading.Lock()
+        self._futures: dict[Hashable, tuple[Future, float | None]] = {}
+
+    def get(self, key: Hashable, fetch: Callable[[], T]) -> T:
+        with self._lock:
+            self._remove_expired()
+            if entry := self._futures.get(key):
+                self._logger.debug("Coalescing request %s", key)
+                future = entry[0]
+                is_owner = False
+            else:
+                future = Future()
+                self._futures[key] = (future, None)
+                is_owner = True
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = fetch()
+        except BaseException as ex:
+            with self._lock:
+                self._futures.pop(key, None)
+            future.set_exception(ex)
+            raise
+
+        self._complete(key, future, result)
+        return result
+
+    def put(self, key: Hashable, result: T) -> None:
+        """ Add an already fetched result, e.g. from a batch request """
+        self._complete(key, Future(), result)
+
+    def _complete(self, key: Hashable, future: Future, result: T) -> None:
+        with self._lock:
+            self._futures[key] = (future, time.monotonic())
+        if not future.done():
+            future.set_result(result)
+
+    def _remove_expired(self) -> None:
+        now = time.monotonic()
+        expired_keys = [
+            key
+            for key, (_, completed_at) in self._futures.items()
+            if completed_at is not None and now - completed_at > self.ttl_seconds
+        ]
+        for key in expired_keys:
+            del self._futures[key]
@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+
+class RequestRecord(NamedTuple):
+    checker: str
+    timestamp: str
+    values: list[str]
+
+
+class RequestHistoryDatabase:
+    """
+    Request logs of all checkers in one SQLite database (WAL mode). Records are buffered and inserted in batches
+    of batch_size, and before they are queried. Records older than retention_days are removed when the database is
+    opened and closed, and by apply_retention(), which long-running jobs should call periodically (e.g. daily).
+    Call close() on shutdown to insert the buffered records.
+    """
+
+    _schema = (
+        "CREATE TABLE IF NOT EXISTS requests ("
+        "id INTEGER PRIMARY KEY, checker TEXT NOT NULL, timestamp TEXT NOT NULL, value TEXT, value_list TEXT NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS requests_checker_timestamp ON requests (checker, timestamp)",
+        "CREATE INDEX IF NOT EXISTS requests_timestamp ON requests (timestamp)",
+    )
+
+    def __init__(self, database_path: str, retention_days: int | None = 365, batch_size: int = 50):
+        self.database_path = database_path
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self._logger = logging.getLogger("RequestHistoryDatabase")
+        self._lock = threading.Lock()
+        self._pending_records: list[RequestRecord] = []
+        os.makedirs(os.path.dirname(database_path) or ".", exist_ok=True)
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            for statement in self._schema:
+                self._connection.execute(statement)
+        self.apply_retention()
+
+    def add(self, record: RequestRecord) -> None:
+        with self._lock:
+            self._pending_records.append(record)
+            if len(self._pending_records) >= self.batch_size:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        self.apply_retention()
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+    def apply_retention(self) -> None:
+        if not self.retention_days:
+            return
+
+        oldest_timestamp = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        with self._lock:
+            self._flush()
+            with self._connection:
+                removed_count = self._connection.execute(
+                    "DELETE FROM requests WHERE timestamp < ?", (oldest_timestamp,)
+                ).rowcount
+        if removed_count:
+            self._logger.info("Removed %s request records older than %s days", removed_count, self.retention_days)
+
+    def get_last_record(self, checker: str) -> RequestRecord | None:
+        rows = self._query(
+            "SELECT checker, timestamp, value_list FROM requests WHERE checker = ? ORDER BY timestamp DESC, id DESC "
+            "LIMIT 1",
+            (checker,),
+        )
+        return self._create_record(rows[0]) if rows else None
+
+    def get_history(
+            self, checker: str | None = None, since: datetime | None = None, until: datetime | None = None
+    ) -> list[RequestRecord]:
+        """ Records oldest first, optionally of one checker and within a time range """
+        where, parameters = self._get_filter(checker, since, until)
+        rows = self._query(
+            f"SELECT checker, timestamp, value_list FROM requests {where} ORDER BY timestamp, id", parameters
+        )
+        return [self._create_record(x) for x in rows]
+
+    def get_value_counts(
+            self, checker: str | None = None, since: datetime | None = None, until: datetime | None = None
+    ) -> dict[str, int]:
+        """ Number of records by their first value (e.g. status code) """
+        where, parameters = self._get_filter(checker, since, until)
+        return dict(self._query(f"SELECT value, COUNT(*) FROM requests {where} GROUP BY value", parameters))
+
+    def get_uptime(self, checker: str, expected_value: str, since: datetime | None = None) -> float | None:
+        """ Share of the records of the checker with the expected first value. None without records """
+        value_counts = self.get_value_counts(checker, since)
+        if not (total_count := sum(value_counts.values())):
+            return None
+
+        return value_counts.get(str(expected_value), 0) / total_count
+
+    def _flush(self) -> None:
+        if not self._pending_records:
+            return
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO requests (checker, timestamp, value, value_list) VALUES (?, ?, ?, ?)",
+                [
+                    (x.checker, x.timestamp, x.values[0] if x.values else None, json.dumps(x.values))
+                    for x in self._pending_records
+                ],
+            )
+        self._logger.debug("Inserted %s request records", len(self._pending_records))
+        self._pending_records.clear()
+
+    def _query(self, query: str, parameters: tuple) -> list[tuple]:
+        with self._lock:
+            self._flush()
+            return self._connection.execute(query, parameters).fetchall()
+
+    @staticmethod
+    def _get_filter(checker: str | None, since: datetime | None, until: datetime | None) -> tuple[str, tuple]:
+        conditions, parameters = [], []
+        for condition, parameter in (
+                ("checker = ?", checker),
+                ("timestamp >= ?", since and since.isoformat()),
+                ("timestamp < ?", until and until.isoformat()),
+        ):
+            if parameter is not None:
+                conditions.append(condition)
+                parameters.append(parameter)
+
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), tuple(parameters)
+
+    @staticmethod
+    def _create_record(row: tuple) -> RequestRecord:
+        checker, timestamp, value_list = row
+        return RequestRecord(checker, timestamp, json.loads(value_list))
@@ -1,44 +1,254 @@
+import atexit
+import dataclasses
+import glob
 import logging
 import os
-from datetime import datetime
+import threading
+import time
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from enum import StrEnum
+from typing import TextIO
 
+from feeds.http.history import RequestHistoryDatabase, RequestRecord
+
+
+class RequestLogStorage(StrEnum):
+    FILES = "files"
+    SQLITE = "sqlite"
+
+
+class RequestLogServiceBase:
+    """ Log of the requests of one checker. Records start with a timestamp (value 0) followed by the values """
+
+    def log_request(self, *values) -> None:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+    def get_last_request_value(self, value_index: int = 0) -> str | None:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Write buffered records. Should be overwritten by subclasses buffering records"""
+
+    def close(self) -> None:
+        """Write buffered records and release files. Should be overwritten by subclasses holding resources"""
+
+
+class FsyncPolicy(StrEnum):
+    NEVER = "never"
+    FLUSH = "flush"
+
+
+@dataclasses.dataclass(frozen=True)
+class RequestLogWriterConfiguration:
+    """ Buffered writing of request logs. fsync "flush" syncs the file after each written batch """
+
+    max_buffered_records: int = 100
+    flush_interval_seconds: float = 30.0
+    fsync: FsyncPolicy = FsyncPolicy.NEVER
+
+
+class BufferedLogWriter:
+    """
+    Appends lines to a file kept open. Lines are buffered and written in one batch, when max_buffered_records
+    lines are buffered or flush_interval_seconds have passed since the last batch (checked on write). The
+    buffer is written when the file changes, on flush, which should also be called periodically, so records
+    of rarely logging checkers don't wait for the next write, and on close, which is also registered to run at exit.
+    """
+
+    def __init__(self, configuration: RequestLogWriterConfiguration, encoding: str):
+        self.configuration = configuration
+        self.encoding = encoding
+        self.file_path: str | None = None
+        self._file: TextIO | None = None
+        self._lines: list[str] = []
+        self._last_flush_time = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def write(self, file_path: str, line: str) -> None:
+        with self._lock:
+            if file_path != self.file_path:
+                self._close()
+                self.file_path = file_path
+            self._lines.append(line)
+            if (len(self._lines) >= self.configuration.max_buffered_records
+                    or time.monotonic() - self._last_flush_time >= self.configuration.flush_interval_seconds):
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _flush(self) -> None:
+        self._last_flush_time = time.monotonic()
+        if not self._lines:
+            return
+
+        if self._file is None:
+            self._file = open(self.file_path, "a", encoding=self.encoding)  # pylint: disable=consider-using-with
+        self._file.write("".join(self._lines))
+        self._file.flush()
+        if self.configuration.fsync == FsyncPolicy.FLUSH:
+            os.fsync(self._file.fileno())
+        self._lines.clear()
+
+    def _close(self) -> None:
+        self._flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class RequestLogService(RequestLogServiceBase):
+    """
+    Appends records to a monthly log file. The last record is cached after it has been written or read, and
+    otherwise read by seeking backwards from the end of the file, so reading it doesn't depend on the log size.
+    Records are written through a BufferedLogWriter, if a writer configuration is given, otherwise the file is
+    opened for each record.
+    """
 
-class RequestLogService:
     _request_log_base_filename: str = "requests"
     _log_encoding: str = "utf-8"
     _cell_delimiter: str = ";"
+    _read_block_size: int = 4096
 
-    def __init__(self, request_log_dir: str) -> None:
+    def __init__(self, request_log_dir: str, writer_configuration: RequestLogWriterConfiguration | None = None):
         self._request_log_dir = request_log_dir
         self._logger = logging.getLogger("RequestLogService")
         self.request_log = None
-        self._rotate_log_file_if_needed()
+        self._next_rotation = datetime.min
+        self._last_record: list[str] | None = None
+        self._writer = BufferedLogWriter(writer_configuration, self._log_encoding) if writer_configuration else None
+        self._rotate_log_file_if_needed(datetime.now())
 
     def log_request(self, *values) -> None:
-        self._rotate_log_file_if_needed()
-        with open(self.request_log, "a", encoding=self._log_encoding) as file:
-            self._logger.debug("Writing to %s...", self.request_log)
-            record = (
-                f"{datetime.now().isoformat()}{self._cell_delimiter}"
-                f"{self._cell_delimiter.join(str(value) for value in values)}\n"
-            )
-            file.write(record)
+        now = datetime.now()
+        self._rotate_log_file_if_needed(now)
+        record = f"{now.isoformat()}{self._cell_delimiter}{self._cell_delimiter.join(str(value) for value in values)}\n"
+        if self._writer:
+            self._writer.write(self.request_log, record)
+        else:
+            with open(self.request_log, "a", encoding=self._log_encoding) as file:
+                self._logger.debug("Writing to %s...", self.request_log)
+                file.write(record)
+        self._last_record = record.rstrip("\n").split(self._cell_delimiter)
+
+    def flush(self) -> None:
+        if self._writer:
+            self._writer.flush()
+
+    def close(self) -> None:
+        if self._writer:
+            self._writer.close()
 
     def get_last_request_value(self, value_index: int = 0) -> str | None:
+        if self._last_record is not None:
+            return self._last_record[value_index]
         if not self.request_log or not os.path.exists(self.request_log):
             self._logger.warning("Request log %s doesn't exist!", self.request_log)
             return None
 
-        with open(self.request_log, "r", encoding=self._log_encoding) as file:
-            if not (lines := file.readlines()):
-                return None
-            return lines[-1].split(self._cell_delimiter)[value_index]
+        if (last_line := self._read_last_line()) is None:
+            return None
+        self._last_record = last_line.split(self._cell_delimiter)
+        return self._last_record[value_index]
+
+    @classmethod
+    def get_log_file_paths(cls, request_log_dir: str) -> list[str]:
+        """ Oldest first. The file names sort by month """
+        log_file_pattern = f"{cls._request_log_base_filename}_*.log"
+        return sorted(glob.glob(os.path.join(glob.escape(request_log_dir), log_file_pattern)))
 
-    def _rotate_log_file_if_needed(self) -> None:
-        date_str = datetime.now().strftime("%Y-%m")
-        if self.request_log and date_str in os.path.basename(self.request_log):
+    @classmethod
+    def read_records(cls, file_path: str) -> Iterator[list[str]]:
+        with open(file_path, "r", encoding=cls._log_encoding) as file:
+            for line in file:
+                if line := line.rstrip("\n"):
+                    yield line.split(cls._cell_delimiter)
+
+    def _read_last_line(self) -> str | None:
+        """ Reads blocks backwards from the end of the log until the line before the last one ends """
+        with open(self.request_log, "rb") as file:
+            position = file.seek(0, os.SEEK_END)
+            tail = b""
+            while position > 0:
+                read_size = min(self._read_block_size, position)
+                position -= read_size
+                file.seek(position)
+                tail = file.read(read_size) + tail
+                if b"\n" in tail.rstrip(b"\n"):
+                    break
+
+        if not (tail := tail.rstrip(b"\n")):
+            return None
+        return tail.rsplit(b"\n", maxsplit=1)[-1].decode(self._log_encoding)
+
+    def _rotate_log_file_if_needed(self, now: datetime) -> None:
+        """ Compares with the start of the next month, so the file name is only formatted on rotation """
+        if self.request_log and now < self._next_rotation:
             return
 
-        new_log_filename = os.path.join(self._request_log_dir, f"{self._request_log_base_filename}_{date_str}.log")
+        new_log_filename = os.path.join(
+            self._request_log_dir, f"{self._request_log_base_filename}_{now.strftime("%Y-%m")}.log"
+        )
         self._logger.debug("Rotating log file to %s...", new_log_filename)
         self.request_log = new_log_filename
+        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        self._next_rotation = (month_start + timedelta(days=32)).replace(day=1)
+        self._last_record = None
+
+
+class SqliteRequestLogService(RequestLogServiceBase):
+    """
+    Logs the requests of a checker in the shared request history database. The monthly log files of the checker
+    are imported on first use and renamed with the suffix .imported.
+    """
+
+    _imported_file_suffix = ".imported"
+
+    def __init__(self, request_history: RequestHistoryDatabase, checker: str, request_log_dir: str | None = None):
+        self._request_history = request_history
+        self.checker = checker
+        self._logger = logging.getLogger("SqliteRequestLogService")
+        self._last_record = request_history.get_last_record(checker)
+        if self._last_record is None and request_log_dir:
+            self._import_log_files(request_log_dir)
+
+    def log_request(self, *values) -> None:
+        self._last_record = RequestRecord(self.checker, datetime.now().isoformat(), [str(x) for x in values])
+        self._request_history.add(self._last_record)
+
+    def get_last_request_value(self, value_index: int = 0) -> str | None:
+        if self._last_record is None:
+            return None
+
+        return [self._last_record.timestamp, *self._last_record.values][value_index]
+
+    def _import_log_files(self, request_log_dir: str) -> None:
+        for file_path in RequestLogService.get_log_file_paths(request_log_dir):
+            self._logger.info("Importing %s into request history...", file_path)
+            for timestamp, *values in RequestLogService.read_records(file_path):
+                self._last_record = RequestRecord(self.checker, timestamp, values)
+                self._request_history.add(self._last_record)
+            self._request_history.flush()
+            os.replace(file_path, f"{file_path}{self._imported_file_suffix}")
+
+
+def create_request_log_service(
+        request_log_dir: str,
+        checker: str,
+        request_history: RequestHistoryDatabase | None = None,
+        writer_configuration: RequestLogWriterConfiguration | None = None,
+) -> RequestLogServiceBase:
+    """ Logs to the request history database, if given, otherwise to monthly log files in request_log_dir """
+    if request_history:
+        return SqliteRequestLogService(request_history, checker, request_log_dir)
+
+    return RequestLogService(request_log_dir, writer_configuration)
@@ -0,0 +1,76 @@
+import dataclasses
+import threading
+from enum import StrEnum
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+
+
+class HTTPClientType(StrEnum):
+    SYNC = "sync"
+    ASYNC = "async"
+
+
+@dataclasses.dataclass(frozen=True)
+class PoolConfiguration:
+    pool_connections: int = 32
+    pool_maxsize: int = 8
+    keep_alive: bool = True
+    max_concurrency: int = 64
+    coalesce_ttl_seconds: float = 30
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectionPoolStats:
+    hits: int
+    misses: int
+
+    @property
+    def hit_ratio(self) -> float:
+        requests_count = self.hits + self.misses
+        return self.hits / requests_count if requests_count else 0.0
+
+
+class ConnectionPoolCounter:
+    """ Counts requests sent on a reused connection (hit) or a new connection (miss) """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def record(self, reused: bool) -> None:
+        with self._lock:
+            if reused:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def stats(self) -> ConnectionPoolStats:
+        with self._lock:
+            return ConnectionPoolStats(hits=self._hits, misses=self._misses)
+
+
+def _create_counting_pool_class(pool_class: type[HTTPConnectionPool], counter: ConnectionPoolCounter) -> type:
+    class CountingConnectionPool(pool_class):
+        def _get_conn(self, timeout: float | None = None):
+            connection = super()._get_conn(timeout=timeout)
+            counter.record(reused=connection.is_connected)
+            return connection
+
+    return CountingConnectionPool
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """ HTTPAdapter keeping a connection pool per host and counting connection reuse """
+
+    def __init__(self, pool_connections: int, pool_maxsize: int):
+        self.counter = ConnectionPoolCounter()
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _create_counting_pool_class(HTTPConnectionPool, self.counter),
+            "https": _create_counting_pool_class(HTTPSConnectionPool, self.counter),
+        }
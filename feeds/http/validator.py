@@ -0,0 +1,85 @@
+import dataclasses
+import logging
+import threading
+from collections.abc import Mapping
+
+from feeds.shared.state import JsonStateFile
+
+
+@dataclasses.dataclass(frozen=True)
+class Validator:
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @classmethod
+    def from_response_headers(cls, headers: Mapping[str, str]) -> "Validator":
+        return cls(etag=headers.get("ETag"), last_modified=headers.get("Last-Modified"))
+
+    def to_request_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    def __bool__(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class ValidatorCache:
+    """
+    ETag/Last-Modified validators per key (usually the feed name) and URL. Validators of new responses are staged
+    until they are committed, and committed validators are saved to the state file (if any), so conditional
+    requests keep working after a restart.
+    """
+
+    _key_delimiter = "|"
+
+    def __init__(self, file_path: str | None = None):
+        self._logger = logging.getLogger("ValidatorCache")
+        self._lock = threading.Lock()
+        self._state_file = JsonStateFile(file_path) if file_path else None
+        self._validators = {
+            cache_key: Validator(**validator)
+            for cache_key, validator in (self._state_file.load() if self._state_file else {}).items()
+        }
+        self._staged_validators: dict[str, Validator] = {}
+
+    def get(self, key: str, url: str) -> Validator | None:
+        with self._lock:
+            return self._validators.get(self._get_cache_key(key, url))
+
+    def get_request_headers(self, key: str | None, url: str) -> dict[str, str]:
+        if not key or not (validator := self.get(key, url)):
+            return {}
+
+        return validator.to_request_headers()
+
+    def stage(self, key: str, url: str, validator: Validator) -> None:
+        with self._lock:
+            self._staged_validators[self._get_cache_key(key, url)] = validator
+
+    def commit(self, key: str, url: str) -> None:
+        with self._lock:
+            validator = self._staged_validators.pop(self._get_cache_key(key, url), None)
+        if validator is not None:
+            self.set(key, url, validator)
+
+    def set(self, key: str, url: str, validator: Validator) -> None:
+        cache_key = self._get_cache_key(key, url)
+        with self._lock:
+            if self._validators.get(cache_key) == validator:
+                return
+
+            if validator:
+                self._validators[cache_key] = validator
+            else:
+                self._validators.pop(cache_key, None)
+            if self._state_file:
+                self._logger.debug("Saving validators to %s...", self._state_file.file_path)
+                self._state_file.save({k: dataclasses.asdict(v) for k, v in self._validators.items()})
+
+    def _get_cache_key(self, key: str, url: str) -> str:
+        return f"{key}{self._key_delimiter}{url}"
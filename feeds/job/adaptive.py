@@ -0,0 +1,102 @@
+import dataclasses
+import logging
+import os
+import threading
+import time
+
+from feeds.feed.base import CheckOutcome, FeedChecker
+from feeds.shared.config import ConfigKeys
+from feeds.shared.state import JsonStateFile
+
+
+@dataclasses.dataclass
+class AdaptiveState:
+    interval_seconds: float
+    change_times: list[float]
+
+
+class AdaptiveIntervalPolicy:
+    """
+    Computes the polling interval of feed checkers with the adaptive schedule from their change history.
+    The interval is halved towards the gap between recent changes when changes cluster, and backs off
+    towards the configured ceiling while nothing changes. The history is persisted in the data dir of the checker.
+    """
+
+    state_filename = "adaptive_schedule.json"
+    default_min_interval_seconds = 900
+    default_max_interval_seconds = 86400
+    initial_interval_seconds = 3600
+    backoff_factor = 1.5
+    change_history_size = 10
+
+    def __init__(self):
+        self._logger = logging.getLogger("AdaptiveIntervalPolicy")
+        self._lock = threading.Lock()
+        self._states: dict[FeedChecker, AdaptiveState] = {}
+
+    def get_interval_seconds(self, feed_checker: FeedChecker) -> float:
+        with self._lock:
+            return self._get_state(feed_checker).interval_seconds
+
+    def record_outcome(self, feed_checker: FeedChecker) -> None:
+        with self._lock:
+            state = self._get_state(feed_checker)
+            if feed_checker.last_outcome == CheckOutcome.CHANGED:
+                state.change_times = (state.change_times + [time.time()])[-self.change_history_size:]
+                interval_seconds = self._get_interval_after_change(state)
+            elif feed_checker.last_outcome == CheckOutcome.UNCHANGED:
+                interval_seconds = state.interval_seconds * self.backoff_factor
+            else:
+                return
+
+            state.interval_seconds = self._clamp_interval(feed_checker, interval_seconds)
+            self._logger.debug(
+                "%s: %s. Next interval is %.0f seconds.",
+                feed_checker.name,
+                feed_checker.last_outcome,
+                state.interval_seconds,
+            )
+            self._save_state(feed_checker, state)
+
+    @staticmethod
+    def _get_interval_after_change(state: AdaptiveState) -> float:
+        change_times = state.change_times
+        if len(change_times) < 2:
+            return state.interval_seconds / 2
+
+        latest_gap = change_times[-1] - change_times[-2]
+        mean_gap = (change_times[-1] - change_times[0]) / (len(change_times) - 1)
+        return min(state.interval_seconds, latest_gap, mean_gap) / 2
+
+    def _clamp_interval(self, feed_checker: FeedChecker, interval_seconds: float) -> float:
+        min_interval_seconds = feed_checker.config.get(
+            ConfigKeys.ADAPTIVE_MIN_INTERVAL_SECONDS, self.default_min_interval_seconds
+        )
+        max_interval_seconds = feed_checker.config.get(
+            ConfigKeys.ADAPTIVE_MAX_INTERVAL_SECONDS, self.default_max_interval_seconds
+        )
+        return min(max(interval_seconds, min_interval_seconds), max_interval_seconds)
+
+    def _get_state(self, feed_checker: FeedChecker) -> AdaptiveState:
+        if state := self._states.get(feed_checker):
+            return state
+
+        saved_state = state_file.load() if (state_file := self._get_state_file(feed_checker)) else {}
+        state = AdaptiveState(
+            interval_seconds=self._clamp_interval(
+                feed_checker, saved_state.get("interval_seconds", self.initial_interval_seconds)
+            ),
+            change_times=saved_state.get("change_times", []),
+        )
+        self._states[feed_checker] = state
+        return state
+
+    def _save_state(self, feed_checker: FeedChecker, state: AdaptiveState) -> None:
+        if state_file := self._get_state_file(feed_checker):
+            state_file.save(dataclasses.asdict(state))
+
+    def _get_state_file(self, feed_checker: FeedChecker) -> JsonStateFile | None:
+        if not (data_dir := feed_checker.config.get(ConfigKeys.DIR)):
+            return None
+
+        return JsonStateFile(os.path.join(data_dir, self.state_filename))
@@ -0,0 +1,186 @@
+import dataclasses
+import logging
+import threading
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from enum import StrEnum
+
+from feeds.feed.base import CheckOutcome, FeedChecker, FeedCheckFailedError
+
+
+class ExecutionMode(StrEnum):
+    SEQUENTIAL = "sequential"
+    CONCURRENT = "concurrent"
+
+
+@dataclasses.dataclass(frozen=True)
+class PoolStats:  # pylint: disable=too-many-instance-attributes
+    max_workers: int
+    active: int
+    queued: int
+    completed: int
+    failed: int
+    skipped: int
+    timed_out: int
+    abandoned: int
+
+    @property
+    def utilization(self) -> float:
+        return self.active / self.max_workers if self.max_workers else 0.0
+
+
+class FeedCheckExecutor:
+    """
+    Base class for executors running feed checks. A feed checker is never run twice at the same time.
+    Each check runs in its own thread and is cancelled when it exceeds the timeout of the feed checker. A check
+    that doesn't stop after cancellation is abandoned: its worker is released, but the feed checker is not
+    run again until the abandoned check has finished.
+    """
+
+    cancel_grace_seconds = 5
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._logger = logging.getLogger("FeedCheckExecutor")
+        self._lock = threading.Lock()
+        self._pending: set[FeedChecker] = set()
+        self._abandoned: set[FeedChecker] = set()
+        self._active = 0
+        self._counts: Counter[str] = Counter()
+
+    def submit(self, feed_checker: FeedChecker, on_done: Callable[[FeedChecker], None] | None = None) -> bool:
+        """
+        Submit a feed check. Returns False if the check is skipped, because it is already queued or running.
+        on_done is called with the feed checker, when the check has finished (successful or not)
+        """
+        with self._lock:
+            if feed_checker in self._pending:
+                self._counts["skipped"] += 1
+                self._logger.warning("%s is still queued or running. Check is skipped!", feed_checker.name)
+                return False
+            self._pending.add(feed_checker)
+
+        self._dispatch(feed_checker, on_done)
+        return True
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(
+                max_workers=self.max_workers,
+                active=self._active,
+                queued=len(self._pending) - self._active - len(self._abandoned),
+                completed=self._counts["completed"],
+                failed=self._counts["failed"],
+                skipped=self._counts["skipped"],
+                timed_out=self._counts["timed_out"],
+                abandoned=len(self._abandoned),
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Should be overwritten by subclasses if they hold resources"""
+
+    def _dispatch(self, feed_checker: FeedChecker, on_done: Callable[[FeedChecker], None] | None) -> None:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+    def _run(self, feed_checker: FeedChecker, on_done: Callable[[FeedChecker], None] | None) -> None:
+        with self._lock:
+            self._active += 1
+
+        feed_checker.last_outcome = None
+        check_finished = threading.Event()
+        check_thread = threading.Thread(
+            target=self._check,
+            args=(feed_checker, check_finished),
+            name=f"{threading.current_thread().name}-check",
+            daemon=True,
+        )
+        check_thread.start()
+        if not check_finished.wait(timeout=feed_checker.timeout_seconds):
+            self._cancel(feed_checker, check_finished)
+
+        with self._lock:
+            self._active -= 1
+            self._counts["completed"] += 1
+            if check_finished.is_set():
+                self._pending.discard(feed_checker)
+            else:
+                self._logger.error("%s didn't stop after cancellation. Check is abandoned!", feed_checker.name)
+                self._abandoned.add(feed_checker)
+
+        if on_done:
+            on_done(feed_checker)
+
+    def _check(self, feed_checker: FeedChecker, check_finished: threading.Event) -> None:
+        try:
+            self._logger.info("Running feed checker %s...", feed_checker.name)
+            feed_checker.check()
+            self._logger.info("Finished running %s.", feed_checker.name)
+        except FeedCheckFailedError as ex:
+            self._logger.error("Error running feed checker %s: %s", feed_checker.name, ex)
+            self._record_failure(feed_checker)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self._logger.exception("Unexpected error running feed checker %s: %s", feed_checker.name, ex)
+            self._record_failure(feed_checker)
+        finally:
+            with self._lock:
+                check_finished.set()
+                if feed_checker in self._abandoned:
+                    self._logger.info("Abandoned check of %s has finished.", feed_checker.name)
+                    self._abandoned.discard(feed_checker)
+                    self._pending.discard(feed_checker)
+
+    def _record_failure(self, feed_checker: FeedChecker) -> None:
+        """ A check raising after it has been cancelled is already counted as timed out """
+        if feed_checker.last_outcome == CheckOutcome.TIMEOUT:
+            return
+        with self._lock:
+            self._counts["failed"] += 1
+        feed_checker.last_outcome = CheckOutcome.FAILED
+
+    def _cancel(self, feed_checker: FeedChecker, check_finished: threading.Event) -> None:
+        self._logger.error(
+            "%s didn't finish within %s seconds. Cancelling check...", feed_checker.name, feed_checker.timeout_seconds
+        )
+        feed_checker.last_outcome = CheckOutcome.TIMEOUT
+        with self._lock:
+            self._counts["timed_out"] += 1
+        try:
+            feed_checker.cancel()
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self._logger.error("Error cancelling feed checker %s: %s", feed_checker.name, ex)
+        check_finished.wait(timeout=self.cancel_grace_seconds)
+
+
+class SequentialFeedCheckExecutor(FeedCheckExecutor):
+    """ Runs feed checks one after another in the calling thread """
+
+    def __init__(self):
+        super().__init__(max_workers=1)
+
+    def _dispatch(self, feed_checker: FeedChecker, on_done: Callable[[FeedChecker], None] | None) -> None:
+        self._run(feed_checker, on_done)
+
+
+class ThreadPoolFeedCheckExecutor(FeedCheckExecutor):
+    """ Runs feed checks concurrently on a bounded pool of worker threads """
+
+    def __init__(self, max_workers: int):
+        super().__init__(max_workers=max_workers)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="FeedCheck")
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _dispatch(self, feed_checker: FeedChecker, on_done: Callable[[FeedChecker], None] | None) -> None:
+        self._pool.submit(self._run, feed_checker, on_done)
+
+
+def create_executor(mode: ExecutionMode, max_workers: int) -> FeedCheckExecutor:
+    if mode == ExecutionMode.SEQUENTIAL:
+        return SequentialFeedCheckExecutor()
+    if mode == ExecutionMode.CONCURRENT:
+        return ThreadPoolFeedCheckExecutor(max_workers)
+
+    raise ValueError(f"Invalid execution mode: {mode}")
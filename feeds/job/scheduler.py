@@ -0,0 +1,165 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections.abc import Callable, Sequence
+from datetime import timedelta
+
+from feeds.feed.base import FeedChecker, FeedSchedule
+from feeds.job.adaptive import AdaptiveIntervalPolicy
+from feeds.job.executor import FeedCheckExecutor
+
+SCHEDULE_INTERVALS: dict[FeedSchedule, timedelta] = {
+    FeedSchedule.HOURLY: timedelta(hours=1),
+    FeedSchedule.DAILY: timedelta(days=1),
+    FeedSchedule.WEEKLY: timedelta(weeks=1),
+    FeedSchedule.MONTHLY: timedelta(days=30),
+}
+
+
+class FeedCheckScheduler:  # pylint: disable=too-many-instance-attributes
+    """
+    Event-driven scheduler backed by a min-heap of due times. The scheduler thread sleeps until the next deadline
+    (or until it is woken up by a rescheduled check) instead of polling.
+    A feed check is rescheduled, when it has finished, so the next run is at least one interval (plus jitter) later.
+    Feed checkers with the adaptive schedule get their interval from the AdaptiveIntervalPolicy.
+    Checks due within the batch window are dispatched together after the batch handler (if any) has been called
+    with their feed checkers, e.g. to fetch their HTTP requests in one batch.
+    """
+
+    _max_jitter_fraction = 0.05
+    _sequence = itertools.count()
+
+    def __init__(
+            self,
+            executor: FeedCheckExecutor,
+            max_jitter_seconds: float,
+            adaptive_policy: AdaptiveIntervalPolicy | None = None,
+    ):
+        self._executor = executor
+        self._max_jitter_seconds = max_jitter_seconds
+        self._adaptive_policy = adaptive_policy or AdaptiveIntervalPolicy()
+        self._logger = logging.getLogger("FeedCheckScheduler")
+        self._condition = threading.Condition()
+        self._heap: list[tuple[float, int, Callable[[], None], FeedChecker | None]] = []
+        self._stopped = False
+        self._batch_handler: Callable[[list[FeedChecker]], None] | None = None
+        self._batch_window_seconds = 0.0
+
+    def add_feed_checkers(self, feed_checkers: Sequence[FeedChecker], startup_window_seconds: float) -> None:
+        """ Schedule the first run of the feed checkers evenly spread over the startup window """
+        spacing = startup_window_seconds / len(feed_checkers) if feed_checkers else 0.0
+        for index, feed_checker in enumerate(feed_checkers):
+            self.add_feed_checker(feed_checker, delay_seconds=index * spacing)
+
+    def add_feed_checker(self, feed_checker: FeedChecker, delay_seconds: float) -> None:
+        self.get_interval_seconds(feed_checker)
+        self._logger.info(
+            "%s will run %s. First run in %.1f seconds.", feed_checker.name, feed_checker.schedule, delay_seconds
+        )
+        self._push(delay_seconds, lambda: self._dispatch(feed_checker), feed_checker)
+
+    def set_batch_handler(self, batch_handler: Callable[[list[FeedChecker]], None], window_seconds: float) -> None:
+        self._batch_handler = batch_handler
+        self._batch_window_seconds = window_seconds
+
+    def add_task(self, task: Callable[[], None], interval_seconds: float) -> None:
+        """ Run a lightweight task periodically in the scheduler thread """
+
+        def run_task() -> None:
+            try:
+                task()
+            finally:
+                self._push(interval_seconds, run_task)
+
+        self._push(interval_seconds, run_task)
+
+    def get_interval_seconds(self, feed_checker: FeedChecker) -> float:
+        if feed_checker.schedule == FeedSchedule.ADAPTIVE:
+            return self._adaptive_policy.get_interval_seconds(feed_checker)
+        if (interval := SCHEDULE_INTERVALS.get(feed_checker.schedule)) is None:
+            raise ValueError(f"Invalid schedule: {feed_checker.schedule}")
+
+        return interval.total_seconds()
+
+    def run_forever(self) -> None:
+        self._logger.info("Running scheduled jobs...")
+        while (due_items := self._wait_for_due_items()) is not None:
+            if self._batch_handler and (feed_checkers := [x for _, x in due_items if x]):
+                self._run_batch_handler(feed_checkers)
+            for action, feed_checker in due_items:
+                self._run_action(action, feed_checker)
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def _run_batch_handler(self, feed_checkers: list[FeedChecker]) -> None:
+        try:
+            self._batch_handler(feed_checkers)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self._logger.error("Error running batch handler for %s feed checkers: %s", len(feed_checkers), ex)
+
+    def _run_action(self, action: Callable[[], None], feed_checker: FeedChecker | None) -> None:
+        """ An error of a task or dispatch is logged, so it doesn't stop the scheduler """
+        try:
+            action()
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self._logger.exception(
+                "Error running scheduled %s: %s", feed_checker.name if feed_checker else "task", ex
+            )
+
+    def _dispatch(self, feed_checker: FeedChecker) -> None:
+        if not self._executor.submit(feed_checker, on_done=self._on_check_done):
+            self._reschedule(feed_checker)
+
+    def _on_check_done(self, feed_checker: FeedChecker) -> None:
+        """ The feed checker is rescheduled, even if its outcome can't be recorded """
+        try:
+            if feed_checker.schedule == FeedSchedule.ADAPTIVE:
+                self._adaptive_policy.record_outcome(feed_checker)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            self._logger.error("Error recording outcome of %s: %s", feed_checker.name, ex)
+        finally:
+            self._reschedule(feed_checker)
+
+    def _reschedule(self, feed_checker: FeedChecker) -> None:
+        interval_seconds = self.get_interval_seconds(feed_checker)
+        delay_seconds = interval_seconds + self._get_jitter_seconds(interval_seconds)
+        self._logger.debug("Next run of %s in %.1f seconds.", feed_checker.name, delay_seconds)
+        self._push(delay_seconds, lambda: self._dispatch(feed_checker), feed_checker)
+
+    def _get_jitter_seconds(self, interval_seconds: float) -> float:
+        return random.uniform(0, min(self._max_jitter_seconds, interval_seconds * self._max_jitter_fraction))
+
+    def _push(
+            self, delay_seconds: float, action: Callable[[], None], feed_checker: FeedChecker | None = None
+    ) -> None:
+        with self._condition:
+            heapq.heappush(
+                self._heap, (time.monotonic() + delay_seconds, next(self._sequence), action, feed_checker)
+            )
+            self._condition.notify_all()
+
+    def _wait_for_due_items(self) -> list[tuple[Callable[[], None], FeedChecker | None]] | None:
+        with self._condition:
+            while not self._stopped:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                now = time.monotonic()
+                if (next_due := self._heap[0][0]) > now:
+                    self._condition.wait(timeout=next_due - now)
+                    continue
+
+                due_items = []
+                while self._heap and self._heap[0][0] <= now + self._batch_window_seconds:
+                    _, _, action, feed_checker = heapq.heappop(self._heap)
+                    due_items.append((action, feed_checker))
+                return due_items
+
+        return None
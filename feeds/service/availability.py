@@ -0,0 +1,116 @@
+import dataclasses
+import math
+from collections import deque
+from typing import Any, NamedTuple
+
+from feeds.shared.state import JsonStateFile
+
+
+class AvailabilitySample(NamedTuple):
+    status_code: int
+    latency_ms: float | None
+    ttfb_ms: float | None
+    is_up: bool
+
+
+class AvailabilityStatistics(NamedTuple):
+    sample_count: int
+    uptime_percent: float
+    p50_ms: float | None
+    p95_ms: float | None
+    p99_ms: float | None
+
+
+@dataclasses.dataclass(frozen=True)
+class AvailabilityThresholds:
+    """ Limits of the rolling window statistics. Nothing is alerted before min_samples samples are recorded """
+
+    max_p50_ms: float | None = None
+    max_p95_ms: float | None = None
+    max_p99_ms: float | None = None
+    min_uptime_percent: float | None = None
+    min_samples: int = 10
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "AvailabilityThresholds":
+        return cls(**{x.name: config[x.name] for x in dataclasses.fields(cls) if x.name in config})
+
+    def get_breaches(self, statistics: AvailabilityStatistics) -> dict[str, str]:
+        """ Descriptions of the crossed thresholds by name """
+        if statistics.sample_count < self.min_samples:
+            return {}
+
+        breaches = {}
+        for name, value, limit in (
+                ("p50", statistics.p50_ms, self.max_p50_ms),
+                ("p95", statistics.p95_ms, self.max_p95_ms),
+                ("p99", statistics.p99_ms, self.max_p99_ms),
+        ):
+            if limit is not None and value is not None and value > limit:
+                breaches[name] = f"{name} latency {value:.0f} ms exceeds {limit:.0f} ms"
+        if self.min_uptime_percent is not None and statistics.uptime_percent < self.min_uptime_percent:
+            breaches["uptime"] = f"uptime {statistics.uptime_percent:.2f}% is below {self.min_uptime_percent:.2f}%"
+
+        return breaches
+
+
+class RollingWindowStatistics:
+    """
+    Latency percentiles (nearest rank) and uptime of the latest window_size samples. Memory is bounded by the
+    window size. Failed requests count as down and are left out of the latency percentiles.
+    """
+
+    def __init__(self, window_size: int, samples: list[AvailabilitySample] | None = None):
+        self.window_size = window_size
+        self.samples: deque[AvailabilitySample] = deque(samples or (), maxlen=window_size)
+
+    def add(self, sample: AvailabilitySample) -> None:
+        self.samples.append(sample)
+
+    def get_statistics(self) -> AvailabilityStatistics:
+        latencies = sorted(x.latency_ms for x in self.samples if x.latency_ms is not None)
+        up_count = sum(x.is_up for x in self.samples)
+        return AvailabilityStatistics(
+            sample_count=len(self.samples),
+            uptime_percent=up_count / len(self.samples) * 100 if self.samples else 100.0,
+            p50_ms=self._get_percentile(latencies, 50),
+            p95_ms=self._get_percentile(latencies, 95),
+            p99_ms=self._get_percentile(latencies, 99),
+        )
+
+    @staticmethod
+    def _get_percentile(sorted_values: list[float], percentile: int) -> float | None:
+        if not sorted_values:
+            return None
+
+        return sorted_values[max(math.ceil(percentile / 100 * len(sorted_values)) - 1, 0)]
+
+
+class AvailabilityMonitor:
+    """
+    Keeps the rolling window statistics of a URL and the thresholds crossed at the latest check in a state file,
+    so the window and the alert state survive restarts. Alerts are raised when a threshold is crossed and when
+    it is no longer crossed, not on every check.
+    """
+
+    default_window_size = 288
+
+    def __init__(self, state_file_path: str, thresholds: AvailabilityThresholds, window_size: int | None = None):
+        self.thresholds = thresholds
+        self._state_file = JsonStateFile(state_file_path)
+        state = self._state_file.load()
+        self.statistics = RollingWindowStatistics(
+            window_size or self.default_window_size, [AvailabilitySample(*x) for x in state.get("samples", [])]
+        )
+        self.breaches: dict[str, str] = state.get("breaches", {})
+
+    def record(self, sample: AvailabilitySample) -> tuple[dict[str, str], dict[str, str]]:
+        """ Returns the newly crossed thresholds and the thresholds no longer crossed, each by name """
+        self.statistics.add(sample)
+        breaches = self.thresholds.get_breaches(self.statistics.get_statistics())
+        new_breaches = {x: y for x, y in breaches.items() if x not in self.breaches}
+        recoveries = {x: y for x, y in self.breaches.items() if x not in breaches}
+        self.breaches = breaches
+        self._state_file.save({"samples": [list(x) for x in self.statistics.samples], "breaches": self.breaches})
+
+        return new_breaches, recoveries
@@ -0,0 +1,111 @@
+import copy
+import dataclasses
+import re
+from fnmatch import fnmatch
+from typing import Any
+
+from bs4 import Tag
+
+from feeds.shared.helper import content_digest
+from feeds.shared.state import JsonStateFile
+
+
+@dataclasses.dataclass(frozen=True)
+class CanonicalizationConfiguration:
+    """ Noise removed from content before it is hashed and saved. Attribute names may contain wildcards (data-*) """
+
+    strip_attributes: tuple[str, ...] = ()
+    ignore_selectors: tuple[str, ...] = ()
+    regex_masks: tuple[str, ...] = ()
+    collapse_whitespace: bool = False
+    text_only: bool = False
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any]) -> "CanonicalizationConfiguration":
+        return cls(
+            strip_attributes=tuple(config.get("strip_attributes", ())),
+            ignore_selectors=tuple(config.get("ignore_selectors", ())),
+            regex_masks=tuple(config.get("regex_masks", ())),
+            collapse_whitespace=config.get("collapse_whitespace", False),
+            text_only=config.get("text_only", False),
+        )
+
+    @property
+    def modifies_tree(self) -> bool:
+        return bool(self.strip_attributes or self.ignore_selectors)
+
+
+class SuppressedChangeCounter:
+    """ Counts checks where the raw content changed, but the canonical content didn't (suppressed false positives) """
+
+    def __init__(self, state_file_path: str):
+        self._state_file = JsonStateFile(state_file_path)
+        state = self._state_file.load()
+        self._raw_digest: str | None = state.get("raw_digest")
+        self.count: int = state.get("suppressed_changes", 0)
+
+    def record(self, raw_content: str, canonical_content_changed: bool) -> bool:
+        """ Returns True, if a change of the raw content was suppressed """
+        raw_digest = content_digest(raw_content.encode())
+        suppressed = not canonical_content_changed and self._raw_digest not in (None, raw_digest)
+        if suppressed:
+            self.count += 1
+        if suppressed or raw_digest != self._raw_digest:
+            self._raw_digest = raw_digest
+            self._state_file.save({"raw_digest": raw_digest, "suppressed_changes": self.count})
+
+        return suppressed
+
+
+class HtmlCanonicalizer:
+    """
+    Converts a selected HTML node to its canonical string. The node is copied before it is modified, because
+    parsed documents are shared between checkers. Without any steps configured, the node is serialized as is.
+    Suppressed changes are counted, if a counter is given
+    """
+
+    mask = "[masked]"
+
+    def __init__(
+            self,
+            configuration: CanonicalizationConfiguration | None = None,
+            suppressed_change_counter: SuppressedChangeCounter | None = None,
+    ):
+        self.configuration = configuration or CanonicalizationConfiguration()
+        self.suppressed_change_counter = suppressed_change_counter
+        self._regex_masks = [re.compile(x) for x in self.configuration.regex_masks]
+
+    def canonicalize(self, node: Tag | None) -> str:
+        if node is None:
+            return str(node)
+        if self.configuration.modifies_tree:
+            node = self._clean_tree(copy.copy(node))
+
+        content = node.get_text("\n") if self.configuration.text_only else str(node)
+        for regex_mask in self._regex_masks:
+            content = regex_mask.sub(self.mask, content)
+        if self.configuration.collapse_whitespace:
+            content = "\n".join(" ".join(line.split()) for line in content.splitlines() if line.strip())
+
+        return content
+
+    def record_outcome(self, node: Tag | None, is_content_updated: bool) -> bool:
+        """ Returns True, if the raw content of the node changed, but its canonical content didn't """
+        if not self.suppressed_change_counter:
+            return False
+
+        return self.suppressed_change_counter.record(str(node), is_content_updated)
+
+    def _clean_tree(self, node: Tag) -> Tag:
+        for selector in self.configuration.ignore_selectors:
+            for ignored_node in node.select(selector):
+                ignored_node.decompose()
+        if self.configuration.strip_attributes:
+            for element in (node, *node.find_all(True)):
+                for attribute in [x for x in element.attrs if self._is_stripped_attribute(x)]:
+                    del element[attribute]
+
+        return node
+
+    def _is_stripped_attribute(self, attribute: str) -> bool:
+        return any(fnmatch(attribute, x) for x in self.configuration.strip_attributes)
@@ -2,42 +2,77 @@ import html
 import logging
 import os.path
 from datetime import datetime
-from difflib import unified_diff
+
+from bs4 import BeautifulSoup
+
+from feeds.service.diff import DiffEngine, MyersDiffEngine
+from feeds.service.snapshot import SnapshotStorage, create_snapshot_store
+from feeds.shared.helper import content_digest
+from feeds.shared.state import JsonStateFile
 
 
 class ContentFileServiceBase:
+    """
+    The digest of the latest saved content is kept in memory and in a state file in the content dir,
+    so checking for changes doesn't read the saved content.
+    """
+
     date_format = "%Y-%m-%d-%H-%M-%S"
+    file_extension = ""
+    state_filename = "latest_content.json"
 
-    def __init__(self, content_dir_path: str):
+    def __init__(self, content_dir_path: str, snapshot_storage: SnapshotStorage = SnapshotStorage.FILES):
         self.content_dir_path = content_dir_path
         self.logger = logging.getLogger("ContentFileService")
         self._create_content_dir_if_not_exists()
+        self._snapshot_store = create_snapshot_store(snapshot_storage, content_dir_path, self.file_extension)
+        self._state_file = JsonStateFile(os.path.join(content_dir_path, self.state_filename))
+        self._latest_digest: str | None = None
+        self._is_latest_content_legacy = False
 
     @property
     def saved_content_count(self) -> int:
         raise NotImplementedError
 
     def save_content(self, content: bytes) -> None:
-        filename = self.get_new_filename()
-        file_path = os.path.join(self.content_dir_path, filename)
-        with open(file_path, "wb") as file:
-            self.logger.debug("Writing content to %s...", file_path)
-            file.write(content)
+        self._snapshot_store.save(self.get_new_filename(), content)
+        self._save_latest_digest(content_digest(content))
+        self._is_latest_content_legacy = False
+
+    def get_latest_digest(self) -> str | None:
+        """
+        Digest of the latest saved content. Computed from the normalized saved content, if there is no state file
+        yet, because the content has then been saved by an older version, maybe in another format
+        """
+        if self._latest_digest is None:
+            if not (latest_digest := self._state_file.load().get("digest")):
+                if (latest_content := self.read_latest_content()) is None:
+                    return None
+                latest_digest = content_digest(self.normalize_saved_content(latest_content))
+                self._is_latest_content_legacy = True
+                self._save_latest_digest(latest_digest)
+            self._latest_digest = latest_digest
+
+        return self._latest_digest
 
     def read_latest_content(self) -> bytes | None:
-        content_files = self._list_content_dir()
-        if not content_files:
-            return None
+        return self._snapshot_store.read_latest()
+
+    def read_latest_content_normalized(self) -> bytes | None:
+        """ The latest saved content in the current format """
+        if (latest_content := self.read_latest_content()) is None or not self._is_latest_content_legacy:
+            return latest_content
 
-        file_path = os.path.join(self.content_dir_path, content_files[0])
-        self.logger.debug("Reading content from %s...", file_path)
-        with open(file_path, "rb") as file:
-            return file.read()
+        return self.normalize_saved_content(latest_content)
 
     def get_new_filename(self) -> str:
         """Should be overwritten by subclasses"""
         raise NotImplementedError
 
+    def normalize_saved_content(self, content: bytes) -> bytes:
+        """Should be overwritten by subclasses, if the format of the saved content has changed"""
+        return content
+
     def _create_content_dir_if_not_exists(self) -> None:
         if os.path.exists(self.content_dir_path):
             return
@@ -45,42 +80,47 @@ class ContentFileServiceBase:
         os.makedirs(self.content_dir_path)
 
     def clean_up_content_dir(self) -> None:
-        saved_content = self._list_content_dir()
-        if len(saved_content) > self.saved_content_count:
-            for file in saved_content[self.saved_content_count:]:
-                file_path = os.path.join(self.content_dir_path, file)
-                self.logger.debug("Removing file %s...", file_path)
-                os.remove(file_path)
+        self._snapshot_store.clean_up(self.saved_content_count)
 
-    def _list_content_dir(self) -> list[str]:
-        return sorted(os.listdir(self.content_dir_path), reverse=True)
+    def _save_latest_digest(self, digest: str) -> None:
+        self._state_file.save({"digest": digest})
+        self._latest_digest = digest
 
 
 class HtmlContentFileService(ContentFileServiceBase):
-
-    def __init__(self, content_dir: str, base_filename: str):
-        super().__init__(content_dir)
+    file_extension = ".html"
+
+    def __init__(
+            self,
+            content_dir: str,
+            base_filename: str,
+            snapshot_storage: SnapshotStorage = SnapshotStorage.FILES,
+            diff_engine: DiffEngine | None = None,
+    ):
+        super().__init__(content_dir, snapshot_storage)
         self.base_filename = base_filename
+        self.diff_engine = diff_engine or MyersDiffEngine()
 
     @property
     def saved_content_count(self) -> int:
         return 50
 
     def get_new_filename(self) -> str:
-        return f"{self.base_filename}_{datetime.now().strftime(self.date_format)}.html"
+        return f"{self.base_filename}_{datetime.now().strftime(self.date_format)}{self.file_extension}"
+
+    def normalize_saved_content(self, content: bytes) -> bytes:
+        """ Content saved by older versions is raw HTML, new content is serialized by BeautifulSoup (e.g. <br/>) """
+        return str(BeautifulSoup(content, "html.parser")).encode()
 
     def get_diff(self, new_content: str) -> str:
-        if not (latest_content := self.read_latest_content()):
+        if not (latest_content := self.read_latest_content_normalized()):
             latest_content = b""
 
-        unified_diff_gen = unified_diff(
-            latest_content.decode(errors="ignore").splitlines(keepends=True),
-            new_content.splitlines(keepends=True),
-            fromfile="Latest saved content",
-            tofile="New content")
+        diff_result = self.diff_engine.diff(latest_content.decode(errors="ignore"), new_content)
+        diff_lines = diff_result.lines
+        if diff_result.truncated_reason:
+            self.logger.info("Diff truncated: %s", diff_result.truncated_reason)
+            diff_lines = [*diff_lines, f"[Diff truncated: {diff_result.truncated_reason}]"]
 
         new_line = "\n"
-        diff_content_escaped_html = [f"{html.escape(line.rstrip(new_line))}"
-                                     for line in unified_diff_gen]
-
-        return f"{new_line}".join(diff_content_escaped_html)
+        return new_line.join(html.escape(line) for line in diff_lines)
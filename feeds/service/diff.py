@@ -0,0 +1,242 @@
+import dataclasses
+import re
+import time
+from collections.abc import Iterator, Sequence
+from difflib import unified_diff
+from enum import StrEnum
+from typing import NamedTuple
+
+Opcode = tuple[str, int, int, int, int]
+
+
+class DiffEngineType(StrEnum):
+    DIFFLIB = "difflib"
+    MYERS = "myers"
+
+
+@dataclasses.dataclass(frozen=True)
+class DiffLimits:
+    """ Caps keeping the cost of a diff bounded. Lines longer than token_line_length are diffed as tokens """
+
+    max_input_chars: int = 1_000_000
+    max_output_lines: int = 1000
+    max_seconds: float = 2.0
+    max_edit_distance: int = 5000
+    token_line_length: int = 1000
+
+
+class DiffResult(NamedTuple):
+    lines: list[str]
+    truncated_reason: str | None = None
+
+
+class DiffEngine:
+    """ Creates unified diffs (without line endings) of two texts within the limits """
+
+    from_file = "Latest saved content"
+    to_file = "New content"
+    context_lines = 3
+
+    def __init__(self, limits: DiffLimits | None = None):
+        self.limits = limits or DiffLimits()
+
+    def diff(self, old_content: str, new_content: str) -> DiffResult:
+        truncated_reason = None
+        if len(old_content) > self.limits.max_input_chars or len(new_content) > self.limits.max_input_chars:
+            truncated_reason = f"input exceeds {self.limits.max_input_chars} characters"
+            old_content = old_content[:self.limits.max_input_chars]
+            new_content = new_content[:self.limits.max_input_chars]
+
+        lines, diff_truncated_reason = self._diff_lines(old_content.splitlines(), new_content.splitlines())
+        truncated_reason = truncated_reason or diff_truncated_reason
+        if len(lines) > self.limits.max_output_lines:
+            lines = lines[:self.limits.max_output_lines]
+            truncated_reason = truncated_reason or f"diff exceeds {self.limits.max_output_lines} lines"
+
+        return DiffResult(lines, truncated_reason)
+
+    def _diff_lines(self, old_lines: list[str], new_lines: list[str]) -> tuple[list[str], str | None]:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+
+class DifflibDiffEngine(DiffEngine):
+    """ difflib.unified_diff. Can be slow on large or heavily reordered content and has no time limit """
+
+    def _diff_lines(self, old_lines: list[str], new_lines: list[str]) -> tuple[list[str], str | None]:
+        lines = unified_diff(old_lines, new_lines, fromfile=self.from_file, tofile=self.to_file, lineterm="")
+        return [x.rstrip("\n") for x in lines], None
+
+
+class MyersDiffEngine(DiffEngine):
+    """
+    Myers' O(ND) diff on hashed lines after trimming the common prefix and suffix. Content with very long lines
+    (e.g. minified HTML) is diffed as tokens (tags and text) instead. When the time limit or the maximum edit
+    distance is exceeded, the changed region is shown as one replaced block.
+    """
+
+    _token_pattern = re.compile(r"<[^>]*>|[^<]+")
+
+    def _diff_lines(self, old_lines: list[str], new_lines: list[str]) -> tuple[list[str], str | None]:
+        if max(map(len, old_lines + new_lines), default=0) > self.limits.token_line_length:
+            old_lines, new_lines = self._tokenize(old_lines), self._tokenize(new_lines)
+
+        opcodes, truncated_reason = self._get_opcodes(old_lines, new_lines)
+        lines = []
+        for group in self._group_opcodes(opcodes):
+            if not lines:
+                lines.extend((f"--- {self.from_file}", f"+++ {self.to_file}"))
+            lines.extend(self._format_group(group, old_lines, new_lines))
+
+        return lines, truncated_reason
+
+    def _tokenize(self, lines: list[str]) -> list[str]:
+        return [x.strip() for x in self._token_pattern.findall(" ".join(lines)) if x.strip()]
+
+    def _get_opcodes(self, old_lines: list[str], new_lines: list[str]) -> tuple[list[Opcode], str | None]:
+        prefix_length = 0
+        while (prefix_length < min(len(old_lines), len(new_lines))
+               and old_lines[prefix_length] == new_lines[prefix_length]):
+            prefix_length += 1
+        suffix_length = 0
+        while (suffix_length < min(len(old_lines), len(new_lines)) - prefix_length
+               and old_lines[-1 - suffix_length] == new_lines[-1 - suffix_length]):
+            suffix_length += 1
+
+        old_end, new_end = len(old_lines) - suffix_length, len(new_lines) - suffix_length
+        line_ids: dict[str, int] = {}
+        old_ids = [line_ids.setdefault(x, len(line_ids)) for x in old_lines[prefix_length:old_end]]
+        new_ids = [line_ids.setdefault(x, len(line_ids)) for x in new_lines[prefix_length:new_end]]
+
+        truncated_reason = None
+        if (edits := self._get_edits(old_ids, new_ids)) is None:
+            truncated_reason = "diff too complex, changed region shown as one block"
+            edits = ["-"] * len(old_ids) + ["+"] * len(new_ids)
+
+        edits = ["="] * prefix_length + edits + ["="] * suffix_length
+        return self._create_opcodes(edits), truncated_reason
+
+    def _get_edits(self, old_ids: Sequence[int], new_ids: Sequence[int]) -> list[str] | None:
+        """ Edit script of "=", "-" and "+". None if the time limit or maximum edit distance is exceeded """
+        deadline = time.monotonic() + self.limits.max_seconds
+        old_length, new_length = len(old_ids), len(new_ids)
+        furthest_x = {1: 0}
+        trace = []
+        for distance in range(min(old_length + new_length, self.limits.max_edit_distance) + 1):
+            if time.monotonic() > deadline:
+                return None
+            trace.append(furthest_x.copy())
+            for k in range(-distance, distance + 1, 2):
+                if k == -distance or (k != distance and furthest_x[k - 1] < furthest_x[k + 1]):
+                    x = furthest_x[k + 1]
+                else:
+                    x = furthest_x[k - 1] + 1
+                y = x - k
+                while x < old_length and y < new_length and old_ids[x] == new_ids[y]:
+                    x, y = x + 1, y + 1
+                furthest_x[k] = x
+                if x >= old_length and y >= new_length:
+                    return self._backtrack(trace, old_length, new_length)
+
+        return None
+
+    @staticmethod
+    def _backtrack(trace: list[dict[int, int]], x: int, y: int) -> list[str]:
+        edits = []
+        for distance in range(len(trace) - 1, 0, -1):
+            furthest_x = trace[distance]
+            k = x - y
+            if k == -distance or (k != distance and furthest_x[k - 1] < furthest_x[k + 1]):
+                previous_k = k + 1
+            else:
+                previous_k = k - 1
+            previous_x = furthest_x[previous_k]
+            previous_y = previous_x - previous_k
+            while x > previous_x and y > previous_y:
+                edits.append("=")
+                x, y = x - 1, y - 1
+            edits.append("+" if x == previous_x else "-")
+            x, y = previous_x, previous_y
+        edits.extend("=" * x)
+
+        return edits[::-1]
+
+    @staticmethod
+    def _create_opcodes(edits: list[str]) -> list[Opcode]:
+        """ Converts the edit script to difflib style opcodes. Adjacent deletes and inserts become a replace """
+        opcodes = []
+        old_index = new_index = position = 0
+        while position < len(edits):
+            old_start, new_start = old_index, new_index
+            if edits[position] == "=":
+                while position < len(edits) and edits[position] == "=":
+                    old_index, new_index, position = old_index + 1, new_index + 1, position + 1
+                opcodes.append(("equal", old_start, old_index, new_start, new_index))
+                continue
+
+            while position < len(edits) and edits[position] != "=":
+                if edits[position] == "-":
+                    old_index += 1
+                else:
+                    new_index += 1
+                position += 1
+            tag = "replace" if old_index > old_start and new_index > new_start else (
+                "delete" if old_index > old_start else "insert")
+            opcodes.append((tag, old_start, old_index, new_start, new_index))
+
+        return opcodes
+
+    def _group_opcodes(self, opcodes: list[Opcode]) -> Iterator[list[Opcode]]:
+        """ Hunks with context_lines of context, like difflib.SequenceMatcher.get_grouped_opcodes """
+        if not opcodes or (len(opcodes) == 1 and opcodes[0][0] == "equal"):
+            return
+
+        context = self.context_lines
+        if opcodes[0][0] == "equal":
+            tag, i1, i2, j1, j2 = opcodes[0]
+            opcodes[0] = tag, max(i1, i2 - context), i2, max(j1, j2 - context), j2
+        if opcodes[-1][0] == "equal":
+            tag, i1, i2, j1, j2 = opcodes[-1]
+            opcodes[-1] = tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)
+
+        group = []
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == "equal" and i2 - i1 > 2 * context:
+                group.append((tag, i1, min(i2, i1 + context), j1, min(j2, j1 + context)))
+                yield group
+                group = []
+                i1, j1 = max(i1, i2 - context), max(j1, j2 - context)
+            group.append((tag, i1, i2, j1, j2))
+        if group and not (len(group) == 1 and group[0][0] == "equal"):
+            yield group
+
+    @staticmethod
+    def _format_group(group: list[Opcode], old_lines: list[str], new_lines: list[str]) -> Iterator[str]:
+        yield (f"@@ -{MyersDiffEngine._format_range(group[0][1], group[-1][2])} "
+               f"+{MyersDiffEngine._format_range(group[0][3], group[-1][4])} @@")
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                yield from (f" {x}" for x in old_lines[i1:i2])
+                continue
+            yield from (f"-{x}" for x in old_lines[i1:i2])
+            yield from (f"+{x}" for x in new_lines[j1:j2])
+
+    @staticmethod
+    def _format_range(start: int, stop: int) -> str:
+        """ Range in the unified diff format, like difflib """
+        beginning, length = start + 1, stop - start
+        if length == 1:
+            return f"{beginning}"
+        if not length:
+            beginning -= 1
+
+        return f"{beginning},{length}"
+
+
+def create_diff_engine(engine_type: DiffEngineType, limits: DiffLimits | None = None) -> DiffEngine:
+    if engine_type == DiffEngineType.DIFFLIB:
+        return DifflibDiffEngine(limits)
+    if engine_type == DiffEngineType.MYERS:
+        return MyersDiffEngine(limits)
+
+    raise ValueError(f"Invalid diff engine: {engine_type}")
@@ -0,0 +1,98 @@
+import importlib.util
+import logging
+import re
+import threading
+from collections import OrderedDict
+from enum import StrEnum
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+
+class HtmlParserBackend(StrEnum):
+    HTML_PARSER = "html.parser"
+    LXML = "lxml"
+
+
+class HtmlDocumentCache:
+    """
+    Parsed HTML documents by content, so checkers sharing a (coalesced) response parse it once and run
+    their selectors on the same tree. The parsed trees must be treated as read-only.
+    lxml is used as parser, if selected and installed, otherwise the pure-Python html.parser.
+    With scoped parsing, select_one only parses the elements matching the first compound of a simple selector
+    (e.g. "div.content" in "div.content > p") and falls back to parsing the full document, if that finds nothing.
+    """
+
+    _selector_separator_pattern = re.compile(r"\s*>\s*|\s+")
+    _compound_pattern = re.compile(
+        r"(?P<name>[a-zA-Z][\w-]*)?(?P<filters>(?:[#.][\w-]+|\[[\w-]+(?:=(?:\"[^\"]*\"|'[^']*'|[\w-]+))?])*)"
+    )
+    _filter_pattern = re.compile(r"#(?P<id>[\w-]+)|\.(?P<class>[\w-]+)|\[(?P<attribute>[\w-]+)(?:=(?P<value>[^]]*))?]")
+
+    def __init__(
+            self,
+            max_documents: int = 16,
+            parser_backend: HtmlParserBackend = HtmlParserBackend.HTML_PARSER,
+            scoped_parsing: bool = False,
+    ):
+        self.max_documents = max_documents
+        self._logger = logging.getLogger("HtmlDocumentCache")
+        self.parser_backend = self._get_available_backend(HtmlParserBackend(parser_backend))
+        self.scoped_parsing = scoped_parsing
+        self._lock = threading.Lock()
+        self._documents: OrderedDict[tuple[str, str | None], BeautifulSoup] = OrderedDict()
+
+    def get_document(self, content: str) -> BeautifulSoup:
+        return self._get_document(content, None, None)
+
+    def select_one(self, content: str, css_selector: str) -> Tag | None:
+        if self.scoped_parsing and (scope := self._get_scope(css_selector)):
+            scope_selector, parse_only = scope
+            if (node := self._get_document(content, scope_selector, parse_only).select_one(css_selector)) is not None:
+                return node
+            self._logger.debug("Nothing found in scope %s. Parsing full document...", scope_selector)
+
+        return self.get_document(content).select_one(css_selector)
+
+    def _get_document(self, content: str, scope_selector: str | None, parse_only: SoupStrainer | None) -> BeautifulSoup:
+        key = (content, scope_selector)
+        with self._lock:
+            if (document := self._documents.get(key)) is not None:
+                self._logger.debug("Reusing parsed document (%s characters)", len(content))
+                self._documents.move_to_end(key)
+                return document
+
+        document = BeautifulSoup(content, self.parser_backend, parse_only=parse_only)
+        with self._lock:
+            self._documents[key] = document
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+
+        return document
+
+    def _get_scope(self, css_selector: str) -> tuple[str, SoupStrainer] | None:
+        """ First compound of the selector and a strainer matching it. None if the selector isn't simple enough """
+        if any(x in css_selector for x in (",", "+", "~", ":", "*")):
+            return None
+        scope_selector = self._selector_separator_pattern.split(css_selector.strip(), maxsplit=1)[0]
+        if not scope_selector or not (compound := self._compound_pattern.fullmatch(scope_selector)):
+            return None
+
+        attrs: dict[str, str | bool | re.Pattern] = {}
+        for selector_filter in self._filter_pattern.finditer(compound.group("filters")):
+            if selector_filter.group("id"):
+                attrs["id"] = selector_filter.group("id")
+            elif selector_filter.group("class"):
+                # The strainer sees the unsplit class attribute, e.g. "content main"
+                attrs.setdefault("class", re.compile(rf"(^|\s){re.escape(selector_filter.group("class"))}(\s|$)"))
+            else:
+                value = selector_filter.group("value")
+                attrs[selector_filter.group("attribute")] = value.strip("\"'") if value is not None else True
+
+        return scope_selector, SoupStrainer(name=compound.group("name"), attrs=attrs)
+
+    def _get_available_backend(self, parser_backend: HtmlParserBackend) -> HtmlParserBackend:
+        if parser_backend == HtmlParserBackend.LXML and importlib.util.find_spec("lxml") is None:
+            self._logger.warning("lxml is not installed. Using %s instead.", HtmlParserBackend.HTML_PARSER)
+            return HtmlParserBackend.HTML_PARSER
+
+        return parser_backend
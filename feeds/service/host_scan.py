@@ -1,6 +1,9 @@
+import asyncio
 import dataclasses
 import logging
 import os
+import subprocess
+import threading
 import time
 import xml.etree.ElementTree as ET
 from enum import IntEnum
@@ -24,17 +27,22 @@ class HostScanResult:
 
 
 class HostScanService:
-    async def scan_host_tcp_ports(self, host: str) -> HostScanResult:
-        """Scan host for open and filtered TCP ports."""
+    async def scan_host_tcp_ports(self, host: str, scan_id: str) -> HostScanResult:
+        """Scan host for open and filtered TCP ports. scan_id identifies the scan, e.g. to cancel it."""
         raise NotImplementedError
 
+    def cancel_scan(self, scan_id: str) -> None:
+        """Cancel a running scan. Should be overwritten by subclasses running external processes"""
+
 
 class NmapScanService(HostScanService):
     def __init__(self):
         self._logger = logging.getLogger("NmapScanService")
         self._cmd = "nmap -vv -Pn -sT -p0-65535 {host} -oX {xml_file} -T5"
+        self._processes: dict[str, subprocess.Popen] = {}
+        self._processes_lock = threading.Lock()
 
-    async def scan_host_tcp_ports(self, host: str) -> HostScanResult:
+    async def scan_host_tcp_ports(self, host: str, scan_id: str) -> HostScanResult:
         time_start = time.perf_counter()
         with TemporaryDirectory() as temp_dir:
             temp_scan_result_file = os.path.join(temp_dir, f"nmap_scan_result_{slugify(host)}_{time.time_ns()}.xml")
@@ -44,7 +52,7 @@ class NmapScanService(HostScanService):
                 host,
                 temp_scan_result_file,
             )
-            exit_code = os.system(cmd)
+            exit_code = await self._run_scan(scan_id, cmd)
             if exit_code != 0:
                 raise RuntimeError(
                     f"Failed to scan host {host} with nmap. Maybe nmap is missing Exit code: {exit_code}"
@@ -55,6 +63,24 @@ class NmapScanService(HostScanService):
             self._logger.info("Scan finished in %s seconds", time.perf_counter() - time_start)
             return scan_result[0]
 
+    def cancel_scan(self, scan_id: str) -> None:
+        with self._processes_lock:
+            process = self._processes.get(scan_id)
+        if process and process.poll() is None:
+            self._logger.info("Killing scan %s (pid %s)", scan_id, process.pid)
+            process.kill()
+
+    async def _run_scan(self, scan_id: str, cmd: str) -> int:
+        """ The process is kept by scan id, so concurrent scans of the same host can be cancelled separately """
+        with subprocess.Popen(cmd.split(), stdout=subprocess.DEVNULL) as process:
+            with self._processes_lock:
+                self._processes[scan_id] = process
+            try:
+                return await asyncio.to_thread(process.wait)
+            finally:
+                with self._processes_lock:
+                    self._processes.pop(scan_id, None)
+
     async def _parse_scan_result(self, scan_result_file: str, host: str) -> list[HostScanResult]:
         self._logger.info("Parsing scan result from %s", scan_result_file)
         with open(scan_result_file, "r", encoding="utf-8") as f:
@@ -0,0 +1,37 @@
+from collections import OrderedDict
+from collections.abc import Iterable
+from hashlib import sha256
+
+from feeds.shared.state import JsonStateFile
+
+
+class SeenItemIndex:
+    """
+    Persistent set of the items seen in a feed. Item keys are stored as short hashes in insertion order,
+    and the oldest are evicted, when there are more than max_items.
+    """
+
+    _key_length = 16
+
+    def __init__(self, file_path: str, max_items: int):
+        self.max_items = max_items
+        self._state_file = JsonStateFile(file_path)
+        self._keys: OrderedDict[str, None] = OrderedDict.fromkeys(self._state_file.load().get("keys", []))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, item_key: str) -> bool:
+        return self._hash_key(item_key) in self._keys
+
+    def add(self, item_keys: Iterable[str]) -> None:
+        for item_key in item_keys:
+            self._keys[self._hash_key(item_key)] = None
+        while len(self._keys) > self.max_items:
+            self._keys.popitem(last=False)
+
+    def save(self) -> None:
+        self._state_file.save({"keys": list(self._keys)})
+
+    def _hash_key(self, item_key: str) -> str:
+        return sha256(item_key.encode()).hexdigest()[:self._key_length]
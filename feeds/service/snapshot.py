@@ -0,0 +1,362 @@
+import json
+import logging
+import os
+import zlib
+from collections.abc import Iterator
+from difflib import SequenceMatcher
+from enum import StrEnum
+from hashlib import sha256
+from typing import Any
+
+from feeds.shared.state import JsonStateFile
+
+
+class SnapshotStorage(StrEnum):
+    FILES = "files"
+    CONTENT_ADDRESSED = "content_addressed"
+    COMPRESSED_DELTA = "compressed_delta"
+
+
+class SnapshotStore:
+    """ Base class for stores of named content snapshots (e.g. saved pages or feeds). Names sort by time """
+
+    def __init__(self, dir_path: str, file_extension: str):
+        self.dir_path = dir_path
+        self.file_extension = file_extension
+        self.logger = logging.getLogger(self.__class__.__name__)
+        os.makedirs(self.dir_path, exist_ok=True)
+        _move_legacy_delta_manifest(self.dir_path)
+
+    def save(self, name: str, content: bytes) -> None:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+    def read_latest(self) -> bytes | None:
+        """Should be overwritten by subclasses"""
+        raise NotImplementedError
+
+    def read_latest_chunks(self, chunk_size: int) -> Iterator[bytes] | None:
+        """
+        The latest snapshot in chunks of chunk_size bytes. Should be overwritten by subclasses, which can read
+        the snapshot from a file without loading it into memory
+        """
+        if (content := self.read_latest()) is None:
+            return None
+
+        return (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+
+    def read(self, name: str) -> bytes | None:
+        """Should be overwritten by subclasses. Returns None, if there is no snapshot with the name"""
+        raise NotImplementedError
+
+    def list_names(self) -> list[str]:
+        """Should be overwritten by subclasses. Returns the names of the snapshots, newest first"""
+        raise NotImplementedError
+
+    def clean_up(self, keep_count: int) -> None:
+        """Should be overwritten by subclasses. Removes all but the newest keep_count snapshots"""
+        raise NotImplementedError
+
+    def _import_other_stores(self) -> None:
+        """
+        Moves the snapshots of the other stores with a manifest in the dir into this store, oldest first,
+        so switching the storage of a feed keeps its history. The stores are imported on first use of a store
+        with a manifest, so a store opened for importing never imports itself
+        """
+        for store_class in (ContentAddressedSnapshotStore, DeltaSnapshotStore):
+            if isinstance(self, store_class) or not os.path.exists(
+                    os.path.join(self.dir_path, store_class.manifest_filename)
+            ):
+                continue
+
+            self.logger.info("Importing snapshots of %s in %s...", store_class.__name__, self.dir_path)
+            other_store = store_class(self.dir_path, self.file_extension)
+            for name in reversed(other_store.list_names()):
+                self.save(name, other_store.read(name))
+            other_store.remove()
+
+    def _list_snapshot_files(self) -> list[str]:
+        return sorted((x for x in os.listdir(self.dir_path) if x.endswith(self.file_extension)), reverse=True)
+
+    def _import_snapshot_files(self) -> None:
+        """ Moves the snapshot files of the file store into this store, oldest first """
+        for file in reversed(self._list_snapshot_files()):
+            file_path = os.path.join(self.dir_path, file)
+            self.logger.info("Importing %s into snapshot store...", file_path)
+            with open(file_path, "rb") as snapshot_file:
+                self.save(file, snapshot_file.read())
+            os.remove(file_path)
+
+    @staticmethod
+    def _read_file_chunks(file_path: str, chunk_size: int) -> Iterator[bytes]:
+        with open(file_path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                yield chunk
+
+    @staticmethod
+    def _write_file(file_path: str, content: bytes) -> None:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_file_path = f"{file_path}.tmp"
+        with open(temp_file_path, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file_path, file_path)
+
+
+class FileSnapshotStore(SnapshotStore):
+    """ Writes every snapshot to its own file """
+
+    def __init__(self, dir_path: str, file_extension: str):
+        super().__init__(dir_path, file_extension)
+        self._import_other_stores()
+
+    def save(self, name: str, content: bytes) -> None:
+        file_path = os.path.join(self.dir_path, name)
+        with open(file_path, "wb") as file:
+            self.logger.debug("Writing content to %s...", file_path)
+            file.write(content)
+
+    def read_latest(self) -> bytes | None:
+        if not (snapshot_files := self._list_snapshot_files()):
+            return None
+
+        file_path = os.path.join(self.dir_path, snapshot_files[0])
+        self.logger.debug("Reading content from %s...", file_path)
+        with open(file_path, "rb") as file:
+            return file.read()
+
+    def read_latest_chunks(self, chunk_size: int) -> Iterator[bytes] | None:
+        if not (snapshot_files := self._list_snapshot_files()):
+            return None
+
+        return self._read_file_chunks(os.path.join(self.dir_path, snapshot_files[0]), chunk_size)
+
+    def read(self, name: str) -> bytes | None:
+        if not os.path.exists(file_path := os.path.join(self.dir_path, name)):
+            return None
+
+        with open(file_path, "rb") as file:
+            return file.read()
+
+    def list_names(self) -> list[str]:
+        return self._list_snapshot_files()
+
+    def clean_up(self, keep_count: int) -> None:
+        for file in self._list_snapshot_files()[keep_count:]:
+            file_path = os.path.join(self.dir_path, file)
+            self.logger.debug("Removing file %s...", file_path)
+            os.remove(file_path)
+
+
+class ContentAddressedSnapshotStore(SnapshotStore):
+    """
+    Stores each distinct content once as a blob named by its SHA-256 digest. Snapshots are entries in a manifest
+    pointing at a blob, so saving unchanged content only rewrites the manifest. Blobs no longer referenced by
+    the manifest are removed on clean up. Snapshot files of the file store are imported on first use.
+    """
+
+    manifest_filename = "manifest.json"
+    blob_dir_name = "blobs"
+
+    def __init__(self, dir_path: str, file_extension: str):
+        super().__init__(dir_path, file_extension)
+        self._blob_dir_path = os.path.join(self.dir_path, self.blob_dir_name)
+        self._manifest = JsonStateFile(os.path.join(self.dir_path, self.manifest_filename))
+        self._entries: list[dict[str, str]] = self._manifest.load().get("entries", [])
+        if not os.path.exists(self._manifest.file_path):
+            self._import_other_stores()
+            self._import_snapshot_files()
+
+    def save(self, name: str, content: bytes) -> None:
+        digest = sha256(content).hexdigest()
+        if not os.path.exists(blob_path := self._get_blob_path(digest)):
+            self.logger.debug("Writing blob %s...", blob_path)
+            self._write_file(blob_path, content)
+        self._entries.append({"name": name, "digest": digest})
+        self._manifest.save({"entries": self._entries})
+
+    def read_latest(self) -> bytes | None:
+        return self._read_blob(self._entries[-1]["digest"]) if self._entries else None
+
+    def read_latest_chunks(self, chunk_size: int) -> Iterator[bytes] | None:
+        if not self._entries:
+            return None
+
+        return self._read_file_chunks(self._get_blob_path(self._entries[-1]["digest"]), chunk_size)
+
+    def read(self, name: str) -> bytes | None:
+        for entry in reversed(self._entries):
+            if entry["name"] == name:
+                return self._read_blob(entry["digest"])
+
+        return None
+
+    def list_names(self) -> list[str]:
+        return [x["name"] for x in reversed(self._entries)]
+
+    def clean_up(self, keep_count: int) -> None:
+        if len(self._entries) > keep_count:
+            self._entries = self._entries[-keep_count:] if keep_count else []
+            self._manifest.save({"entries": self._entries})
+        self._collect_garbage()
+
+    def remove(self) -> None:
+        """ Removes all snapshots and the manifest """
+        self.clean_up(0)
+        os.remove(self._manifest.file_path)
+
+    def _collect_garbage(self) -> None:
+        referenced_digests = {x["digest"] for x in self._entries}
+        if not os.path.exists(self._blob_dir_path):
+            return
+
+        for prefix in os.listdir(self._blob_dir_path):
+            prefix_dir_path = os.path.join(self._blob_dir_path, prefix)
+            for digest in os.listdir(prefix_dir_path):
+                if digest not in referenced_digests:
+                    self.logger.debug("Removing unreferenced blob %s...", digest)
+                    os.remove(os.path.join(prefix_dir_path, digest))
+
+    def _get_blob_path(self, digest: str) -> str:
+        return os.path.join(self._blob_dir_path, digest[:2], digest)
+
+    def _read_blob(self, digest: str) -> bytes:
+        with open(self._get_blob_path(digest), "rb") as file:
+            return file.read()
+
+
+class DeltaSnapshotStore(SnapshotStore):
+    """
+    Stores snapshots zlib compressed with reverse deltas: the latest snapshot is always stored in full, so reading
+    it is one decompression. When a new snapshot is saved, the previous one is replaced by a delta against it,
+    except every keyframe_interval-th snapshot, which is kept in full to bound the chain of deltas to apply
+    when an older snapshot is rebuilt. Deltas only refer to newer snapshots, so the oldest can always be removed.
+    """
+
+    manifest_filename = "delta_manifest.json"
+    object_dir_name = "objects"
+    keyframe_interval = 10
+    _compression_level = 9
+
+    def __init__(self, dir_path: str, file_extension: str):
+        super().__init__(dir_path, file_extension)
+        self._object_dir_path = os.path.join(self.dir_path, self.object_dir_name)
+        self._manifest = JsonStateFile(os.path.join(self.dir_path, self.manifest_filename))
+        manifest = self._manifest.load()
+        self._entries: list[dict[str, Any]] = manifest.get("entries", [])
+        self._next_id: int = manifest.get("next_id", 0)
+        if not os.path.exists(self._manifest.file_path):
+            self._import_other_stores()
+            self._import_snapshot_files()
+
+    def save(self, name: str, content: bytes) -> None:
+        entry = {"name": name, "id": self._next_id, "file": f"{self._next_id}.full.z", "delta": False}
+        self._next_id += 1
+        self._write_object(entry["file"], content)
+
+        replaced_file = None
+        previous_entry = self._entries[-1] if self._entries else None
+        if previous_entry and not previous_entry["delta"] and not self._is_keyframe(previous_entry):
+            previous_content = self._read_object(previous_entry["file"])
+            replaced_file = previous_entry["file"]
+            previous_entry["file"] = f"{previous_entry["id"]}.delta.z"
+            previous_entry["delta"] = True
+            self._write_object(previous_entry["file"], self._create_delta(content, previous_content))
+
+        self._entries.append(entry)
+        self._save_manifest()
+        if replaced_file:
+            os.remove(os.path.join(self._object_dir_path, replaced_file))
+
+    def read_latest(self) -> bytes | None:
+        return self._read_object(self._entries[-1]["file"]) if self._entries else None
+
+    def read(self, name: str) -> bytes | None:
+        indexes = [i for i, x in enumerate(self._entries) if x["name"] == name]
+        return self._rebuild(indexes[-1]) if indexes else None
+
+    def list_names(self) -> list[str]:
+        return [x["name"] for x in reversed(self._entries)]
+
+    def clean_up(self, keep_count: int) -> None:
+        if len(self._entries) <= keep_count:
+            return
+
+        removed_entries = self._entries[:len(self._entries) - keep_count]
+        self._entries = self._entries[len(self._entries) - keep_count:]
+        self._save_manifest()
+        for entry in removed_entries:
+            self.logger.debug("Removing snapshot %s...", entry["name"])
+            os.remove(os.path.join(self._object_dir_path, entry["file"]))
+
+    def remove(self) -> None:
+        """ Removes all snapshots and the manifest """
+        self.clean_up(0)
+        os.remove(self._manifest.file_path)
+
+    def _rebuild(self, index: int) -> bytes:
+        """ Applies the deltas from the nearest newer full snapshot back to the snapshot at the index """
+        full_index = next(i for i in range(index, len(self._entries)) if not self._entries[i]["delta"])
+        content = self._read_object(self._entries[full_index]["file"])
+        for i in range(full_index - 1, index - 1, -1):
+            content = self._apply_delta(content, self._read_object(self._entries[i]["file"]))
+
+        return content
+
+    def _is_keyframe(self, entry: dict[str, Any]) -> bool:
+        return entry["id"] % self.keyframe_interval == 0
+
+    def _save_manifest(self) -> None:
+        self._manifest.save({"entries": self._entries, "next_id": self._next_id})
+
+    def _write_object(self, filename: str, content: bytes) -> None:
+        self._write_file(os.path.join(self._object_dir_path, filename), zlib.compress(content, self._compression_level))
+
+    def _read_object(self, filename: str) -> bytes:
+        with open(os.path.join(self._object_dir_path, filename), "rb") as file:
+            return zlib.decompress(file.read())
+
+    @staticmethod
+    def _create_delta(base: bytes, target: bytes) -> bytes:
+        """
+        Line based delta rebuilding target from base: [start, end] copies lines of base, a string inserts lines.
+        Lines are decoded as latin-1, which maps every byte to one character, so any content round-trips
+        """
+        base_lines = base.splitlines(keepends=True)
+        target_lines = target.splitlines(keepends=True)
+        operations: list[list[int] | str] = []
+        for tag, base_start, base_end, target_start, target_end in SequenceMatcher(
+                None, base_lines, target_lines
+        ).get_opcodes():
+            if tag == "equal":
+                operations.append([base_start, base_end])
+            elif target_end > target_start:
+                operations.append(b"".join(target_lines[target_start:target_end]).decode("latin-1"))
+
+        return json.dumps(operations).encode()
+
+    @staticmethod
+    def _apply_delta(base: bytes, delta: bytes) -> bytes:
+        base_lines = base.splitlines(keepends=True)
+        return b"".join(
+            b"".join(base_lines[x[0]:x[1]]) if isinstance(x, list) else x.encode("latin-1") for x in json.loads(delta)
+        )
+
+
+def _move_legacy_delta_manifest(dir_path: str) -> None:
+    """ The delta store used to share the manifest name with the content addressed store """
+    legacy_manifest = JsonStateFile(os.path.join(dir_path, ContentAddressedSnapshotStore.manifest_filename))
+    if "next_id" in legacy_manifest.load():
+        os.replace(legacy_manifest.file_path, os.path.join(dir_path, DeltaSnapshotStore.manifest_filename))
+
+
+def create_snapshot_store(storage: SnapshotStorage, dir_path: str, file_extension: str) -> SnapshotStore:
+    if storage == SnapshotStorage.FILES:
+        return FileSnapshotStore(dir_path, file_extension)
+    if storage == SnapshotStorage.CONTENT_ADDRESSED:
+        return ContentAddressedSnapshotStore(dir_path, file_extension)
+    if storage == SnapshotStorage.COMPRESSED_DELTA:
+        return DeltaSnapshotStore(dir_path, file_extension)
+
+    raise ValueError(f"Invalid snapshot storage: {storage}")
@@ -1,6 +1,8 @@
 import os
 
 MAX_THREAD_COUNT = 8
+DEFAULT_CHECK_TIMEOUT_SECONDS = 900
 
 CONFIG_PATH = os.getenv("CONFIG_PATH")
 DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+HTTP_VALIDATOR_CACHE_PATH = os.getenv("HTTP_VALIDATOR_CACHE_PATH", "data/http_validators.json")
@@ -7,8 +7,21 @@ class ConfigKeys(StrEnum):
     NAME = "name"
     EXPECTED_STATUS_CODE = "expected_status_code"
     CSS_SELECTOR = "css_selector"
+    CSS_SELECTORS = "css_selectors"
     CSS_SELECTOR_LOADED = "css_selector_loaded"
     CSS_SELECTOR_CONTENT = "css_selector_content"
     SAVED_FEEDS_COUNT = "saved_feeds_count"
     HOST = "host"
     EXPECTED_OPEN_PORTS = "expected_open_ports"
+    ADAPTIVE_MIN_INTERVAL_SECONDS = "adaptive_min_interval_seconds"
+    ADAPTIVE_MAX_INTERVAL_SECONDS = "adaptive_max_interval_seconds"
+    TIMEOUT_SECONDS = "timeout_seconds"
+    CONDITIONAL_GET = "conditional_get"
+    RENDER_PROFILE = "render_profile"
+    DISABLE_CSS = "disable_css"
+    STATIC_FIRST = "static_first"
+    MAX_SEEN_ITEMS = "max_seen_items"
+    SNAPSHOT_STORAGE = "snapshot_storage"
+    DIFF_ENGINE = "diff_engine"
+    CANONICALIZATION = "canonicalization"
+    MONITORING = "monitoring"
@@ -0,0 +1,31 @@
+import json
+import os
+from typing import Any
+
+
+class JsonStateFile:
+    """ Small JSON document persisted atomically (write to a temporary file and replace) """
+
+    _encoding = "utf-8"
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def load(self) -> dict[str, Any]:
+        if not os.path.exists(self.file_path):
+            return {}
+
+        with open(self.file_path, "r", encoding=self._encoding) as file:
+            try:
+                return json.load(file)
+            except json.JSONDecodeError:
+                return {}
+
+    def save(self, state: dict[str, Any]) -> None:
+        os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+        temp_file_path = f"{self.file_path}.tmp"
+        with open(temp_file_path, "w", encoding=self._encoding) as file:
+            json.dump(state, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file_path, self.file_path)
@@ -0,0 +1,36 @@
+from feeds.service.diff import DiffLimits, DifflibDiffEngine, MyersDiffEngine
+
+
+def _get_lines(count: int, changed: set[int] = frozenset()) -> str:
+    return "\n".join(f"<p>Changed {x}</p>" if x in changed else f"<p>Line {x}</p>" for x in range(count))
+
+
+def test_myers_diff_matches_difflib():
+    old_content, new_content = _get_lines(100), _get_lines(100, changed={3, 50, 51, 97})
+
+    assert MyersDiffEngine().diff(old_content, new_content) == DifflibDiffEngine().diff(old_content, new_content)
+
+
+def test_myers_diff_tokenizes_long_lines():
+    old_content = "".join(f"<p>Line {x}</p>" for x in range(1000))
+    new_content = old_content.replace("<p>Line 500</p>", "<p>Changed</p>")
+
+    diff_result = MyersDiffEngine().diff(old_content, new_content)
+
+    assert [x for x in diff_result.lines if x[:1] in "+-" and x[:3] not in ("---", "+++")] == ["-Line 500", "+Changed"]
+
+
+def test_myers_diff_truncates_output():
+    diff_result = MyersDiffEngine(DiffLimits(max_output_lines=10)).diff(_get_lines(100), _get_lines(100, set(range(50))))
+
+    assert len(diff_result.lines) == 10
+    assert diff_result.truncated_reason
+
+
+def test_myers_diff_falls_back_to_one_block_when_too_complex():
+    old_content, new_content = _get_lines(20), _get_lines(20, changed={2, 10, 17})
+
+    diff_result = MyersDiffEngine(DiffLimits(max_edit_distance=2)).diff(old_content, new_content)
+
+    assert diff_result.truncated_reason
+    assert len([x for x in diff_result.lines if x.startswith("-<p>")]) == 16
@@ -0,0 +1,56 @@
+from bs4 import BeautifulSoup
+
+from feeds.service.canonical import CanonicalizationConfiguration, HtmlCanonicalizer, SuppressedChangeCounter
+
+HTML = """<div class="content" data-nonce="abc123">
+    <p id="updated">Updated 12:34</p>
+    <p>Some   text</p>
+    <span class="timestamp">2024-01-01</span>
+</div>"""
+
+
+def _canonicalize(html: str, **configuration) -> str:
+    node = BeautifulSoup(html, "html.parser").select_one(".content")
+    return HtmlCanonicalizer(CanonicalizationConfiguration(**configuration)).canonicalize(node)
+
+
+def test_canonicalizer_without_steps_keeps_content():
+    assert _canonicalize(HTML) == str(BeautifulSoup(HTML, "html.parser").select_one(".content"))
+
+
+def test_canonicalizer_removes_noise():
+    configuration = {
+        "strip_attributes": ("data-*", "id"),
+        "ignore_selectors": (".timestamp",),
+        "regex_masks": (r"\d{2}:\d{2}",),
+        "collapse_whitespace": True,
+    }
+
+    assert _canonicalize(HTML, **configuration) == _canonicalize(
+        HTML.replace("abc123", "def456").replace("12:34", "12:35").replace("2024", "2025").replace("Some   ", "Some "),
+        **configuration,
+    )
+    assert "nonce" not in _canonicalize(HTML, **configuration)
+    assert "[masked]" in _canonicalize(HTML, **configuration)
+
+
+def test_canonicalizer_text_only():
+    assert _canonicalize(HTML, text_only=True, collapse_whitespace=True) == "Updated 12:34\nSome text\n2024-01-01"
+
+
+def test_canonicalizer_does_not_modify_shared_document():
+    document = BeautifulSoup(HTML, "html.parser")
+    canonicalizer = HtmlCanonicalizer(CanonicalizationConfiguration(ignore_selectors=(".timestamp",)))
+
+    canonicalizer.canonicalize(document.select_one(".content"))
+
+    assert document.select_one(".timestamp") is not None
+
+
+def test_suppressed_change_counter(tmp_path):
+    counter = SuppressedChangeCounter(str(tmp_path / "canonicalization.json"))
+
+    assert not counter.record("<p>1</p>", canonical_content_changed=False)
+    assert counter.record("<p>2</p>", canonical_content_changed=False)
+    assert not counter.record("<p>3</p>", canonical_content_changed=True)
+    assert SuppressedChangeCounter(str(tmp_path / "canonicalization.json")).count == 1
@@ -1,6 +1,10 @@
+import os
+
 import pytest
 
 from feeds.service.content import HtmlContentFileService
+from feeds.service.diff import DiffLimits, MyersDiffEngine
+from feeds.shared.helper import content_digest
 
 
 @pytest.fixture(name="html_file_service")
@@ -128,3 +132,48 @@ def test_get_diff_escape_html(html_file_service):
     assert count_added_lines(diff) == 1
     assert count_removed_lines(diff) == 0
     map(lambda c: c not in diff, ("<html>", "</html>", "<body>", "</body>", "<h1>", "</h1>"))
+
+
+def test_latest_digest_is_read_from_state_file(tmp_path, html_file_service):
+    html_file_service.save_content(b"<p>Test</p>")
+    html_file_service.read_latest_content = None  # Saved content must not be read
+
+    html_file_service_restarted = HtmlContentFileService(str(tmp_path), "my_page")
+    html_file_service_restarted.read_latest_content = None
+
+    assert html_file_service.get_latest_digest() == content_digest(b"<p>Test</p>")
+    assert html_file_service_restarted.get_latest_digest() == content_digest(b"<p>Test</p>")
+
+
+def test_latest_digest_falls_back_to_saved_content(tmp_path, html_file_service):
+    html_file_service.save_content(b"<p>Test</p>")
+    os.remove(tmp_path / HtmlContentFileService.state_filename)
+
+    html_file_service_restarted = HtmlContentFileService(str(tmp_path), "my_page")
+
+    assert html_file_service_restarted.get_latest_digest() == content_digest(b"<p>Test</p>")
+    assert os.path.exists(tmp_path / HtmlContentFileService.state_filename)
+
+
+def test_legacy_saved_content_is_normalized(tmp_path, html_file_service):
+    legacy_content = b"<div><p>Line<br>Next line</p></div>"
+    html_file_service.save_content(legacy_content)
+    os.remove(tmp_path / HtmlContentFileService.state_filename)
+    new_content = "<div><p>Line<br/>Next line</p></div>"
+
+    html_file_service_restarted = HtmlContentFileService(str(tmp_path), "my_page")
+
+    assert html_file_service_restarted.get_latest_digest() == content_digest(new_content.encode())
+    assert not html_file_service_restarted.get_diff(new_content)
+    assert html_file_service_restarted.read_latest_content() == legacy_content
+
+
+def test_get_diff_notes_truncation(tmp_path):
+    html_file_service = HtmlContentFileService(
+        str(tmp_path), "my_page", diff_engine=MyersDiffEngine(DiffLimits(max_output_lines=5))
+    )
+    html_file_service.save_content("\n".join(f"<p>{x}</p>" for x in range(20)).encode())
+
+    diff = html_file_service.get_diff("\n".join(f"<p>New {x}</p>" for x in range(20)))
+
+    assert diff.splitlines()[-1].startswith("[Diff truncated:")
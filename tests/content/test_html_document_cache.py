@@ -0,0 +1,39 @@
+import pytest
+
+from feeds.service.document import HtmlDocumentCache, HtmlParserBackend
+
+HTML = """<html><body>
+<div id="header"><p>Header</p></div>
+<div class="content main" data-role="article"><h1>Title</h1><p class="text">Text</p></div>
+<ul><li>One</li><li>Two</li></ul>
+</body></html>"""
+
+
+@pytest.mark.parametrize("parser_backend", list(HtmlParserBackend))
+@pytest.mark.parametrize(
+    "css_selector",
+    ["div.content", ".main p.text", "#header > p", "div[data-role=article] h1", "ul li:nth-of-type(2)", "h2 + p"],
+)
+def test_scoped_parsing_selects_same_node_as_full_parsing(parser_backend, css_selector):
+    full_parsing_cache = HtmlDocumentCache(parser_backend=parser_backend)
+    scoped_parsing_cache = HtmlDocumentCache(parser_backend=parser_backend, scoped_parsing=True)
+
+    assert str(scoped_parsing_cache.select_one(HTML, css_selector)) == str(
+        full_parsing_cache.select_one(HTML, css_selector)
+    )
+
+
+def test_scoped_parsing_only_parses_scope():
+    document_cache = HtmlDocumentCache(scoped_parsing=True)
+
+    document_cache.select_one(HTML, ".content h1")
+
+    assert document_cache._documents
+    assert all("Header" not in str(x) for x in document_cache._documents.values())
+
+
+def test_scoped_parsing_falls_back_to_full_document():
+    document_cache = HtmlDocumentCache(scoped_parsing=True)
+
+    assert document_cache.select_one(HTML, "#header .text") is None
+    assert document_cache.select_one("<p class='a'>1</p><div class='a'>2</div>", "div.a").text == "2"
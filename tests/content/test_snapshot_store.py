@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from feeds.service.snapshot import (
+    ContentAddressedSnapshotStore,
+    DeltaSnapshotStore,
+    SnapshotStorage,
+    create_snapshot_store,
+)
+
+
+@pytest.fixture(name="snapshot_store")
+def snapshot_store(tmp_path) -> ContentAddressedSnapshotStore:
+    return ContentAddressedSnapshotStore(str(tmp_path), ".html")
+
+
+def count_blobs(snapshot_store: ContentAddressedSnapshotStore) -> int:
+    blob_dir_path = os.path.join(snapshot_store.dir_path, snapshot_store.blob_dir_name)
+    return sum(len(files) for _, _, files in os.walk(blob_dir_path))
+
+
+def test_content_addressed_store_deduplicates_content(snapshot_store):
+    snapshot_store.save("page_1.html", b"<p>Same</p>")
+    snapshot_store.save("page_2.html", b"<p>Same</p>")
+
+    assert snapshot_store.list_names() == ["page_2.html", "page_1.html"]
+    assert snapshot_store.read_latest() == b"<p>Same</p>"
+    assert count_blobs(snapshot_store) == 1
+
+
+def test_content_addressed_store_removes_unreferenced_blobs(snapshot_store):
+    snapshot_store.save("page_1.html", b"<p>Old</p>")
+    snapshot_store.save("page_2.html", b"<p>New</p>")
+    snapshot_store.save("page_3.html", b"<p>New</p>")
+
+    snapshot_store.clean_up(keep_count=2)
+
+    assert snapshot_store.list_names() == ["page_3.html", "page_2.html"]
+    assert count_blobs(snapshot_store) == 1
+
+
+def test_content_addressed_store_imports_snapshot_files(tmp_path):
+    for name, content in (("page_1.html", b"<p>Old</p>"), ("page_2.html", b"<p>New</p>")):
+        (tmp_path / name).write_bytes(content)
+
+    snapshot_store = ContentAddressedSnapshotStore(str(tmp_path), ".html")
+    snapshot_store = ContentAddressedSnapshotStore(str(tmp_path), ".html")
+
+    assert snapshot_store.list_names() == ["page_2.html", "page_1.html"]
+    assert snapshot_store.read_latest() == b"<p>New</p>"
+    assert not (tmp_path / "page_1.html").exists()
+
+
+def test_delta_store_rebuilds_older_snapshots(tmp_path):
+    snapshot_store = DeltaSnapshotStore(str(tmp_path), ".html")
+    snapshot_store.keyframe_interval = 3
+    versions = [f"<p>Header</p>\n<p>Version {x}</p>\n<p>Footer</p>\n".encode() for x in range(7)]
+    for index, content in enumerate(versions):
+        snapshot_store.save(f"page_{index}.html", content)
+
+    snapshot_store = DeltaSnapshotStore(str(tmp_path), ".html")
+
+    assert snapshot_store.read_latest() == versions[-1]
+    assert [snapshot_store.read(f"page_{x}.html") for x in range(7)] == versions
+    assert len(os.listdir(tmp_path / snapshot_store.object_dir_name)) == 7
+
+
+def test_delta_store_removes_oldest_snapshots(tmp_path):
+    snapshot_store = DeltaSnapshotStore(str(tmp_path), ".html")
+    for index in range(5):
+        snapshot_store.save(f"page_{index}.html", f"<p>Version {index}</p>".encode())
+
+    snapshot_store.clean_up(keep_count=2)
+
+    assert snapshot_store.list_names() == ["page_4.html", "page_3.html"]
+    assert snapshot_store.read("page_3.html") == b"<p>Version 3</p>"
+    assert len(os.listdir(tmp_path / snapshot_store.object_dir_name)) == 2
+
+
+@pytest.mark.parametrize("old_storage,new_storage", [
+    (SnapshotStorage.CONTENT_ADDRESSED, SnapshotStorage.COMPRESSED_DELTA),
+    (SnapshotStorage.COMPRESSED_DELTA, SnapshotStorage.CONTENT_ADDRESSED),
+    (SnapshotStorage.COMPRESSED_DELTA, SnapshotStorage.FILES),
+    (SnapshotStorage.CONTENT_ADDRESSED, SnapshotStorage.FILES),
+])
+def test_snapshot_store_keeps_history_when_storage_changes(tmp_path, old_storage, new_storage):
+    old_store = create_snapshot_store(old_storage, str(tmp_path), ".html")
+    for i in range(3):
+        old_store.save(f"page_{i}.html", f"<p>{i}</p>\n".encode())
+
+    new_store = create_snapshot_store(new_storage, str(tmp_path), ".html")
+
+    assert new_store.list_names() == ["page_2.html", "page_1.html", "page_0.html"]
+    assert new_store.read("page_0.html") == b"<p>0</p>\n"
+    assert new_store.read_latest() == b"<p>2</p>\n"
+    assert create_snapshot_store(new_storage, str(tmp_path), ".html").list_names() == new_store.list_names()
+
+
+def test_delta_store_moves_legacy_manifest(tmp_path):
+    delta_store = DeltaSnapshotStore(str(tmp_path), ".html")
+    delta_store.save("page_0.html", b"<p>0</p>")
+    os.replace(
+        os.path.join(tmp_path, DeltaSnapshotStore.manifest_filename),
+        os.path.join(tmp_path, ContentAddressedSnapshotStore.manifest_filename),
+    )
+
+    assert DeltaSnapshotStore(str(tmp_path), ".html").read_latest() == b"<p>0</p>"
+
+
+@pytest.mark.parametrize("storage", list(SnapshotStorage))
+def test_snapshot_store_reads_latest_snapshot_in_chunks(tmp_path, storage):
+    snapshot_store = create_snapshot_store(storage, str(tmp_path), ".xml")
+    assert snapshot_store.read_latest_chunks(4) is None
+
+    snapshot_store.save("feed_1.xml", b"<rss>old</rss>")
+    snapshot_store.save("feed_2.xml", b"<rss>latest</rss>")
+
+    chunks = list(snapshot_store.read_latest_chunks(4))
+    assert b"".join(chunks) == b"<rss>latest</rss>"
+    assert max(len(x) for x in chunks) == 4
@@ -0,0 +1,24 @@
+import asyncio
+
+from feeds.service.host_scan import NmapScanService
+
+
+async def _run_scans_of_same_host(scan_service: NmapScanService) -> tuple[int, int]:
+    cancelled_scan = asyncio.create_task(scan_service._run_scan("First", "sleep 5"))
+    other_scan = asyncio.create_task(scan_service._run_scan("Second", "sleep 0.5"))
+    while len(scan_service._processes) < 2:
+        await asyncio.sleep(0.01)
+
+    scan_service.cancel_scan("First")
+
+    return await cancelled_scan, await other_scan
+
+
+def test_cancel_scan_kills_only_the_scan_with_the_scan_id():
+    scan_service = NmapScanService()
+
+    cancelled_exit_code, other_exit_code = asyncio.run(_run_scans_of_same_host(scan_service))
+
+    assert cancelled_exit_code != 0
+    assert other_exit_code == 0
+    assert not scan_service._processes
@@ -0,0 +1,101 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from feeds.http.browser import BrowserPool, BrowserPoolConfiguration, RenderProfile, RenderProfileType
+
+
+@pytest.fixture
+def created_drivers() -> list[MagicMock]:
+    return []
+
+
+def _create_pool(
+        created_drivers: list[MagicMock], browser_slots: threading.Semaphore | None = None, **configuration
+) -> BrowserPool:
+    def create_driver() -> MagicMock:
+        driver = MagicMock()
+        driver.capabilities = {}
+        created_drivers.append(driver)
+        return driver
+
+    return BrowserPool(BrowserPoolConfiguration(**configuration), create_driver, browser_slots)
+
+
+def test_browser_pool_reuses_browser_with_new_tab(created_drivers):
+    browser_pool = _create_pool(created_drivers)
+
+    for _ in range(3):
+        with browser_pool.lease() as driver:
+            driver.get("http://test.com")
+
+    assert len(created_drivers) == 1
+    assert created_drivers[0].switch_to.new_window.call_count == 3
+    assert created_drivers[0].close.call_count == 3
+    created_drivers[0].quit.assert_not_called()
+
+
+def test_browser_pool_recycles_browser_after_max_pages(created_drivers):
+    browser_pool = _create_pool(created_drivers, max_pages_per_browser=2)
+
+    for _ in range(3):
+        with browser_pool.lease():
+            pass
+
+    assert len(created_drivers) == 2
+    created_drivers[0].quit.assert_called_once()
+
+
+def test_browser_pool_discards_failed_browser(created_drivers):
+    browser_pool = _create_pool(created_drivers)
+
+    with browser_pool.lease() as driver:
+        driver.close.side_effect = WebDriverException("Browser was killed")
+    with browser_pool.lease():
+        pass
+
+    assert len(created_drivers) == 2
+    created_drivers[0].quit.assert_called_once()
+
+
+def test_browser_pool_quits_idle_browsers_on_close(created_drivers):
+    browser_pool = _create_pool(created_drivers)
+    with browser_pool.lease():
+        pass
+
+    browser_pool.close()
+
+    created_drivers[0].quit.assert_called_once()
+    with pytest.raises(RuntimeError):
+        with browser_pool.lease():
+            pass
+
+
+def test_browser_pools_sharing_slots_quit_idle_browsers_of_other_pools(created_drivers):
+    browser_slots = threading.Semaphore(1)
+    browser_pools = [_create_pool(created_drivers, browser_slots, pool_size=1) for _ in range(2)]
+    browser_pools[1]._reclaim_browser_slot = browser_pools[0].quit_idle_browser
+
+    with browser_pools[0].lease():
+        pass
+    with browser_pools[1].lease():
+        pass
+
+    assert len(created_drivers) == 2
+    created_drivers[0].quit.assert_called_once()
+    created_drivers[1].quit.assert_not_called()
+
+
+def test_render_profile_lean_blocks_resources():
+    default_preferences = RenderProfile.create(RenderProfileType.DEFAULT).get_firefox_preferences()
+    lean_preferences = RenderProfile.create(RenderProfileType.LEAN).get_firefox_preferences()
+    lean_no_css_preferences = RenderProfile.create(RenderProfileType.LEAN, disable_css=True).get_firefox_preferences()
+
+    assert not default_preferences
+    assert lean_preferences["permissions.default.image"] == 2
+    assert lean_preferences["gfx.downloadable_fonts.enabled"] is False
+    assert lean_preferences["privacy.trackingprotection.enabled"] is True
+    assert "permissions.default.stylesheet" not in lean_preferences
+    assert lean_no_css_preferences["permissions.default.stylesheet"] == 2
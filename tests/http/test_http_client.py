@@ -0,0 +1,147 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+
+from feeds.http.async_client import HTTPClientAsync
+from feeds.http.client import FetchRequest, HTTPClient
+from feeds.http.pool import PoolConfiguration
+from feeds.http.validator import ValidatorCache
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    etag = '"v1"'
+    request_count = 0
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        FeedRequestHandler.request_count += 1
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = b"<rss><channel></channel></rss>"
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedRequestHandler)
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    FeedRequestHandler.request_count = 0
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_client_reuses_connections(server_url):
+    http_client = HTTPClient({}, PoolConfiguration(coalesce_ttl_seconds=0))
+
+    assert http_client.get_response_string(f"{server_url}/feed")
+    assert http_client.get_response_code(f"{server_url}/other") == 200
+    assert http_client.get_response_code(f"{server_url}/feed") == 200
+
+    stats = http_client.get_pool_stats()
+    assert stats.misses == 1
+    assert stats.hits == 2
+
+
+def test_http_client_without_keep_alive_opens_new_connections(server_url):
+    http_client = HTTPClient({}, PoolConfiguration(keep_alive=False, coalesce_ttl_seconds=0))
+
+    http_client.get_response_code(server_url)
+    http_client.get_response_code(server_url)
+
+    stats = http_client.get_pool_stats()
+    assert stats.misses == 2
+    assert stats.hits == 0
+
+
+def test_http_client_conditional_get_after_commit(server_url, tmp_path):
+    validator_cache_path = str(tmp_path / "validators.json")
+    http_client = HTTPClient({}, validator_cache=ValidatorCache(validator_cache_path))
+
+    assert http_client.get_response_string(server_url, validator_key="Feed")
+    assert http_client.get_response_string(server_url, validator_key="Feed")
+    http_client.commit_validator(server_url, "Feed")
+
+    restarted_http_client = HTTPClient({}, validator_cache=ValidatorCache(validator_cache_path))
+    assert restarted_http_client.get_response_string(server_url, validator_key="Feed") is None
+    assert restarted_http_client.get_response_string(server_url, validator_key="Other feed")
+    assert restarted_http_client.get_response_string(server_url)
+
+
+def test_http_client_coalesces_identical_requests(server_url):
+    http_client = HTTPClient({})
+
+    first_response = http_client.get_response_string(server_url, validator_key="Feed")
+    second_response = http_client.get_response_string(server_url, validator_key="Other feed")
+    status_code = http_client.get_response_code(server_url)
+
+    assert first_response is second_response
+    assert status_code == 200
+    assert FeedRequestHandler.request_count == 1
+
+
+@pytest.fixture
+def http_client_async():
+    http_client = HTTPClientAsync({})
+    yield http_client
+    http_client.close()
+
+
+def test_http_client_async_fetch_many(server_url, http_client_async):
+    fetch_requests = [FetchRequest(f"{server_url}/{i}") for i in range(10)]
+
+    responses = http_client_async.fetch_many(fetch_requests + fetch_requests)
+
+    assert len(responses) == 10
+    assert all(response.status_code == 200 for response in responses.values())
+    assert FeedRequestHandler.request_count == 10
+
+
+def test_http_client_async_answers_from_prefetched_responses(server_url, http_client_async):
+    http_client_async.prefetch([FetchRequest(server_url, "Feed"), FetchRequest(f"{server_url}/status")])
+
+    assert http_client_async.get_response_string(server_url, validator_key="Feed")
+    assert http_client_async.get_response_code(f"{server_url}/status") == 200
+    assert FeedRequestHandler.request_count == 2
+
+    http_client_async.commit_validator(server_url, "Feed")
+    assert http_client_async.get_response_string(server_url, validator_key="Feed") is None
+    assert FeedRequestHandler.request_count == 3
+
+
+def test_http_client_measure_response_is_not_coalesced(server_url):
+    http_client = HTTPClient({}, PoolConfiguration(coalesce_ttl_seconds=60))
+
+    assert http_client.get_response_code(f"{server_url}/feed") == 200
+    response_timing = http_client.measure_response(f"{server_url}/feed")
+
+    assert response_timing.status_code == 200
+    assert 0 < response_timing.ttfb_ms <= response_timing.latency_ms
+    assert FeedRequestHandler.request_count == 2
+
+
+def test_http_client_async_fetch_many_leaves_out_failed_requests(server_url, http_client_async):
+    with socket.socket() as unused_socket:
+        unused_socket.bind(("127.0.0.1", 0))
+        dead_url = f"http://127.0.0.1:{unused_socket.getsockname()[1]}"
+    http_client_async._fetch = MagicMock(side_effect=AssertionError("Failed requests must not be sent again"))
+
+    responses = http_client_async.fetch_many([FetchRequest(server_url), FetchRequest(dead_url)])
+
+    assert list(responses) == [FetchRequest(server_url)]
+    assert FeedRequestHandler.request_count == 1
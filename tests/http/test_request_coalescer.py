@@ -0,0 +1,51 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from feeds.http.coalesce import RequestCoalescer
+
+
+def test_coalescer_merges_requests_in_flight():
+    coalescer = RequestCoalescer(ttl_seconds=0)
+    fetch_count = 0
+    fetch_started = threading.Event()
+
+    def fetch() -> object:
+        nonlocal fetch_count
+        fetch_count += 1
+        fetch_started.set()
+        time.sleep(0.2)
+        return object()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(coalescer.get, "url", fetch)
+        fetch_started.wait(timeout=5)
+        others = [executor.submit(coalescer.get, "url", fetch) for _ in range(3)]
+        results = [first.result()] + [x.result() for x in others]
+
+    assert fetch_count == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_coalescer_keeps_results_for_ttl():
+    coalescer = RequestCoalescer(ttl_seconds=0.1)
+
+    first_result = coalescer.get("url", object)
+    assert coalescer.get("url", object) is first_result
+
+    time.sleep(0.15)
+    assert coalescer.get("url", object) is not first_result
+
+
+def test_coalescer_does_not_keep_failed_requests():
+    coalescer = RequestCoalescer(ttl_seconds=10)
+
+    def failing_fetch() -> object:
+        raise ConnectionError("Failed")
+
+    with pytest.raises(ConnectionError):
+        coalescer.get("url", failing_fetch)
+
+    assert coalescer.get("url", lambda: "content") == "content"
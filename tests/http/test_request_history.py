@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from feeds.http.history import RequestHistoryDatabase, RequestRecord
+from feeds.http.log import RequestLogService, SqliteRequestLogService
+
+
+@pytest.fixture
+def request_history(tmp_path):
+    request_history = RequestHistoryDatabase(str(tmp_path / "history.db"), batch_size=10)
+    yield request_history
+    request_history.close()
+
+
+def _add_record(request_history: RequestHistoryDatabase, checker: str, timestamp: datetime, value: str) -> None:
+    request_history.add(RequestRecord(checker, timestamp.isoformat(), [value]))
+
+
+def test_request_history_sqlite_request_log_service_last_value(request_history):
+    request_log_service = SqliteRequestLogService(request_history, "Test")
+    assert request_log_service.get_last_request_value(value_index=1) is None
+
+    request_log_service.log_request(500)
+    request_log_service.log_request(200, "OK")
+
+    assert request_log_service.get_last_request_value(value_index=1) == "200"
+    assert request_log_service.get_last_request_value(value_index=2) == "OK"
+    assert SqliteRequestLogService(request_history, "Test").get_last_request_value(value_index=1) == "200"
+
+
+def test_request_history_queries_and_aggregates(request_history):
+    now = datetime.now()
+    for hours, value in ((3, "200"), (2, "503"), (1, "200"), (0, "200")):
+        _add_record(request_history, "Test", now - timedelta(hours=hours), value)
+    _add_record(request_history, "Other", now, "503")
+
+    assert [x.values[0] for x in request_history.get_history("Test")] == ["200", "503", "200", "200"]
+    assert len(request_history.get_history(since=now - timedelta(minutes=90))) == 3
+    assert request_history.get_value_counts(since=now - timedelta(hours=5)) == {"200": 3, "503": 2}
+    assert request_history.get_uptime("Test", "200") == 0.75
+    assert request_history.get_uptime("Missing", "200") is None
+
+
+def test_request_history_retention_removes_old_records(tmp_path, request_history):
+    _add_record(request_history, "Test", datetime.now() - timedelta(days=400), "200")
+    _add_record(request_history, "Test", datetime.now(), "503")
+
+    request_history.apply_retention()
+
+    assert [x.values for x in request_history.get_history()] == [["503"]]
+
+
+def test_request_history_imports_log_files(tmp_path, request_history):
+    log_dir = tmp_path / "checker"
+    log_dir.mkdir()
+    request_log_service = RequestLogService(str(log_dir))
+    request_log_service.log_request(503)
+    request_log_service.log_request(200)
+
+    sqlite_request_log_service = SqliteRequestLogService(request_history, "Test", str(log_dir))
+
+    assert sqlite_request_log_service.get_last_request_value(value_index=1) == "200"
+    assert request_history.get_value_counts("Test") == {"503": 1, "200": 1}
+    assert not RequestLogService.get_log_file_paths(str(log_dir))
+
+
+def test_request_history_close_inserts_buffered_records_without_retention(tmp_path):
+    database_path = str(tmp_path / "history.db")
+    request_history = RequestHistoryDatabase(database_path, retention_days=None)
+    _add_record(request_history, "Test", datetime.now(), "200")
+    request_history.close()
+
+    request_history = RequestHistoryDatabase(database_path, retention_days=None)
+
+    assert [x.values for x in request_history.get_history("Test")] == [["200"]]
+    request_history.close()
@@ -0,0 +1,89 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from feeds.http.log import FsyncPolicy, RequestLogService, RequestLogWriterConfiguration
+
+
+@pytest.fixture
+def request_log_service(tmp_path):
+    return RequestLogService(str(tmp_path))
+
+
+def test_request_log_service_get_last_request_value_empty(request_log_service):
+    assert request_log_service.get_last_request_value(value_index=1) is None
+
+
+def test_request_log_service_get_last_request_value_after_log_request(request_log_service):
+    request_log_service.log_request(200, "first")
+    request_log_service.log_request(404, "second")
+
+    assert request_log_service.get_last_request_value(value_index=1) == "404"
+    assert request_log_service.get_last_request_value(value_index=2) == "second"
+
+
+def test_request_log_service_get_last_request_value_reads_tail(request_log_service, tmp_path, monkeypatch):
+    monkeypatch.setattr(RequestLogService, "_read_block_size", 16)
+    request_log_service.log_request(200, "first")
+    with open(request_log_service.request_log, "a", encoding="utf-8") as file:
+        file.writelines(f"2024-01-01T00:00:00;{x};record {x}\n" for x in range(1000))
+
+    reopened_request_log_service = RequestLogService(str(tmp_path))
+
+    assert reopened_request_log_service.get_last_request_value(value_index=1) == "999"
+    assert reopened_request_log_service.get_last_request_value(value_index=2) == "record 999"
+
+
+def test_request_log_service_rotation_clears_last_record(request_log_service, tmp_path):
+    request_log_service.log_request(200)
+    os.remove(request_log_service.request_log)
+    request_log_service.request_log = os.path.join(tmp_path, "requests_2000-01.log")
+
+    request_log_service._next_rotation = datetime.now()
+    request_log_service._rotate_log_file_if_needed(datetime.now())
+
+    assert request_log_service.get_last_request_value(value_index=1) is None
+
+
+def test_request_log_service_buffered_writes_in_batches(tmp_path):
+    writer_configuration = RequestLogWriterConfiguration(max_buffered_records=3, flush_interval_seconds=3600)
+    request_log_service = RequestLogService(str(tmp_path), writer_configuration)
+    request_log_service.log_request(200)
+    request_log_service.log_request(404)
+
+    assert request_log_service.get_last_request_value(value_index=1) == "404"
+    assert not os.path.exists(request_log_service.request_log)
+
+    request_log_service.log_request(500)
+
+    assert len(list(RequestLogService.read_records(request_log_service.request_log))) == 3
+    request_log_service.close()
+
+
+def test_request_log_service_buffered_flushes_on_rotation_and_close(tmp_path):
+    request_log_service = RequestLogService(str(tmp_path), RequestLogWriterConfiguration(fsync=FsyncPolicy.FLUSH))
+    old_request_log = os.path.join(tmp_path, "requests_2000-01.log")
+    request_log_service.request_log = old_request_log
+    request_log_service._next_rotation = datetime.now() + timedelta(hours=1)
+    request_log_service.log_request(200)
+
+    request_log_service._next_rotation = datetime.now()
+    request_log_service.log_request(404)
+
+    assert [x[1] for x in RequestLogService.read_records(old_request_log)] == ["200"]
+    assert not os.path.exists(request_log_service.request_log)
+
+    request_log_service.close()
+
+    assert [x[1] for x in RequestLogService.read_records(request_log_service.request_log)] == ["404"]
+
+
+def test_request_log_service_buffered_flush_writes_before_batch_is_full(tmp_path):
+    request_log_service = RequestLogService(str(tmp_path), RequestLogWriterConfiguration(max_buffered_records=100))
+    request_log_service.log_request(200)
+
+    request_log_service.flush()
+
+    assert [x[1] for x in RequestLogService.read_records(request_log_service.request_log)] == ["200"]
+    request_log_service.close()
@@ -0,0 +1,53 @@
+import pytest
+
+from feeds.feed.base import CheckOutcome, FeedChecker, FeedSchedule
+from feeds.job.adaptive import AdaptiveIntervalPolicy
+from feeds.shared.config import ConfigKeys
+
+
+@pytest.fixture
+def feed_checker(tmp_path) -> FeedChecker:
+    return FeedChecker(
+        {
+            ConfigKeys.NAME: "Adaptive",
+            "schedule": FeedSchedule.ADAPTIVE,
+            ConfigKeys.DIR: str(tmp_path),
+            ConfigKeys.ADAPTIVE_MIN_INTERVAL_SECONDS: 600,
+            ConfigKeys.ADAPTIVE_MAX_INTERVAL_SECONDS: 7200,
+        }
+    )
+
+
+def _record(policy: AdaptiveIntervalPolicy, feed_checker: FeedChecker, outcome: CheckOutcome) -> float:
+    feed_checker.last_outcome = outcome
+    policy.record_outcome(feed_checker)
+    return policy.get_interval_seconds(feed_checker)
+
+
+def test_interval_backs_off_to_ceiling_when_unchanged(feed_checker):
+    policy = AdaptiveIntervalPolicy()
+    intervals = [_record(policy, feed_checker, CheckOutcome.UNCHANGED) for _ in range(5)]
+
+    assert intervals == sorted(intervals)
+    assert intervals[-1] == 7200
+
+
+def test_interval_shrinks_to_floor_when_changes_cluster(feed_checker):
+    policy = AdaptiveIntervalPolicy()
+    _record(policy, feed_checker, CheckOutcome.CHANGED)
+    interval = _record(policy, feed_checker, CheckOutcome.CHANGED)
+
+    assert interval == 600
+
+
+def test_failed_checks_keep_interval(feed_checker):
+    policy = AdaptiveIntervalPolicy()
+    interval = policy.get_interval_seconds(feed_checker)
+
+    assert _record(policy, feed_checker, CheckOutcome.FAILED) == interval
+
+
+def test_interval_is_restored_from_state_file(feed_checker):
+    interval = _record(AdaptiveIntervalPolicy(), feed_checker, CheckOutcome.UNCHANGED)
+
+    assert AdaptiveIntervalPolicy().get_interval_seconds(feed_checker) == interval
@@ -0,0 +1,138 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from feeds.feed.base import CheckOutcome, FeedChecker, FeedCheckFailedError
+from feeds.job.executor import SequentialFeedCheckExecutor, ThreadPoolFeedCheckExecutor
+from feeds.shared.config import ConfigKeys
+
+
+class BlockingFeedChecker(FeedChecker):
+    def __init__(self, name: str):
+        super().__init__({"name": name, "schedule": "hourly"})
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.check_count = 0
+
+    def check(self) -> None:
+        self.check_count += 1
+        self.started.set()
+        self.release.wait(timeout=5)
+
+
+@pytest.fixture
+def thread_pool_executor():
+    executor = ThreadPoolFeedCheckExecutor(max_workers=2)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def test_thread_pool_executor_skips_checker_already_running(thread_pool_executor):
+    feed_checker = BlockingFeedChecker("Blocking")
+
+    assert thread_pool_executor.submit(feed_checker)
+    assert feed_checker.started.wait(timeout=5)
+    assert not thread_pool_executor.submit(feed_checker)
+
+    stats = thread_pool_executor.stats()
+    assert stats.active == 1
+    assert stats.skipped == 1
+    assert stats.utilization == 0.5
+
+    feed_checker.release.set()
+    thread_pool_executor.shutdown(wait=True)
+    assert feed_checker.check_count == 1
+    assert thread_pool_executor.stats().completed == 1
+
+
+def test_thread_pool_executor_runs_checkers_concurrently(thread_pool_executor):
+    feed_checkers = [BlockingFeedChecker("One"), BlockingFeedChecker("Two")]
+    for feed_checker in feed_checkers:
+        thread_pool_executor.submit(feed_checker)
+
+    assert all(feed_checker.started.wait(timeout=5) for feed_checker in feed_checkers)
+    assert thread_pool_executor.stats().active == 2
+
+    for feed_checker in feed_checkers:
+        feed_checker.release.set()
+
+
+def test_sequential_executor_counts_failed_checks():
+    executor = SequentialFeedCheckExecutor()
+    feed_checker = MagicMock(FeedChecker)
+    feed_checker.name = "Failing"
+    feed_checker.timeout_seconds = 5
+    feed_checker.check.side_effect = FeedCheckFailedError("Failed")
+
+    assert executor.submit(feed_checker)
+    assert executor.submit(feed_checker)
+
+    stats = executor.stats()
+    assert stats.completed == 2
+    assert stats.failed == 2
+    assert stats.active == 0
+
+
+class HangingFeedChecker(BlockingFeedChecker):
+    def __init__(self, name: str, stop_on_cancel: bool):
+        super().__init__(name)
+        self.config[ConfigKeys.TIMEOUT_SECONDS] = 0.1
+        self.stop_on_cancel = stop_on_cancel
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        if self.stop_on_cancel:
+            self.release.set()
+
+
+def test_executor_cancels_check_exceeding_timeout():
+    executor = SequentialFeedCheckExecutor()
+    feed_checker = HangingFeedChecker("Hanging", stop_on_cancel=True)
+
+    executor.submit(feed_checker)
+
+    assert feed_checker.cancelled
+    assert feed_checker.last_outcome == CheckOutcome.TIMEOUT
+    stats = executor.stats()
+    assert stats.timed_out == 1
+    assert stats.abandoned == 0
+
+
+class RaisingOnCancelFeedChecker(HangingFeedChecker):
+    def check(self) -> None:
+        super().check()
+        if self.cancelled:
+            raise FeedCheckFailedError("Cancelled")
+
+
+def test_executor_counts_check_raising_after_cancel_only_as_timed_out():
+    executor = SequentialFeedCheckExecutor()
+    feed_checker = RaisingOnCancelFeedChecker("Hanging", stop_on_cancel=True)
+
+    executor.submit(feed_checker)
+
+    assert feed_checker.last_outcome == CheckOutcome.TIMEOUT
+    stats = executor.stats()
+    assert stats.timed_out == 1
+    assert stats.failed == 0
+
+
+def test_executor_abandons_check_not_stopping_after_cancel():
+    executor = SequentialFeedCheckExecutor()
+    executor.cancel_grace_seconds = 0.1
+    feed_checker = HangingFeedChecker("Hanging", stop_on_cancel=False)
+
+    executor.submit(feed_checker)
+    assert executor.stats().abandoned == 1
+    assert not executor.submit(feed_checker)
+
+    feed_checker.release.set()
+    for _ in range(50):
+        if not executor.stats().abandoned:
+            break
+        time.sleep(0.1)
+    assert executor.submit(feed_checker)
+    assert feed_checker.check_count == 2
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from feeds.feed.base import FeedChecker, FeedSchedule
+from feeds.job.adaptive import AdaptiveIntervalPolicy
+from feeds.job.executor import ThreadPoolFeedCheckExecutor
+from feeds.job.scheduler import FeedCheckScheduler, SCHEDULE_INTERVALS
+
+
+class CountingFeedChecker(FeedChecker):
+    def __init__(self, name: str, schedule: str = FeedSchedule.HOURLY):
+        super().__init__({"name": name, "schedule": schedule})
+        self.check_times = []
+
+    def check(self) -> None:
+        self.check_times.append(time.monotonic())
+
+
+class FastFeedCheckScheduler(FeedCheckScheduler):
+    def get_interval_seconds(self, feed_checker: FeedChecker) -> float:
+        super().get_interval_seconds(feed_checker)
+        return 0.05
+
+
+@pytest.fixture
+def scheduler():
+    executor = ThreadPoolFeedCheckExecutor(max_workers=2)
+    feed_check_scheduler = FastFeedCheckScheduler(executor, max_jitter_seconds=0)
+    yield feed_check_scheduler
+    feed_check_scheduler.stop()
+    executor.shutdown(wait=True)
+
+
+def _run_scheduler_for(scheduler: FeedCheckScheduler, seconds: float) -> None:
+    scheduler_thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+    scheduler_thread.start()
+    time.sleep(seconds)
+    scheduler.stop()
+    scheduler_thread.join(timeout=5)
+    assert not scheduler_thread.is_alive()
+
+
+def test_scheduler_runs_checks_repeatedly(scheduler):
+    feed_checker = CountingFeedChecker("Repeated")
+    scheduler.add_feed_checkers([feed_checker], startup_window_seconds=0)
+
+    _run_scheduler_for(scheduler, 0.5)
+
+    assert len(feed_checker.check_times) >= 3
+
+
+def test_scheduler_staggers_first_runs(scheduler):
+    feed_checkers = [CountingFeedChecker("First"), CountingFeedChecker("Second")]
+    scheduler.add_feed_checkers(feed_checkers, startup_window_seconds=0.6)
+
+    _run_scheduler_for(scheduler, 0.15)
+
+    assert feed_checkers[0].check_times
+    assert not feed_checkers[1].check_times
+
+
+def test_scheduler_supports_monthly_schedule(scheduler):
+    feed_checker = CountingFeedChecker("Monthly", FeedSchedule.MONTHLY)
+
+    assert FeedCheckScheduler.get_interval_seconds(scheduler, feed_checker) == (
+        SCHEDULE_INTERVALS[FeedSchedule.MONTHLY].total_seconds()
+    )
+
+
+def test_scheduler_passes_checks_due_within_batch_window_to_batch_handler(scheduler):
+    batches = []
+    feed_checkers = [CountingFeedChecker("First"), CountingFeedChecker("Second")]
+    scheduler.set_batch_handler(lambda x: batches.append([y.name for y in x]), window_seconds=0.2)
+    scheduler.add_feed_checker(feed_checkers[0], delay_seconds=0)
+    scheduler.add_feed_checker(feed_checkers[1], delay_seconds=0.1)
+
+    _run_scheduler_for(scheduler, 0.03)
+
+    assert batches[0] == ["First", "Second"]
+    assert all(feed_checker.check_times for feed_checker in feed_checkers)
+
+
+def test_scheduler_keeps_running_failing_tasks(scheduler):
+    feed_checker = CountingFeedChecker("Checked")
+    task_calls = []
+
+    def failing_task() -> None:
+        task_calls.append(time.monotonic())
+        raise OSError("Disk full")
+
+    scheduler.add_feed_checkers([feed_checker], startup_window_seconds=0)
+    scheduler.add_task(failing_task, interval_seconds=0.05)
+
+    _run_scheduler_for(scheduler, 0.5)
+
+    assert len(task_calls) >= 3
+    assert len(feed_checker.check_times) >= 3
+
+
+class FailingAdaptiveIntervalPolicy(AdaptiveIntervalPolicy):
+    def record_outcome(self, feed_checker: FeedChecker) -> None:
+        raise OSError("Read-only file system")
+
+
+def test_scheduler_reschedules_when_outcome_cannot_be_recorded():
+    executor = ThreadPoolFeedCheckExecutor(max_workers=1)
+    scheduler = FastFeedCheckScheduler(executor, max_jitter_seconds=0, adaptive_policy=FailingAdaptiveIntervalPolicy())
+    feed_checker = CountingFeedChecker("Adaptive", schedule=FeedSchedule.ADAPTIVE)
+    scheduler.add_feed_checkers([feed_checker], startup_window_seconds=0)
+
+    _run_scheduler_for(scheduler, 0.5)
+    executor.shutdown(wait=True)
+
+    assert len(feed_checker.check_times) >= 3
@@ -0,0 +1,51 @@
+import pytest
+
+from feeds.feed.parser import FeedFormat, FeedParseError, RssItem, StreamingFeedParser
+
+RSS2_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>Test</title>
+<item><title>One</title><link>http://test.com/1</link><pubDate>Mon, 01 Jan 2024</pubDate><guid>1</guid></item>
+<item><title>Two</title></item>
+</channel></rss>"""
+
+RSS1_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/"
+         xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel rdf:about="http://test.com/"><title>Test</title></channel>
+<item rdf:about="http://test.com/1"><title>One</title><link>http://test.com/1</link><dc:date>2024-01-01</dc:date></item>
+</rdf:RDF>"""
+
+ATOM_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Test</title>
+<entry><title>One</title><id>urn:1</id><updated>2024-01-01T00:00:00Z</updated>
+<link rel="self" href="http://test.com/api/1"/><link href="http://test.com/1"/></entry>
+<entry><id>urn:2</id></entry>
+</feed>"""
+
+
+@pytest.mark.parametrize(
+    "feed, feed_format, first_item",
+    [
+        (RSS2_FEED, FeedFormat.RSS2, RssItem("One", "http://test.com/1", "Mon, 01 Jan 2024", "1")),
+        (RSS1_FEED, FeedFormat.RSS1, RssItem("One", "http://test.com/1", "2024-01-01", "http://test.com/1")),
+        (ATOM_FEED, FeedFormat.ATOM, RssItem("One", "http://test.com/1", "2024-01-01T00:00:00Z", "urn:1")),
+    ],
+)
+def test_streaming_feed_parser_detects_format(feed, feed_format, first_item):
+    parsed_feed = StreamingFeedParser().parse([feed])
+
+    assert parsed_feed.feed_format == feed_format
+    assert parsed_feed.items[0] == first_item
+
+
+def test_streaming_feed_parser_handles_missing_fields():
+    rss2_items = StreamingFeedParser().parse([RSS2_FEED]).items
+    atom_items = StreamingFeedParser().parse([ATOM_FEED]).items
+
+    assert rss2_items[1] == RssItem("Two", "", "", "")
+    assert atom_items[1] == RssItem("", "", "", "urn:2")
+
+
+def test_streaming_feed_parser_rejects_unknown_format():
+    with pytest.raises(FeedParseError):
+        StreamingFeedParser().parse(["<html><body></body></html>"])
@@ -0,0 +1,118 @@
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+from feeds.email.client import EmailClient
+from feeds.feed.base import CheckOutcome
+from feeds.feed.rss import RSSFeedChecker
+from feeds.http.client import HTTPClientBase
+from feeds.shared.config import ConfigKeys
+
+
+def _get_feed(*titles: str) -> str:
+    items = "".join(
+        f"<item><title>{x}</title><link>http://test.com/{x}</link><pubDate>Mon, 01 Jan 2024</pubDate></item>"
+        for x in titles
+    )
+    return f"<?xml version='1.0' encoding='utf-8'?><rss><channel><title>Test</title>{items}</channel></rss>"
+
+
+@pytest.fixture
+def config(tmp_path) -> dict:
+    return {
+        ConfigKeys.NAME: "Test",
+        ConfigKeys.URL: "http://test.com/rss",
+        ConfigKeys.DIR: str(tmp_path / "rss"),
+        ConfigKeys.SAVED_FEEDS_COUNT: 2,
+    }
+
+
+def _create_checker(config: dict, feed: str) -> RSSFeedChecker:
+    http_client = MagicMock(HTTPClientBase)
+    http_client.get_response_string.return_value = feed
+    return RSSFeedChecker(MagicMock(EmailClient), http_client, config)
+
+
+def test_rss_feed_checker_detects_new_item(config):
+    checker = _create_checker(config, _get_feed("One"))
+    checker.check()
+    checker._http_client.get_response_string.return_value = _get_feed("Two", "One")
+    checker.check()
+
+    assert checker.last_outcome == CheckOutcome.CHANGED
+    assert checker._email_client.send_email.call_count == 2
+    message = checker._email_client.send_email.call_args.args[0]
+    assert "http://test.com/Two" in message.body
+    assert "http://test.com/One" not in message.body
+
+
+def test_rss_feed_checker_ignores_reordered_items(config):
+    checker = _create_checker(config, _get_feed("One", "Two"))
+    checker.check()
+    checker._http_client.get_response_string.return_value = _get_feed("Two", "One")
+    checker.check()
+
+    assert checker.last_outcome == CheckOutcome.UNCHANGED
+    checker._email_client.send_email.assert_called_once()
+
+
+def test_rss_feed_checker_fills_seen_items_from_saved_feed(config):
+    checker = _create_checker(config, _get_feed("One"))
+    checker.check()
+    os.remove(os.path.join(config[ConfigKeys.DIR], RSSFeedChecker.seen_items_filename))
+
+    checker = _create_checker(config, _get_feed("Two", "One"))
+    checker.check()
+
+    message = checker._email_client.send_email.call_args.args[0]
+    assert "http://test.com/Two" in message.body
+    assert "http://test.com/One" not in message.body
+
+
+def test_rss_feed_checker_ignores_unchanged_feed(config):
+    checker = _create_checker(config, _get_feed("One", "Two"))
+    checker.check()
+    checker.check()
+
+    assert checker.last_outcome == CheckOutcome.UNCHANGED
+    checker._email_client.send_email.assert_called_once()
+
+
+def test_rss_feed_checker_uses_saved_feed_without_state(config):
+    checker = _create_checker(config, _get_feed("One", "Two"))
+    checker.check()
+    os.remove(os.path.join(config[ConfigKeys.DIR], RSSFeedChecker.state_filename))
+
+    checker = _create_checker(config, _get_feed("One", "Two"))
+    checker.check()
+
+    assert checker.last_outcome == CheckOutcome.UNCHANGED
+    assert os.path.exists(os.path.join(config[ConfigKeys.DIR], RSSFeedChecker.state_filename))
+
+
+def test_rss_feed_checker_parses_items_in_chunks(config):
+    checker = _create_checker(config, "")
+    checker._chunk_size = 7
+    feed = _get_feed(*(str(x) for x in range(100)))
+
+    parsed_feed = checker._parse_feed(checker._split_into_chunks(feed))
+
+    assert len(parsed_feed.items) == 100
+    assert parsed_feed.items[42].link == "http://test.com/42"
+    assert parsed_feed == checker._parse_feed([feed])
+
+
+def test_rss_feed_checker_ignores_adaptive_state_file(config):
+    os.makedirs(config[ConfigKeys.DIR])
+    adaptive_state_path = os.path.join(config[ConfigKeys.DIR], "adaptive_schedule.json")
+    with open(adaptive_state_path, "w", encoding="utf-8") as file:
+        file.write('{"interval_seconds": 3600, "change_times": []}')
+
+    checker = _create_checker(config, _get_feed("One"))
+    for titles in (("One",), ("Two", "One"), ("Three", "Two", "One")):
+        checker._http_client.get_response_string.return_value = _get_feed(*titles)
+        checker.check()
+
+    assert checker.last_outcome == CheckOutcome.CHANGED
+    assert os.path.exists(adaptive_state_path)
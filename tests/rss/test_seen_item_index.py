@@ -0,0 +1,30 @@
+from feeds.feed.rss import RssItem
+from feeds.service.seen_items import SeenItemIndex
+
+
+def test_seen_item_index_persists_keys(tmp_path):
+    file_path = str(tmp_path / "seen.json")
+    seen_items = SeenItemIndex(file_path, max_items=10)
+    seen_items.add(["guid-1", "http://test.com/2"])
+    seen_items.save()
+
+    seen_items = SeenItemIndex(file_path, max_items=10)
+
+    assert "guid-1" in seen_items
+    assert "http://test.com/2" in seen_items
+    assert "guid-3" not in seen_items
+
+
+def test_seen_item_index_evicts_oldest_keys(tmp_path):
+    seen_items = SeenItemIndex(str(tmp_path / "seen.json"), max_items=2)
+    seen_items.add(["1", "2", "3"])
+
+    assert len(seen_items) == 2
+    assert "1" not in seen_items
+    assert "3" in seen_items
+
+
+def test_rss_item_key_falls_back_to_link_and_hash():
+    assert RssItem("Title", "http://test.com", "Mon", guid="guid-1").key == "guid-1"
+    assert RssItem("Title", "http://test.com", "Mon").key == "http://test.com"
+    assert RssItem("Title", "", "Mon").key == RssItem("Title", "", "Mon").key != RssItem("Other", "", "Mon").key
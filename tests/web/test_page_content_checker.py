@@ -65,3 +65,77 @@ def test_page_content_checker_send_mail_on_each_change(page_content_checker):
 
     assert int(page_content_checker.request_log_service.get_last_request_value(value_index=1)) == int(True)
     assert page_content_checker.email_client.send_email.call_count == 2
+
+
+def test_page_content_checker_skip_not_modified_content(page_content_checker):
+    page_content_checker.check()
+
+    page_content_checker._http_client.get_response_string.return_value = None
+    page_content_checker.check()
+
+    assert int(page_content_checker.request_log_service.get_last_request_value(value_index=1)) == int(False)
+    assert len(page_content_checker.content_file_service._snapshot_store.list_names()) == 1
+    page_content_checker.email_client.send_email.assert_not_called()
+
+
+def test_page_content_checker_canonicalization_suppresses_noise(page_content_checker):
+    page_content_checker.config[ConfigKeys.CANONICALIZATION] = {"regex_masks": [r"\d+"]}
+    page_content_checker = PageContentChecker(
+        page_content_checker.email_client,
+        page_content_checker._http_client,
+        page_content_checker.request_log_service,
+        page_content_checker.config,
+    )
+    page_content_checker._http_client.get_response_string.return_value = _get_html_content("Visitors: 1")
+    page_content_checker.check()
+
+    page_content_checker._http_client.get_response_string.return_value = _get_html_content("Visitors: 2")
+    page_content_checker.check()
+
+    assert int(page_content_checker.request_log_service.get_last_request_value(value_index=1)) == int(False)
+    assert page_content_checker.regions[0].canonicalizer.suppressed_change_counter.count == 1
+    page_content_checker.email_client.send_email.assert_not_called()
+
+
+def _get_multi_region_html_content(prices: str, stock: str) -> str:
+    return f"<html><body><div id='prices'>{prices}</div><p class='stock'>{stock}</p></body></html>"
+
+
+@pytest.fixture
+def multi_region_page_content_checker(page_content_checker):
+    config = {
+        **page_content_checker.config,
+        ConfigKeys.CSS_SELECTORS: {"Prices": "#prices", "Stock": ".stock"},
+    }
+    del config[ConfigKeys.CSS_SELECTOR]
+    page_content_checker._http_client.get_response_string.return_value = _get_multi_region_html_content("10", "Yes")
+    return PageContentChecker(
+        page_content_checker.email_client,
+        page_content_checker._http_client,
+        page_content_checker.request_log_service,
+        config,
+    )
+
+
+def test_page_content_checker_multi_region_notifies_changed_regions(multi_region_page_content_checker):
+    multi_region_page_content_checker.check()
+
+    multi_region_page_content_checker._http_client.get_response_string.return_value = (
+        _get_multi_region_html_content("12", "Yes")
+    )
+    multi_region_page_content_checker.check()
+
+    assert int(multi_region_page_content_checker.request_log_service.get_last_request_value(value_index=1)) == 1
+    assert multi_region_page_content_checker._http_client.get_response_string.call_count == 2
+    message = multi_region_page_content_checker.email_client.send_email.call_args.args[0]
+    assert "<h2>Prices</h2>" in message.body
+    assert "<h2>Stock</h2>" not in message.body
+
+
+def test_page_content_checker_multi_region_saves_content_per_region(multi_region_page_content_checker):
+    multi_region_page_content_checker.check()
+
+    prices, stock = multi_region_page_content_checker.regions
+    assert prices.content_file_service.read_latest_content() == b'<div id="prices">10</div>'
+    assert stock.content_file_service.read_latest_content() == b'<p class="stock">Yes</p>'
+    assert prices.content_file_service.content_dir_path != stock.content_file_service.content_dir_path
@@ -0,0 +1,99 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from feeds.email.client import EmailClient
+from feeds.feed.web import FetchPath, PageContentCheckerDynamic
+from feeds.http.client import HTTPClientBase, HTTPClientDynamicBase
+from feeds.http.log import RequestLogService
+from feeds.shared.config import ConfigKeys
+
+
+def _get_html_content(text: str) -> str:
+    return f"<html><body><div class='content'>{text}</div></body></html>"
+
+
+@pytest.fixture
+def config(tmp_path) -> dict:
+    return {
+        ConfigKeys.NAME: "Test",
+        ConfigKeys.URL: "http://test.com",
+        ConfigKeys.DIR: str(tmp_path / "test"),
+        ConfigKeys.CSS_SELECTOR_LOADED: ".content",
+        ConfigKeys.CSS_SELECTOR_CONTENT: ".content",
+    }
+
+
+def _create_checker(config: dict, static_html: str, dynamic_html: str) -> PageContentCheckerDynamic:
+    http_client = MagicMock(HTTPClientBase)
+    http_client.get_response_string.return_value = static_html
+    http_client_dynamic = MagicMock(HTTPClientDynamicBase)
+    http_client_dynamic.get_content_by_css_selector.return_value = dynamic_html
+    http_client_dynamic.get_load_metrics.return_value = None
+
+    return PageContentCheckerDynamic(
+        MagicMock(EmailClient), http_client_dynamic, RequestLogService(config[ConfigKeys.DIR]), config, http_client
+    )
+
+
+def test_page_content_checker_dynamic_skips_browser_when_content_is_in_html(config):
+    checker = _create_checker(config, _get_html_content("Original content"), "")
+
+    checker.check()
+    checker._http_client_static.get_response_string.return_value = _get_html_content("Changed content")
+    checker.check()
+
+    checker._http_client.get_content_by_css_selector.assert_not_called()
+    checker.email_client.send_email.assert_called_once()
+    assert checker.fetch_path_memory.path == FetchPath.STATIC
+
+
+def test_page_content_checker_dynamic_remembers_browser_path(config):
+    static_html = "<html><body><div id='app'></div></body></html>"
+    dynamic_html = "<div class='content'>Rendered content</div>"
+    checker = _create_checker(config, static_html, dynamic_html)
+    checker.check()
+
+    # A new checker (e.g. after a restart) goes straight to the browser
+    checker = _create_checker(config, static_html, dynamic_html)
+    checker.check()
+
+    checker._http_client_static.get_response_string.assert_not_called()
+    assert checker._http_client.get_content_by_css_selector.call_count == 1
+    assert checker.fetch_path_memory.path == FetchPath.DYNAMIC
+    assert int(checker.request_log_service.get_last_request_value(value_index=1)) == int(False)
+
+
+def test_page_content_checker_dynamic_probes_static_path_again(config):
+    static_html = "<html><body><div id='app'></div></body></html>"
+    checker = _create_checker(config, static_html, "<div class='content'>Rendered content</div>")
+    checker.fetch_path_memory.static_probe_interval = 2
+
+    for _ in range(4):
+        checker.check()
+
+    # Static path is tried on the first check and again after two checks on the browser path
+    assert checker._http_client_static.get_response_string.call_count == 2
+    assert checker._http_client.get_content_by_css_selector.call_count == 4
+
+
+def test_page_content_checker_dynamic_uses_browser_for_empty_placeholder(config):
+    checker = _create_checker(config, _get_html_content(""), "<div class='content'>Rendered content</div>")
+
+    checker.check()
+
+    checker._http_client.get_content_by_css_selector.assert_called_once()
+    assert checker.fetch_path_memory.path == FetchPath.DYNAMIC
+    assert checker.content_file_service.read_latest_content() == b'<div class="content">Rendered content</div>'
+
+
+def test_page_content_checker_dynamic_requires_loaded_selector_in_html(config):
+    config[ConfigKeys.CSS_SELECTOR_LOADED] = ".content .loaded"
+    checker = _create_checker(
+        config, _get_html_content("Loading..."), "<div class='content'><p class='loaded'>Rendered content</p></div>"
+    )
+
+    checker.check()
+
+    checker._http_client.get_content_by_css_selector.assert_called_once()
+    assert checker.fetch_path_memory.path == FetchPath.DYNAMIC
@@ -4,7 +4,7 @@ import pytest
 
 from feeds.email.client import EmailClient
 from feeds.feed.web import UrlAvailabilityChecker
-from feeds.http.client import HTTPClientBase
+from feeds.http.client import HTTPClientBase, ResponseTiming
 from feeds.http.log import RequestLogService
 from feeds.shared.config import ConfigKeys
 
@@ -44,3 +44,54 @@ def test_url_availability_checker_send_email_on_service_up(
 
     assert int(url_availability_checker.request_log_service.get_last_request_value(value_index=1)) == 200
     url_availability_checker.email_client.send_email.assert_called_once()
+
+
+@pytest.fixture
+def monitoring_url_availability_checker(url_availability_checker) -> UrlAvailabilityChecker:
+    config = {
+        **url_availability_checker.config,
+        ConfigKeys.MONITORING: {"window_size": 4, "max_p95_ms": 500, "min_uptime_percent": 75, "min_samples": 2},
+    }
+    return UrlAvailabilityChecker(
+        url_availability_checker.email_client,
+        url_availability_checker._http_client,
+        url_availability_checker.request_log_service,
+        config,
+    )
+
+
+def test_url_availability_checker_monitoring_checks_every_time(monitoring_url_availability_checker) -> None:
+    http_client = monitoring_url_availability_checker._http_client
+    http_client.measure_response.return_value = ResponseTiming(200, 120.0, 40.0)
+    monitoring_url_availability_checker.check()
+    monitoring_url_availability_checker.check()
+
+    assert http_client.measure_response.call_count == 2
+    assert monitoring_url_availability_checker.get_fetch_requests() == []
+    assert monitoring_url_availability_checker.request_log_service.get_last_request_value(value_index=2) == "120.0"
+    monitoring_url_availability_checker.email_client.send_email.assert_not_called()
+
+
+def test_url_availability_checker_monitoring_alerts_on_threshold_and_recovery(
+        monitoring_url_availability_checker,
+) -> None:
+    http_client = monitoring_url_availability_checker._http_client
+    email_client = monitoring_url_availability_checker.email_client
+    http_client.measure_response.return_value = ResponseTiming(200, 100.0, 40.0)
+    monitoring_url_availability_checker.check()
+    http_client.measure_response.side_effect = ConnectionError("Connection refused")
+    monitoring_url_availability_checker.check()
+    monitoring_url_availability_checker.check()
+
+    assert email_client.send_email.call_count == 1
+    assert "uptime 50.00% is below 75.00%" in email_client.send_email.call_args.args[0].subject
+
+    http_client.measure_response.side_effect = None
+    http_client.measure_response.return_value = ResponseTiming(200, 900.0, 40.0)
+    for _ in range(4):
+        monitoring_url_availability_checker.check()
+
+    subjects = [x.args[0].subject for x in email_client.send_email.call_args_list]
+    assert any("p95 latency 900 ms exceeds 500 ms" in x for x in subjects)
+    assert any("back within thresholds (uptime)" in x for x in subjects)
+    assert monitoring_url_availability_checker.availability_monitor.breaches.keys() == {"p95"}